@@ -8,8 +8,9 @@ gevent.monkey.patch_all()  # isort:skip
 import argparse
 import logging
 import traceback
-from typing import List, Set, Union
+from typing import Dict, List, Optional, Set, Tuple, Union
 
+import gevent.pool
 import urllib3.exceptions
 
 from mtgjson5 import constants
@@ -22,18 +23,34 @@ def build_mtgjson_sets(
     sets_to_build: Union[Set[str], List[str]],
     output_pretty: bool,
     include_referrals: bool,
-) -> None:
+    set_workers: int = 1,
+    set_referrals: Optional[Dict[str, List[Tuple[str, str]]]] = None,
+) -> List[str]:
     """
-    Build each set one-by-one and output them to a file
+    Build each set and output them to a file. Up to set_workers sets
+    are built at once, but the referral map and set files are still
+    written one-by-one, in the order the sets were given
     :param sets_to_build: Sets to construct
     :param output_pretty: Should we dump minified
     :param include_referrals: Should we include referrals
+    :param set_workers: How many sets can be built at the same time
+    :param set_referrals: If given, collects the referrals of each set built
+    :return: Sets that were built and written out
     """
+    from mtgjson5.mtgjson_oracle_cache import MtgjsonOracleCache
     from mtgjson5.output_generator import write_to_file
-    from mtgjson5.providers import WhatsInStandardProvider
+    from mtgjson5.providers import (
+        CardMarketProvider,
+        GathererProvider,
+        GitHubBoostersProvider,
+        GitHubCardSealedProductsProvider,
+        GitHubSealedProvider,
+        WhatsInStandardProvider,
+    )
     from mtgjson5.referral_builder import (
-        build_and_write_referral_map,
+        build_referral_map,
         fixup_referral_map,
+        write_referral_map,
     )
     from mtgjson5.set_builder import build_mtgjson_set
 
@@ -42,15 +59,37 @@ def build_mtgjson_sets(
     # Prime WhatsInStandard lookup
     _ = WhatsInStandardProvider().standard_legal_set_codes
 
-    for set_to_build in sets_to_build:
-        # Build the full set
-        mtgjson_set = build_mtgjson_set(set_to_build)
+    set_workers = max(1, set_workers)
+    if set_workers > 1:
+        LOGGER.info(f"Building up to {set_workers} sets at a time")
+        # Providers that download on creation are primed up front,
+        # so concurrent set builds don't each create their own copy
+        for provider in (
+            CardMarketProvider,
+            GathererProvider,
+            GitHubBoostersProvider,
+            GitHubCardSealedProductsProvider,
+            GitHubSealedProvider,
+        ):
+            provider()
+
+    # imap() hands back results in submission order, so the referral
+    # map and set files are written in the same order as a serial build
+    pool = gevent.pool.Pool(set_workers)
+    sets_built = []
+    for set_code, mtgjson_set in zip(
+        sets_to_build,
+        pool.imap(build_mtgjson_set, sets_to_build, maxsize=set_workers),
+    ):
         if not mtgjson_set:
             continue
 
         # Handle referral components
         if include_referrals:
-            build_and_write_referral_map(mtgjson_set)
+            referral_map = build_referral_map(mtgjson_set)
+            write_referral_map(referral_map)
+            if set_referrals is not None:
+                set_referrals[set_code] = referral_map
 
         # Dump set out to file
         write_to_file(
@@ -58,10 +97,75 @@ def build_mtgjson_sets(
             file_contents=mtgjson_set,
             pretty_print=output_pretty,
         )
+        sets_built.append(set_code)
+
+    MtgjsonOracleCache().log_statistics()
+    MtgjsonOracleCache().save()
 
     if sets_to_build and include_referrals:
         fixup_referral_map()
 
+    return sets_built
+
+
+def build_mtgjson_sets_incrementally(
+    sets_to_build: List[str],
+    output_pretty: bool,
+    include_referrals: bool,
+    set_workers: int = 1,
+) -> None:
+    """
+    Build only the sets whose upstream inputs changed since they were last
+    built, reusing the set files and referrals of the others
+    :param sets_to_build: Sets to construct, if changed
+    :param output_pretty: Should we dump minified
+    :param include_referrals: Should we include referrals
+    :param set_workers: How many sets can be fingerprinted or built at once
+    """
+    from mtgjson5.build_manifest import MtgjsonBuildManifest
+    from mtgjson5.referral_builder import fixup_referral_map, write_referral_map
+
+    build_manifest = MtgjsonBuildManifest()
+
+    pool = gevent.pool.Pool(max(1, set_workers))
+    set_fingerprints = dict(
+        zip(sets_to_build, pool.imap(build_manifest.get_set_fingerprint, sets_to_build))
+    )
+
+    changed_sets = [
+        set_code
+        for set_code, fingerprint in set_fingerprints.items()
+        if not fingerprint
+        or not build_manifest.reuse_set_file(
+            set_code, fingerprint, output_pretty, include_referrals
+        )
+    ]
+    reused_sets = [
+        set_code for set_code in sets_to_build if set_code not in changed_sets
+    ]
+    LOGGER.info(
+        f"Reusing {len(reused_sets)} unchanged sets, rebuilding {len(changed_sets)}"
+    )
+
+    if include_referrals:
+        for set_code in reused_sets:
+            write_referral_map(build_manifest.get_set_referrals(set_code))
+
+    set_referrals: Dict[str, List[Tuple[str, str]]] = {}
+    for set_code in build_mtgjson_sets(
+        changed_sets, output_pretty, include_referrals, set_workers, set_referrals
+    ):
+        fingerprint = set_fingerprints[set_code]
+        if fingerprint:
+            build_manifest.record_set(
+                set_code, fingerprint, set_referrals.get(set_code)
+            )
+    build_manifest.save()
+
+    # Building sets sorts the referral map, unless every set was reused
+    if include_referrals and reused_sets and not changed_sets:
+        fixup_referral_map()
+
 
 def validate_config_file_in_place() -> None:
     """
@@ -93,6 +197,8 @@ def dispatcher(args: argparse.Namespace) -> None:
     from mtgjson5.price_builder import build_prices
     from mtgjson5.providers import GitHubMTGSqliteProvider, ScryfallProvider
 
+    MtgjsonConfig().inline_compression = args.compress and args.inline_compression
+
     # If a price build, simply build prices and exit
     if args.price_build:
         generate_compiled_prices_output(*build_prices(), args.pretty)
@@ -107,7 +213,17 @@ def dispatcher(args: argparse.Namespace) -> None:
         additional_set_keys -= set(args.skip_sets)
         sets_to_build = list(set(sets_to_build).union(additional_set_keys))
     if sets_to_build:
-        build_mtgjson_sets(sorted(sets_to_build), args.pretty, args.referrals)
+        set_workers = args.set_workers or int(
+            MtgjsonConfig().get("MTGJSON", "set_workers", fallback="1")
+        )
+        if args.incremental:
+            build_mtgjson_sets_incrementally(
+                sorted(sets_to_build), args.pretty, args.referrals, set_workers
+            )
+        else:
+            build_mtgjson_sets(
+                sorted(sets_to_build), args.pretty, args.referrals, set_workers
+            )
 
     if args.full_build:
         generate_compiled_output_files(args.pretty)
@@ -129,7 +245,7 @@ def main() -> None:
     """
     from mtgjson5.arg_parser import parse_args
     from mtgjson5.mtgjson_config import MtgjsonConfig
-    from mtgjson5.utils import send_push_notification
+    from mtgjson5.utils import log_session_statistics, send_push_notification
 
     args = parse_args()
     if args.aws_ssm_download_config:
@@ -146,6 +262,7 @@ def main() -> None:
         if not args.no_alerts:
             send_push_notification(f"Starting build\n{args}")
         dispatcher(args)
+        log_session_statistics()
         if not args.no_alerts:
             send_push_notification("Build finished")
     except Exception as error:
@@ -0,0 +1,344 @@
+"""
+MTGJSON AllPrintings sinks, to build every output derived from
+AllPrintings while each set is only read and parsed once
+"""
+import abc
+import json
+import logging
+import sqlite3
+from typing import Any, Dict, List, Optional, Set
+
+from . import constants
+from .classes import MtgjsonCardObject
+from .compiled_classes import (
+    MtgjsonAtomicCardsObject,
+    MtgjsonEnumValuesObject,
+    MtgjsonSetListObject,
+    MtgjsonStructuresObject,
+)
+from .mtgjson_config import MtgjsonConfig
+from .mtgjson_stream_writer import MtgjsonStreamWriter
+from .providers.github_decks import (
+    DeckCardIndex,
+    GitHubDecksProvider,
+    add_set_to_deck_card_index,
+)
+from .utils import sort_internal_lists
+
+LOGGER = logging.getLogger(__name__)
+
+
+class AbstractAllPrintingsSink(abc.ABC):
+    """
+    Receives every set of AllPrintings, in set code order, as part
+    of a single pass over the set files. Sinks must not modify the
+    set contents they are given, as other sinks share them
+    """
+
+    @abc.abstractmethod
+    def add_set(self, set_code: str, set_contents: Dict[str, Any]) -> None:
+        """
+        Consume a single set
+        :param set_code: Set code the set is stored under in AllPrintings
+        :param set_contents: Contents of the set
+        """
+
+    def close(self) -> None:
+        """
+        Called once every set has been added
+        """
+
+    def discard(self) -> None:
+        """
+        Called instead of close() if the sets couldn't all be added,
+        so no partial output is left behind
+        """
+
+
+class AllPrintingsFileSink(AbstractAllPrintingsSink):
+    """
+    Writes AllPrintings.json as sets come in
+    """
+
+    __writer: MtgjsonStreamWriter
+
+    def __init__(self, pretty_print: bool) -> None:
+        """
+        Open AllPrintings for writing
+        :param pretty_print: Pretty or minimal
+        """
+        compiled_name = MtgjsonStructuresObject().all_printings
+        LOGGER.info(f"Generating {compiled_name}")
+        self.__writer = MtgjsonStreamWriter(
+            MtgjsonConfig().output_path.joinpath(f"{compiled_name}.json"),
+            pretty_print,
+        )
+
+    def add_set(self, set_code: str, set_contents: Dict[str, Any]) -> None:
+        self.__writer.write(set_code, set_contents)
+
+    def close(self) -> None:
+        self.__writer.close()
+
+    def discard(self) -> None:
+        self.__writer.discard()
+
+
+class FormatPrintingsSink(AbstractAllPrintingsSink):
+    """
+    Writes the <FORMAT>.json files as sets come in, with the
+    normal sets that are entirely legal in each format
+    """
+
+    __writers: Dict[str, MtgjsonStreamWriter]
+
+    def __init__(self, pretty_print: bool) -> None:
+        """
+        Open each format file for writing
+        :param pretty_print: Pretty or minimal
+        """
+        self.__writers = {}
+        for magic_format, compiled_name in {
+            "standard": MtgjsonStructuresObject().all_printings_standard,
+            "pioneer": MtgjsonStructuresObject().all_printings_pioneer,
+            "modern": MtgjsonStructuresObject().all_printings_modern,
+            "legacy": MtgjsonStructuresObject().all_printings_legacy,
+            "vintage": MtgjsonStructuresObject().all_printings_vintage,
+        }.items():
+            LOGGER.info(f"Generating {compiled_name}")
+            self.__writers[magic_format] = MtgjsonStreamWriter(
+                MtgjsonConfig().output_path.joinpath(f"{compiled_name}.json"),
+                pretty_print,
+            )
+
+    @staticmethod
+    def get_set_legal_formats(
+        set_contents: Dict[str, Any], normal_sets_only: bool = True
+    ) -> Set[str]:
+        """
+        Determine what format(s) every card in a set is legal in
+        :param set_contents: Contents of the set
+        :param normal_sets_only: Should we only handle normal sets
+        :return: Formats the set is legal in
+        """
+        if (
+            normal_sets_only
+            and set_contents.get("type") not in constants.SUPPORTED_SET_TYPES
+        ):
+            return set()
+
+        formats_set_legal_in = constants.SUPPORTED_FORMAT_OUTPUTS
+        for card in set_contents.get("cards", []):
+            # Don't include Alchemy cards in determining legality
+            if card.get("name", "").startswith("A-"):
+                continue
+
+            card_legalities = set(card.get("legalities").keys())
+            formats_set_legal_in = formats_set_legal_in.intersection(card_legalities)
+
+        return formats_set_legal_in
+
+    def add_set(self, set_code: str, set_contents: Dict[str, Any]) -> None:
+        for magic_format in self.get_set_legal_formats(set_contents):
+            if magic_format in self.__writers:
+                self.__writers[magic_format].write(set_code, set_contents)
+
+    def close(self) -> None:
+        for writer in self.__writers.values():
+            writer.close()
+
+    def discard(self) -> None:
+        for writer in self.__writers.values():
+            writer.discard()
+
+
+class AllIdentifiersSink(AbstractAllPrintingsSink):
+    """
+    Writes AllIdentifiers.json, ordered by UUID. Cards wait in a temporary
+    SQLite database until every set has been added, instead of in memory
+    """
+
+    __pretty_print: bool
+    __connection: sqlite3.Connection
+
+    def __init__(self, pretty_print: bool) -> None:
+        """
+        Open the temporary database of cards
+        :param pretty_print: Pretty or minimal
+        """
+        self.__pretty_print = pretty_print
+        # An empty path is a database on disk, removed once it's closed
+        self.__connection = sqlite3.connect("")
+        self.__connection.execute(
+            "CREATE TABLE cards (uuid TEXT PRIMARY KEY, card TEXT) WITHOUT ROWID"
+        )
+
+    def add_set(self, set_code: str, set_contents: Dict[str, Any]) -> None:
+        with self.__connection:
+            for card in set_contents.get("cards", []) + set_contents.get("tokens", []):
+                if self.__connection.execute(
+                    "INSERT OR IGNORE INTO cards VALUES (?, ?)",
+                    (card["uuid"], json.dumps(card, ensure_ascii=False)),
+                ).rowcount:
+                    continue
+
+                (first_card,) = self.__connection.execute(
+                    "SELECT card FROM cards WHERE uuid = ?", (card["uuid"],)
+                ).fetchone()
+                LOGGER.error(
+                    f"Duplicate MTGJSON UUID {card['uuid']} detected!\n"
+                    f"Card 1: {json.loads(first_card)}\n"
+                    f"Card 2: {card}"
+                )
+
+    def close(self) -> None:
+        compiled_name = MtgjsonStructuresObject().all_identifiers
+        LOGGER.info(f"Generating {compiled_name}")
+        try:
+            with MtgjsonStreamWriter(
+                MtgjsonConfig().output_path.joinpath(f"{compiled_name}.json"),
+                self.__pretty_print,
+            ) as writer:
+                for uuid, card in self.__connection.execute(
+                    "SELECT uuid, card FROM cards ORDER BY uuid"
+                ):
+                    writer.write(uuid, json.loads(card))
+        finally:
+            self.__connection.close()
+
+    def discard(self) -> None:
+        self.__connection.close()
+
+
+class AtomicCardsSink(AbstractAllPrintingsSink):
+    """
+    Collects AtomicCards.json and the <FORMAT>Atomic.json files
+    """
+
+    atomic_cards: MtgjsonAtomicCardsObject
+    atomic_cards_by_format: Dict[str, MtgjsonAtomicCardsObject]
+    __valid_keys: List[str]
+
+    def __init__(self) -> None:
+        self.atomic_cards = MtgjsonAtomicCardsObject(load_set_files=False)
+        self.atomic_cards_by_format = {
+            magic_format: MtgjsonAtomicCardsObject(load_set_files=False)
+            for magic_format in constants.SUPPORTED_FORMAT_OUTPUTS
+        }
+        self.__valid_keys = MtgjsonCardObject().get_atomic_keys()
+
+    @staticmethod
+    def get_set_cards_by_format(
+        set_contents: Dict[str, Any]
+    ) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Determine which cards of a set are legal in each format
+        :param set_contents: Contents of the set
+        :return: Cards legal in each format
+        """
+        set_cards: List[Dict[str, Any]] = list(set_contents.get("cards", []))
+
+        # Workaround for Dungeons so they can be included
+        for token in set_contents.get("tokens", []):
+            if token.get("type") == "Dungeon":
+                set_cards.append(
+                    {
+                        **token,
+                        "legalities": {
+                            t_format: "Legal"
+                            for t_format in constants.SUPPORTED_FORMAT_OUTPUTS
+                        },
+                    }
+                )
+
+        return {
+            magic_format: [
+                card
+                for card in set_cards
+                if card.get("legalities", {}).get(magic_format)
+                in {"Legal", "Restricted"}
+            ]
+            for magic_format in constants.SUPPORTED_FORMAT_OUTPUTS
+        }
+
+    def add_set(self, set_code: str, set_contents: Dict[str, Any]) -> None:
+        self.atomic_cards.update_global_card_list(
+            MtgjsonAtomicCardsObject.get_set_cards(set_contents), self.__valid_keys
+        )
+
+        for magic_format, format_cards in self.get_set_cards_by_format(
+            set_contents
+        ).items():
+            self.atomic_cards_by_format[magic_format].update_global_card_list(
+                format_cards, self.__valid_keys
+            )
+
+
+class SetListSink(AbstractAllPrintingsSink):
+    """
+    Collects the set summaries for SetList.json
+    """
+
+    __set_list: List[Dict[str, Any]]
+
+    def __init__(self) -> None:
+        self.__set_list = []
+
+    def add_set(self, set_code: str, set_contents: Dict[str, Any]) -> None:
+        set_list_entry = MtgjsonSetListObject.get_set_list_entry(set_contents)
+        if set_list_entry:
+            self.__set_list.append(set_list_entry)
+
+    def get_set_list(self) -> MtgjsonSetListObject:
+        """
+        :return: SetList of every set added
+        """
+        return MtgjsonSetListObject(self.__set_list)
+
+
+class EnumValuesSink(AbstractAllPrintingsSink):
+    """
+    Collects the set and card enums for EnumValues.json, which
+    can only be written once the decks and keywords are
+    """
+
+    __type_map: Dict[str, Any]
+    __set_and_card_enums: Optional[Dict[str, Any]]
+
+    def __init__(self) -> None:
+        self.__type_map = MtgjsonEnumValuesObject.new_set_and_card_type_map()
+        self.__set_and_card_enums = None
+
+    def add_set(self, set_code: str, set_contents: Dict[str, Any]) -> None:
+        MtgjsonEnumValuesObject.add_set_to_type_map(self.__type_map, set_contents)
+
+    def close(self) -> None:
+        self.__set_and_card_enums = dict(sort_internal_lists(self.__type_map))
+
+    def get_enum_values(self) -> MtgjsonEnumValuesObject:
+        """
+        :return: EnumValues, using the set and card enums collected
+        """
+        return MtgjsonEnumValuesObject(self.__set_and_card_enums)
+
+
+class DeckCardIndexSink(AbstractAllPrintingsSink):
+    """
+    Indexes the cards the pre-constructed decks use by set and UUID,
+    so decks can be built without holding every card of AllPrintings
+    """
+
+    deck_card_index: DeckCardIndex
+    __deck_card_uuids: Dict[str, Set[str]]
+
+    def __init__(self) -> None:
+        self.deck_card_index = {}
+        self.__deck_card_uuids = GitHubDecksProvider().get_precon_deck_card_uuids()
+
+    def add_set(self, set_code: str, set_contents: Dict[str, Any]) -> None:
+        add_set_to_deck_card_index(
+            self.deck_card_index,
+            set_code,
+            set_contents,
+            self.__deck_card_uuids.get(set_code.upper(), set()),
+        )
@@ -53,12 +53,24 @@ def parse_args() -> argparse.Namespace:
         action="store_true",
         help="While determining what sets to build, ignore individual set files found in the output directory.",
     )
+    parser.add_argument(
+        "--incremental",
+        "-I",
+        action="store_true",
+        help="Only rebuild sets whose upstream data changed since they were last built, reusing the other set files.",
+    )
     parser.add_argument(
         "--compress",
         "-z",
         action="store_true",
         help="Compress the output folder's contents for distribution.",
     )
+    parser.add_argument(
+        "--inline-compression",
+        "-IC",
+        action="store_true",
+        help="With --compress, compress each JSON output while it is written, instead of re-reading it afterwards.",
+    )
     parser.add_argument(
         "--pretty",
         "-p",
@@ -74,6 +86,13 @@ def parse_args() -> argparse.Namespace:
         default=[],
         help="Purposely exclude sets from the build that may have been set using --sets or --all-sets.",
     )
+    parser.add_argument(
+        "--set-workers",
+        "-SW",
+        type=int,
+        metavar="N",
+        help="Build up to N sets at the same time. Defaults to the config's set_workers value, or 1.",
+    )
 
     mtgjson_arg_group = parser.add_argument_group("mtgjson maintainer arguments")
     mtgjson_arg_group.add_argument(
@@ -120,11 +139,16 @@ def parse_args() -> argparse.Namespace:
         parsed_args.all_sets = bool(os.environ.get("ALL_SETS", False))
         parsed_args.full_build = bool(os.environ.get("FULL_BUILD", False))
         parsed_args.resume_build = bool(os.environ.get("RESUME_BUILD", False))
+        parsed_args.incremental = bool(os.environ.get("INCREMENTAL", False))
         parsed_args.compress = bool(os.environ.get("COMPRESS", False))
+        parsed_args.inline_compression = bool(
+            os.environ.get("INLINE_COMPRESSION", False)
+        )
         parsed_args.pretty = bool(os.environ.get("PRETTY", False))
         parsed_args.skip_sets = list(
             filter(None, os.environ.get("SKIP_SETS", "").split(","))
         )
+        parsed_args.set_workers = int(os.environ.get("SET_WORKERS", 0)) or None
         parsed_args.price_build = bool(os.environ.get("PRICE_BUILD", False))
         parsed_args.referrals = bool(os.environ.get("REFERRALS", False))
         parsed_args.no_alerts = bool(os.environ.get("NO_ALERTS", False))
@@ -0,0 +1,408 @@
+"""
+MTGJSON Build Manifest, to only rebuild sets whose upstream inputs changed
+"""
+import datetime
+import json
+import logging
+import pathlib
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from . import constants
+from .classes import MtgjsonMetaObject
+from .mtgjson_config import MtgjsonConfig
+from .output_generator import write_to_file
+from .providers import (
+    CardMarketProvider,
+    EdhrecProviderCardRanks,
+    FandomProviderSecretLair,
+    GathererProvider,
+    GitHubBoostersProvider,
+    GitHubCardSealedProductsProvider,
+    GitHubDecksProvider,
+    GitHubSealedProvider,
+    MTGBanProvider,
+    MultiverseBridgeProvider,
+    ScryfallProvider,
+    ScryfallProviderOrientationDetector,
+    ScryfallProviderSetLanguageDetector,
+    WhatsInStandardProvider,
+)
+from .set_builder import get_scryfall_set_data, parse_printings, parse_rulings
+from .utils import get_all_cards_and_tokens_from_content
+
+LOGGER = logging.getLogger(__name__)
+
+
+class MtgjsonBuildManifest:
+    """
+    Records a fingerprint of each set built, hashing the raw provider
+    payloads the set was built from along with the builder version, so
+    later builds can reuse set files whose inputs have not changed.
+    The manifest lives outside of the versioned build directories,
+    so set files can be reused from one day's build to the next.
+    Reused set files are still rebuilt once they reach a maximum age,
+    so inputs that aren't fingerprinted can't keep them stale for long
+    """
+
+    manifest_path: pathlib.Path
+    builder_version: str
+    max_age_days: int
+    __sets: Dict[str, Dict[str, Any]]
+
+    def __init__(self, manifest_path: Optional[pathlib.Path] = None) -> None:
+        """
+        Load the manifest of previous builds
+        :param manifest_path: Where the manifest is kept
+        """
+        self.manifest_path = manifest_path or constants.ENV_OUT_PATH.joinpath(
+            "mtgjson_build_manifest.json"
+        )
+        self.builder_version = get_builder_version()
+        self.max_age_days = int(
+            MtgjsonConfig().get("MTGJSON", "incremental_max_age_days", fallback="7")
+        )
+        self.__sets = {}
+
+        if not self.manifest_path.is_file():
+            return
+
+        with self.manifest_path.open(encoding="utf-8") as file:
+            manifest = json.load(file)
+
+        if manifest.get("builderVersion") != self.builder_version:
+            LOGGER.info("Builder changed since the last build, rebuilding all sets")
+            return
+
+        self.__sets = manifest.get("sets", {})
+
+    def get_set_fingerprint(self, set_code: str) -> Optional[str]:
+        """
+        Fingerprint the raw provider payloads a set is built from, through
+        the same lookups the set builder makes. Printings and rulings go
+        through the oracle cache, so building the set afterwards reuses them
+        :param set_code: Set to fingerprint
+        :return: Fingerprint, or None if the set can't be fingerprinted
+        """
+        set_data = get_scryfall_set_data(set_code)
+        if not set_data:
+            # Sets only found in local data are cheap, so always build them
+            return None
+
+        set_name = set_data["name"].strip()
+        mcm_id = CardMarketProvider().get_set_id(set_name)
+        mcm_id_extras = CardMarketProvider().get_extras_set_id(set_name)
+
+        scryfall_cards = ScryfallProvider().download_cards(set_code)
+        scryfall_tokens = ScryfallProvider().download_cards(f"T{set_code}")
+        scryfall_objects = scryfall_cards + scryfall_tokens
+        oracle_lookups = get_oracle_lookups(scryfall_objects)
+        card_set_codes = sorted({card["set"] for card in scryfall_objects})
+        rosetta_stone_cards = MultiverseBridgeProvider().get_rosetta_stone_cards()
+        set_languages = (
+            ScryfallProviderSetLanguageDetector().get_set_printing_languages(
+                set_code.upper()
+            )
+        )
+
+        return get_payloads_hash(
+            {
+                "builderVersion": self.builder_version,
+                "scryfallSet": set_data,
+                "scryfallCards": scryfall_cards,
+                "scryfallTokens": scryfall_tokens,
+                "scryfallForeignCards": {
+                    card_set_code: ScryfallProvider().download_foreign_cards(
+                        card_set_code
+                    )
+                    for card_set_code in card_set_codes
+                },
+                "scryfallPrintings": {
+                    oracle_id: parse_printings(prints_url, oracle_id)
+                    for oracle_id, (prints_url, _) in oracle_lookups.items()
+                },
+                "scryfallRulings": {
+                    oracle_id: parse_rulings(rulings_url, oracle_id)
+                    for oracle_id, (_, rulings_url) in oracle_lookups.items()
+                },
+                "scryfallSetLanguages": set_languages,
+                "gathererCards": {
+                    multiverse_id: GathererProvider().get_cards(multiverse_id)
+                    for multiverse_id in get_multiverse_ids(scryfall_objects)
+                },
+                "multiverseBridgeCards": {
+                    card["id"]: rosetta_stone_cards.get(card["id"])
+                    for card in scryfall_cards
+                },
+                "multiverseBridgeSet": MultiverseBridgeProvider()
+                .get_rosetta_stone_sets()
+                .get(set_code.upper()),
+                "whatsInStandard": [
+                    card_set_code.upper() in WhatsInStandardProvider().set_codes
+                    for card_set_code in card_set_codes
+                ],
+                "isPartialPreview": MtgjsonMetaObject().date < set_data["released_at"],
+                "cardMarketCards": CardMarketProvider().get_mkm_cards(mcm_id),
+                "cardMarketExtrasCards": CardMarketProvider().get_mkm_cards(
+                    mcm_id_extras
+                ),
+                "gitHubBoosters": GitHubBoostersProvider().get_set_booster_data(
+                    set_code
+                ),
+                "gitHubSealedProducts": GitHubSealedProvider().sealed_products.get(
+                    set_code.lower()
+                ),
+                "gitHubSealedContents": GitHubSealedProvider().sealed_contents.get(
+                    set_code.lower()
+                ),
+                "gitHubDecks": GitHubDecksProvider().get_decks_in_set(set_code),
+                "fandomSecretLair": (
+                    FandomProviderSecretLair().download()
+                    if set_data["code"].upper() == "SLD"
+                    else None
+                ),
+                "scryfallOrientations": (
+                    ScryfallProviderOrientationDetector().get_uuid_to_orientation_map(
+                        set_data["code"].upper()
+                    )
+                    if "Art Series" in set_name
+                    else None
+                ),
+            }
+        )
+
+    def reuse_set_file(
+        self,
+        set_code: str,
+        fingerprint: str,
+        pretty_print: bool,
+        include_referrals: bool = False,
+    ) -> bool:
+        """
+        Reuse a previously built set file, if the set's inputs are unchanged.
+        The set file is written out again with this build's meta
+        :param set_code: Set to reuse
+        :param fingerprint: Fingerprint of the set's current inputs
+        :param pretty_print: Pretty or minimal
+        :param include_referrals: If the set's referrals are needed too
+        :return: If the set file was reused, and the set doesn't need building
+        """
+        built_set = self.__sets.get(set_code)
+        if not built_set or built_set["fingerprint"] != fingerprint:
+            return False
+
+        # Referrals come from purchase URLs that aren't in the set file,
+        # so only sets recorded with their referrals can provide them
+        if include_referrals and built_set.get("referrals") is None:
+            return False
+
+        oldest_build_date = (
+            datetime.date.today() - datetime.timedelta(days=self.max_age_days)
+        ).isoformat()
+        if built_set["builtAt"] < oldest_build_date:
+            return False
+
+        built_file = pathlib.Path(built_set["outputFile"])
+        if not built_file.is_file():
+            return False
+
+        set_contents = read_set_contents(built_file)
+        if built_set["cardInputsFingerprint"] != get_card_inputs_fingerprint(
+            set_contents
+        ):
+            return False
+
+        output_file = get_set_output_file(set_code)
+        write_to_file(output_file.stem, set_contents, pretty_print)
+        built_set["outputFile"] = str(output_file)
+
+        return True
+
+    def get_set_referrals(self, set_code: str) -> List[Tuple[str, str]]:
+        """
+        :param set_code: Set that was recorded
+        :return: Referrals of the set, as they were when it was built
+        """
+        return [
+            (referral_key, referral_url)
+            for referral_key, referral_url in self.__sets[set_code].get("referrals")
+            or []
+        ]
+
+    def record_set(
+        self,
+        set_code: str,
+        fingerprint: str,
+        referrals: Optional[List[Tuple[str, str]]] = None,
+    ) -> None:
+        """
+        Record a set that was just built
+        :param set_code: Set that was built
+        :param fingerprint: Fingerprint of the inputs it was built from
+        :param referrals: Referrals of the set, if they were built
+        """
+        output_file = get_set_output_file(set_code)
+        self.__sets[set_code] = {
+            "fingerprint": fingerprint,
+            "cardInputsFingerprint": get_card_inputs_fingerprint(
+                read_set_contents(output_file)
+            ),
+            "outputFile": str(output_file),
+            "builtAt": constants.MTGJSON_BUILD_DATE,
+            "referrals": referrals,
+        }
+
+    def save(self) -> None:
+        """
+        Write the manifest out for the next build
+        """
+        self.manifest_path.parent.mkdir(parents=True, exist_ok=True)
+        with self.manifest_path.open("w", encoding="utf-8") as file:
+            json.dump(
+                {
+                    "builderVersion": self.builder_version,
+                    "updatedAt": datetime.datetime.now().isoformat(),
+                    "sets": self.__sets,
+                },
+                file,
+                indent=4,
+                sort_keys=True,
+            )
+
+
+def get_set_output_file(set_code: str) -> pathlib.Path:
+    """
+    :param set_code: Set to find
+    :return: Where the set file is written in this build
+    """
+    file_name = set_code + "_" if set_code in constants.BAD_FILE_NAMES else set_code
+    return MtgjsonConfig().output_path.joinpath(f"{file_name}.json")
+
+
+def get_builder_version() -> str:
+    """
+    Version of the builder, covering both the configured MTGJSON version
+    and the code and resources sets are built with, so any change
+    to how sets are built will rebuild them all
+    :return: Builder version
+    """
+    hash_operation = constants.HASH_TO_GENERATE.copy()
+    hash_operation.update(
+        MtgjsonConfig().mtgjson_version.split("+", maxsplit=1)[0].encode()
+    )
+
+    package_path = constants.TOP_LEVEL_DIR.joinpath("mtgjson5")
+    source_files = list(package_path.glob("**/*.py")) + list(
+        constants.RESOURCE_PATH.glob("*.json")
+    )
+    for source_file in sorted(source_files):
+        hash_operation.update(str(source_file.relative_to(package_path)).encode())
+        hash_operation.update(source_file.read_bytes())
+
+    return hash_operation.hexdigest()
+
+
+def get_payloads_hash(payloads: Dict[str, Any]) -> str:
+    """
+    :param payloads: Provider payloads, by provider
+    :return: Hash of the payloads
+    """
+    hash_operation = constants.HASH_TO_GENERATE.copy()
+    hash_operation.update(
+        json.dumps(payloads, sort_keys=True, default=lambda o: o.to_json()).encode()
+    )
+    return hash_operation.hexdigest()
+
+
+def get_oracle_lookups(
+    scryfall_objects: Iterable[Dict[str, Any]]
+) -> Dict[str, Tuple[str, str]]:
+    """
+    Find the printings and rulings lookups the set builder makes, which
+    are shared by every card and face with the same oracle ID
+    :param scryfall_objects: Scryfall cards and tokens of a set
+    :return: Printings and rulings URLs, by oracle ID
+    """
+    oracle_lookups: Dict[str, Tuple[str, str]] = {}
+    for scryfall_object in scryfall_objects:
+        oracle_ids: List[Optional[str]] = [scryfall_object.get("oracle_id")] + [
+            face.get("oracle_id") for face in scryfall_object.get("card_faces", [])
+        ]
+        for oracle_id in filter(None, oracle_ids):
+            oracle_lookups.setdefault(
+                oracle_id,
+                (
+                    scryfall_object["prints_search_uri"].replace("%22", ""),
+                    scryfall_object["rulings_uri"],
+                ),
+            )
+
+    return dict(sorted(oracle_lookups.items()))
+
+
+def get_multiverse_ids(scryfall_objects: Iterable[Dict[str, Any]]) -> List[str]:
+    """
+    :param scryfall_objects: Scryfall cards and tokens of a set
+    :return: Multiverse IDs the set builder looks up Gatherer data for
+    """
+    return sorted(
+        {
+            str(multiverse_id)
+            for scryfall_object in scryfall_objects
+            for multiverse_id in scryfall_object.get("multiverse_ids", [])
+        }
+    )
+
+
+def read_set_contents(set_file: pathlib.Path) -> Dict[str, Any]:
+    """
+    :param set_file: Built set file
+    :return: Contents of the set, without the file's meta
+    """
+    with set_file.open(encoding="utf-8") as file:
+        set_contents: Dict[str, Any] = json.load(file).get("data", {})
+    return set_contents
+
+
+def get_card_inputs_fingerprint(set_contents: Dict[str, Any]) -> str:
+    """
+    Fingerprint the inputs keyed by the UUIDs and names of a set's cards,
+    like the sealed products they're found in, their CardKingdom listings,
+    and their EDHREC salt ratings. UUIDs and final card names are only
+    known once a set is built, so these are fingerprinted apart from
+    the inputs of the set
+    :param set_contents: Contents of a built set file
+    :return: Fingerprint
+    """
+    cards = [
+        card
+        for card in get_all_cards_and_tokens_from_content({"": set_contents})
+        if "uuid" in card
+    ]
+    card_kingdom_cards = MTGBanProvider().get_mtgjson_to_card_kingdom()
+
+    # Only cards of Alchemy sets have their spellbooks looked up
+    spellbooks: Dict[str, List[str]] = {}
+    if "alchemy" in set_contents.get("type", ""):
+        alchemy_cards = set(ScryfallProvider().get_alchemy_cards_with_spellbooks())
+        for card_name in sorted({card["name"] for card in cards} & alchemy_cards):
+            spellbooks[card_name] = ScryfallProvider().get_card_names_in_spellbook(
+                card_name
+            )
+
+    return get_payloads_hash(
+        {
+            card["uuid"]: {
+                "cardProducts": GitHubCardSealedProductsProvider().get_products_card_found_in(
+                    card["uuid"]
+                ),
+                "cardKingdom": card_kingdom_cards.get(card["uuid"]),
+                "edhrecSaltiness": EdhrecProviderCardRanks().get_salt_rating(
+                    card["name"]
+                ),
+                "hasAlternativeDeckLimit": card["name"]
+                in ScryfallProvider().cards_without_limits,
+                "spellbook": spellbooks.get(card["name"]),
+            }
+            for card in cards
+        }
+    )
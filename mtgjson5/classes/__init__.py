@@ -11,7 +11,7 @@ from .mtgjson_identifiers import MtgjsonIdentifiersObject
 from .mtgjson_leadership_skills import MtgjsonLeadershipSkillsObject
 from .mtgjson_legalities import MtgjsonLegalitiesObject
 from .mtgjson_meta import MtgjsonMetaObject
-from .mtgjson_prices import MtgjsonPricesObject
+from .mtgjson_prices import MtgjsonPricesAccumulator, MtgjsonPricesObject
 from .mtgjson_purchase_urls import MtgjsonPurchaseUrlsObject
 from .mtgjson_related_cards import MtgjsonRelatedCardsObject
 from .mtgjson_rulings import MtgjsonRulingObject
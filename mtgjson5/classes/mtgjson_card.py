@@ -1,10 +1,20 @@
 """
 MTGJSON Singular Card Object
 """
-import json
-from typing import Any, Dict, List, Optional, Set
+from typing import (
+    Any,
+    Callable,
+    ClassVar,
+    Dict,
+    Generic,
+    List,
+    Optional,
+    Tuple,
+    Type,
+    TypeVar,
+    overload,
+)
 
-from .. import constants
 from ..classes.mtgjson_foreign_data import MtgjsonForeignDataObject
 from ..classes.mtgjson_game_formats import MtgjsonGameFormatsObject
 from ..classes.mtgjson_identifiers import MtgjsonIdentifiersObject
@@ -14,14 +24,174 @@ from ..classes.mtgjson_prices import MtgjsonPricesObject
 from ..classes.mtgjson_purchase_urls import MtgjsonPurchaseUrlsObject
 from ..classes.mtgjson_related_cards import MtgjsonRelatedCardsObject
 from ..classes.mtgjson_rulings import MtgjsonRulingObject
+from ..mtgjson_resources import MtgjsonResources
 from ..utils import to_camel_case
 
+# Marks slots that have not been set
+_UNSET = object()
+
+_T = TypeVar("_T")
+
+
+class _LazyAttribute(Generic[_T]):
+    """
+    Card attribute kept in a private slot, and only built once it's used.
+    Deleting it leaves it empty, so it isn't built again
+    """
+
+    def __init__(self, factory: Callable[[], _T]) -> None:
+        """
+        :param factory: Builds the attribute's initial value
+        """
+        self.factory = factory
+        self.slot_name = ""
+
+    def __set_name__(self, owner: Type[Any], name: str) -> None:
+        """
+        Find the slot the attribute is kept in
+        """
+        self.slot_name = f"_{owner.__name__}__{name}"
+
+    @overload
+    def __get__(self, instance: None, owner: Type[Any]) -> "_LazyAttribute[_T]":
+        ...
+
+    @overload
+    def __get__(self, instance: Any, owner: Type[Any]) -> _T:
+        ...
+
+    def __get__(self, instance: Any, owner: Type[Any]) -> Any:
+        """
+        Get the attribute, building it if it's not been used yet
+        """
+        if instance is None:
+            return self
+
+        value = getattr(instance, self.slot_name, _UNSET)
+        if value is _UNSET:
+            value = self.factory()
+            setattr(instance, self.slot_name, value)
+        return value
+
+    def __set__(self, instance: Any, value: _T) -> None:
+        """
+        Set the attribute
+        """
+        setattr(instance, self.slot_name, value)
+
+    def __delete__(self, instance: Any) -> None:
+        """
+        Empty the attribute
+        """
+        setattr(instance, self.slot_name, None)
+
 
 class MtgjsonCardObject:
     """
     MTGJSON Singular Card Object
     """
 
+    # Cards are held by the hundred thousand, so keep attributes in slots
+    # instead of a per-card dictionary. Unset slots aren't serialized.
+    # Identifiers and purchase URLs are kept in private slots, and built
+    # on first use, as many cards never have any
+    __slots__ = (
+        "artist",
+        "artist_ids",
+        "ascii_name",
+        "attraction_lights",
+        "availability",
+        "booster_types",
+        "border_color",
+        "card_parts",
+        "color_identity",
+        "color_indicator",
+        "colors",
+        "converted_mana_cost",
+        "count",
+        "defense",
+        "duel_deck",
+        "edhrec_rank",
+        "edhrec_saltiness",
+        "face_converted_mana_cost",
+        "face_flavor_name",
+        "face_mana_value",
+        "face_name",
+        "finishes",
+        "first_printing",
+        "flavor_name",
+        "flavor_text",
+        "foreign_data",
+        "frame_effects",
+        "frame_version",
+        "hand",
+        "has_alternative_deck_limit",
+        "has_content_warning",
+        "has_foil",
+        "has_non_foil",
+        "__identifiers",
+        "is_alternative",
+        "is_foil",
+        "is_full_art",
+        "is_funny",
+        "is_online_only",
+        "is_oversized",
+        "is_promo",
+        "is_rebalanced",
+        "is_reprint",
+        "is_reserved",
+        "is_starter",
+        "is_story_spotlight",
+        "is_textless",
+        "is_timeshifted",
+        "keywords",
+        "language",
+        "layout",
+        "leadership_skills",
+        "legalities",
+        "life",
+        "loyalty",
+        "mana_cost",
+        "mana_value",
+        "name",
+        "number",
+        "orientation",
+        "original_printings",
+        "original_release_date",
+        "original_text",
+        "original_type",
+        "other_face_ids",
+        "power",
+        "prices",
+        "printings",
+        "promo_types",
+        "__purchase_urls",
+        "rarity",
+        "rebalanced_printings",
+        "related_cards",
+        "reverse_related",
+        "rulings",
+        "security_stamp",
+        "side",
+        "signature",
+        "source_products",
+        "subsets",
+        "subtypes",
+        "supertypes",
+        "text",
+        "toughness",
+        "type",
+        "types",
+        "uuid",
+        "variations",
+        "watermark",
+        "set_code",
+        "is_token",
+        "__raw_purchase_urls",
+        "__names",
+        "__illustration_ids",
+    )
+
     artist: str
     artist_ids: Optional[List[str]]
     ascii_name: Optional[str]
@@ -55,7 +225,6 @@ class MtgjsonCardObject:
     has_content_warning: Optional[bool]
     has_foil: Optional[bool]  # Deprecated - Remove in 5.3.0
     has_non_foil: Optional[bool]  # Deprecated - Remove in 5.3.0
-    identifiers: MtgjsonIdentifiersObject
     is_alternative: Optional[bool]
     is_foil: Optional[bool]
     is_full_art: Optional[bool]
@@ -91,7 +260,6 @@ class MtgjsonCardObject:
     prices: MtgjsonPricesObject
     printings: List[str]
     promo_types: List[str]
-    purchase_urls: MtgjsonPurchaseUrlsObject
     rarity: str
     rebalanced_printings: List[str]
     related_cards: MtgjsonRelatedCardsObject
@@ -115,10 +283,12 @@ class MtgjsonCardObject:
     # Outside entities, not published
     set_code: str
     is_token: bool
-    raw_purchase_urls: Dict[str, str]
     __names: Optional[List[str]]
     __illustration_ids: List[str]
-    __watermark_resource: Dict[str, List[Any]]
+
+    identifiers = _LazyAttribute(MtgjsonIdentifiersObject)
+    purchase_urls = _LazyAttribute(MtgjsonPurchaseUrlsObject)
+    raw_purchase_urls: _LazyAttribute[Dict[str, str]] = _LazyAttribute(dict)
 
     __allow_if_falsey = {
         "supertypes",
@@ -151,6 +321,13 @@ class MtgjsonCardObject:
 
     __remove_for_cards = {"reverse_related"}
 
+    __serialization_plans: ClassVar[
+        Dict[
+            Tuple[Type["MtgjsonCardObject"], bool],
+            Tuple[Tuple[str, str, bool, Any], ...],
+        ]
+    ] = {}
+
     __atomic_keys = [
         "ascii_name",
         "color_identity",
@@ -203,14 +380,10 @@ class MtgjsonCardObject:
         self.artist_ids = None
         self.layout = ""
         self.watermark = None
-        self.__watermark_resource = {}
         self.__names = []
         self.__illustration_ids = []
-        self.purchase_urls = MtgjsonPurchaseUrlsObject()
         self.side = None
         self.face_name = None
-        self.raw_purchase_urls = {}
-        self.identifiers = MtgjsonIdentifiersObject()
 
     def __eq__(self, other: Any) -> bool:
         """
@@ -325,17 +498,11 @@ class MtgjsonCardObject:
         if not watermark:
             return
 
-        if not self.__watermark_resource:
-            with constants.RESOURCE_PATH.joinpath("set_code_watermarks.json").open(
-                encoding="utf-8"
-            ) as f:
-                self.__watermark_resource = json.load(f)
-
         if watermark == "set":
-            for card in self.__watermark_resource.get(self.set_code.upper(), []):
-                if self.name in card["name"].split(" // "):
-                    watermark = str(card["watermark"])
-                    break
+            watermark = (
+                MtgjsonResources().get_set_watermark(self.set_code, self.name)
+                or watermark
+            )
 
         self.watermark = watermark
 
@@ -347,34 +514,60 @@ class MtgjsonCardObject:
         """
         return self.__atomic_keys
 
-    def build_keys_to_skip(self) -> Set[str]:
+    @classmethod
+    def __get_serialization_plan(
+        cls, is_token: bool
+    ) -> Tuple[Tuple[str, str, bool, Any], ...]:
         """
-        Build this object's instance of what keys to skip under certain circumstances
-        :return What keys to skip over
+        Get the attributes that can be serialized, computed once per class
+        :param is_token: If the plan is for tokens or for cards
+        :return: Slot names, their JSON keys, if they're kept when falsey,
+        and what to serialize if they're unset
         """
-        if self.is_token:
-            excluded_keys = self.__remove_for_tokens.copy()
-        else:
-            excluded_keys = self.__remove_for_cards.copy()
-
-        excluded_keys = excluded_keys.union({"is_token", "raw_purchase_urls"})
-
-        for key, value in self.__dict__.items():
-            if not value:
-                if key not in self.__allow_if_falsey:
-                    excluded_keys.add(key)
-
-        return excluded_keys
+        plan = cls.__serialization_plans.get((cls, is_token))
+        if plan is None:
+            excluded_keys = (
+                cls.__remove_for_tokens if is_token else cls.__remove_for_cards
+            ).union({"is_token", "raw_purchase_urls"})
+
+            plan_entries = []
+            for slot_name in cls.__slots__:
+                key = slot_name
+                default = None
+                lazy_attribute = getattr(cls, slot_name.lstrip("_"), None)
+                if isinstance(lazy_attribute, _LazyAttribute):
+                    # Lazy attributes that weren't used serialize as built
+                    key = slot_name.lstrip("_")
+                    slot_name = lazy_attribute.slot_name
+                    default = lazy_attribute.factory()
+                elif "__" in slot_name:
+                    continue
+
+                if key not in excluded_keys:
+                    plan_entries.append(
+                        (
+                            slot_name,
+                            to_camel_case(key),
+                            key in cls.__allow_if_falsey,
+                            default,
+                        )
+                    )
+
+            plan = tuple(plan_entries)
+            cls.__serialization_plans[(cls, is_token)] = plan
+
+        return plan
 
     def to_json(self) -> Dict[str, Any]:
         """
         Support json.dump()
         :return: JSON serialized object
         """
-        skip_keys = self.build_keys_to_skip()
-
         return {
-            to_camel_case(key): value
-            for key, value in self.__dict__.items()
-            if "__" not in key and not callable(value) and key not in skip_keys
+            json_key: value
+            for key, json_key, allow_if_falsey, default in self.__get_serialization_plan(
+                self.is_token
+            )
+            if (value := getattr(self, key, default))
+            or (allow_if_falsey and hasattr(self, key))
         }
@@ -2,7 +2,7 @@
 MTGJSON Singular Card.ForeignData Object
 """
 
-from typing import Any, Dict, Optional
+from typing import Any, ClassVar, Dict, Optional, Tuple
 
 from ..utils import to_camel_case
 
@@ -12,6 +12,16 @@ class MtgjsonForeignDataObject:
     MTGJSON Singular Card.ForeignData Object
     """
 
+    __slots__ = (
+        "language",
+        "multiverse_id",
+        "face_name",
+        "flavor_text",
+        "name",
+        "text",
+        "type",
+    )
+
     language: str
     multiverse_id: Optional[int]
     face_name: Optional[str]
@@ -20,6 +30,11 @@ class MtgjsonForeignDataObject:
     text: Optional[str]
     type: Optional[str]
 
+    # Slots and their JSON keys, computed once for every foreign data entry
+    __json_keys: ClassVar[Tuple[Tuple[str, str], ...]] = tuple(
+        (key, to_camel_case(key)) for key in __slots__
+    )
+
     def __init__(self) -> None:
         self.multiverse_id = None
         self.face_name = None
@@ -33,13 +48,8 @@ class MtgjsonForeignDataObject:
         Support json.dump()
         :return: JSON serialized object
         """
-        skip_keys = ("url", "number", "set_code")
-
         return {
-            to_camel_case(key): value
-            for key, value in self.__dict__.items()
-            if "__" not in key
-            and not callable(value)
-            and value is not None
-            and key not in skip_keys
+            json_key: value
+            for key, json_key in self.__json_keys
+            if (value := getattr(self, key, None)) is not None
         }
@@ -1,7 +1,7 @@
 """
 MTGJSON Singular Prices.Card Object
 """
-from typing import Any, Dict, Optional
+from typing import Any, Dict, Optional, Tuple
 
 
 class MtgjsonPricesObject:
@@ -54,3 +54,83 @@ class MtgjsonPricesObject:
         return_object: Dict[str, Any] = {self.source: {self.provider: buy_sell_option}}
 
         return return_object
+
+
+class MtgjsonPricesAccumulator:
+    """
+    MTGJSON Prices of every card and provider for a build, kept flat
+    by (uuid, source, provider, side, finish) until they're output,
+    instead of deep merging each provider's nested prices
+    """
+
+    __price_points: Dict[Tuple[str, str, str, str, str], Dict[str, float]]
+    __currencies: Dict[Tuple[str, str, str], str]
+
+    def __init__(self) -> None:
+        """
+        Initializer for an empty set of prices
+        """
+        self.__price_points = {}
+        self.__currencies = {}
+
+    def __len__(self) -> int:
+        """
+        :return: How many cards have prices
+        """
+        return len({uuid for uuid, _, _ in self.__currencies})
+
+    def add(self, uuid: str, prices: MtgjsonPricesObject) -> None:
+        """
+        Add a provider's prices for a card
+        :param uuid: MTGJSON UUID of the card
+        :param prices: Prices of the card from one provider
+        """
+        provider_key = (uuid, prices.source, prices.provider)
+        self.__currencies[provider_key] = prices.currency
+
+        for side, normal_price, foil_price in (
+            ("buylist", prices.buy_normal, prices.buy_foil),
+            ("retail", prices.sell_normal, prices.sell_foil),
+        ):
+            if normal_price is None and foil_price is None:
+                continue
+
+            # Both finishes are output for a side that has either price
+            for finish, price in (("normal", normal_price), ("foil", foil_price)):
+                price_points = self.__price_points.setdefault(
+                    (*provider_key, side, finish), {}
+                )
+                if price is not None:
+                    price_points[prices.date] = price
+
+    def add_all(self, today_prices: Dict[str, MtgjsonPricesObject]) -> None:
+        """
+        Add a provider's prices for many cards
+        :param today_prices: Prices of each card, by MTGJSON UUID
+        """
+        for uuid, prices in today_prices.items():
+            self.add(uuid, prices)
+
+    def to_json(self) -> Dict[str, Any]:
+        """
+        Support json.dump()
+        :return: JSON serialized object
+        """
+        return_object: Dict[str, Any] = {}
+        for (uuid, source, provider), currency in self.__currencies.items():
+            buy_sell_option: Dict[str, Any] = {}
+            for side in ("buylist", "retail"):
+                if (uuid, source, provider, side, "normal") in self.__price_points:
+                    buy_sell_option[side] = {
+                        finish: dict(
+                            self.__price_points[(uuid, source, provider, side, finish)]
+                        )
+                        for finish in ("normal", "foil")
+                    }
+            buy_sell_option["currency"] = currency
+
+            return_object.setdefault(uuid, {}).setdefault(source, {})[
+                provider
+            ] = buy_sell_option
+
+        return return_object
@@ -1,7 +1,7 @@
 """
 MTGJSON Singular Card.Rulings Object
 """
-from typing import Any, Dict
+from typing import Any, ClassVar, Dict, Tuple
 
 from ..utils import to_camel_case
 
@@ -11,9 +11,16 @@ class MtgjsonRulingObject:
     MTGJSON Singular Card.Rulings Object
     """
 
+    __slots__ = ("date", "text")
+
     date: str
     text: str
 
+    # Slots and their JSON keys, computed once for every ruling
+    __json_keys: ClassVar[Tuple[Tuple[str, str], ...]] = tuple(
+        (key, to_camel_case(key)) for key in __slots__
+    )
+
     def __init__(self, date: str, text: str) -> None:
         """
         Set the ruling date and text
@@ -26,8 +33,4 @@ class MtgjsonRulingObject:
         Support json.dump()
         :return: JSON serialized object
         """
-        return {
-            to_camel_case(key): value
-            for key, value in self.__dict__.items()
-            if "__" not in key and not callable(value)
-        }
+        return {json_key: getattr(self, key) for key, json_key in self.__json_keys}
@@ -2,7 +2,7 @@
 MTGJSON AllIdentifiers Object
 """
 import logging
-from typing import Any, Dict
+from typing import Any, Dict, Iterable, Optional
 
 from ..utils import get_all_cards_and_tokens_from_content
 
@@ -16,13 +16,23 @@ class MtgjsonAllIdentifiersObject:
 
     all_identifiers_dict: Dict[str, Any]
 
-    def __init__(self, all_printings: Dict[str, Any]) -> None:
+    def __init__(self, all_printings: Optional[Dict[str, Any]] = None) -> None:
         """
         Initialize to build up the object
+        :param all_printings: Content of AllPrintings, or None to have
+        cards added by add_cards()
         """
         self.all_identifiers_dict = {}
 
-        for card in get_all_cards_and_tokens_from_content(all_printings):
+        if all_printings:
+            self.add_cards(get_all_cards_and_tokens_from_content(all_printings))
+
+    def add_cards(self, cards: Iterable[Dict[str, Any]]) -> None:
+        """
+        Index cards and tokens by their MTGJSON UUID
+        :param cards: Cards and tokens to add
+        """
+        for card in cards:
             if card["uuid"] in self.all_identifiers_dict:
                 LOGGER.error(
                     f"Duplicate MTGJSON UUID {card['uuid']} detected!\n"
@@ -3,9 +3,8 @@ MTGJSON AllPrintings Object
 """
 import json
 import pathlib
-from typing import Dict, List, Optional
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 
-from ..classes import MtgjsonSetObject
 from ..mtgjson_config import MtgjsonConfig
 from .mtgjson_structures import MtgjsonStructuresObject
 
@@ -13,36 +12,49 @@ from .mtgjson_structures import MtgjsonStructuresObject
 class MtgjsonAllPrintingsObject:
     """
     MTGJSON AllPrintings Object
+    Sets are only read from disk when they are asked for
     """
 
-    all_sets_dict: Dict[str, MtgjsonSetObject]
+    all_sets_files: Dict[str, pathlib.Path]
 
     def __init__(self) -> None:
         """
         Initialize to build up the object
         """
-        self.all_sets_dict = {}
+        self.all_sets_files = {}
         files_to_build = self.get_files_to_build(
             MtgjsonStructuresObject().get_all_compiled_file_names()
         )
         self.iterate_all_sets(files_to_build)
 
-    def get_set_contents(
-        self, sets: Optional[List[str]] = None
-    ) -> Dict[str, MtgjsonSetObject]:
+    def get_set_contents(self, sets: Optional[List[str]] = None) -> Dict[str, Any]:
         """
         Give the contents of certain sets. Empty for all sets.
+        NOTE: Every set asked for is held in memory, prefer iterate_set_contents()
         :param sets: Sets to get. Empty for all sets.
         :return Subset of AllPrintings sets
         """
-        if sets:
-            return {
-                key: self.all_sets_dict[key]
-                for key in sets
-                if key in self.all_sets_dict
-            }
+        return dict(self.iterate_set_contents(sets))
 
-        return self.all_sets_dict
+    def iterate_set_contents(
+        self, sets: Optional[List[str]] = None
+    ) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """
+        Read the contents of certain sets one at a time, sorted by set code
+        :param sets: Sets to get. Empty for all sets.
+        :return Set codes and their contents
+        """
+        set_codes = (
+            [key for key in sets if key in self.all_sets_files]
+            if sets
+            else self.all_sets_files
+        )
+
+        for set_code in sorted(set_codes):
+            with self.all_sets_files[set_code].open(encoding="utf-8") as file:
+                file_content = json.load(file)
+
+            yield set_code, file_content.get("data", {})
 
     @staticmethod
     def get_files_to_build(files_to_ignore: List[str]) -> List[pathlib.Path]:
@@ -59,24 +71,22 @@ class MtgjsonAllPrintingsObject:
 
     def iterate_all_sets(self, files_to_build: List[pathlib.Path]) -> None:
         """
-        Iterate and all all MTGJSON sets to the dictionary
-        indexed by file name
+        Iterate and all all MTGJSON set files to the dictionary
+        indexed by set code
         :param files_to_build: Files to include
         """
         for set_file in files_to_build:
-            with set_file.open(encoding="utf-8") as file:
-                file_content = json.load(file)
-
             # Account for the CON fix
             set_code = set_file.stem
             if set_code.endswith("_"):
                 set_code = set_code[:-1]
 
-            self.all_sets_dict[set_code] = file_content.get("data", {})
+            self.all_sets_files[set_code] = set_file
 
-    def to_json(self) -> Dict[str, MtgjsonSetObject]:
+    def to_json(self) -> Dict[str, Any]:
         """
         Support json.dump()
+        NOTE: This reads every set into memory
         :return: JSON serialized object
         """
-        return self.all_sets_dict
+        return self.get_set_contents()
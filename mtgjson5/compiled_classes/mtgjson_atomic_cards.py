@@ -20,14 +20,23 @@ class MtgjsonAtomicCardsObject:
     atomic_cards_dict: Dict[str, List[Dict[str, Any]]]
     __name_regex = re.compile(r"^([^\n]+) \([a-z]\)$")
 
-    def __init__(self, cards_to_parse: Optional[List[Dict[str, Any]]] = None) -> None:
+    def __init__(
+        self,
+        cards_to_parse: Optional[List[Dict[str, Any]]] = None,
+        load_set_files: bool = True,
+    ) -> None:
         """
         Initializer to build up the object
+        :param cards_to_parse: Cards to use instead of the set files
+        :param load_set_files: Load the set files, or start empty and have
+        cards added by update_global_card_list()
         """
         self.atomic_cards_dict = defaultdict(list)
-        self.iterate_all_cards(
-            MtgjsonStructuresObject().get_all_compiled_file_names(), cards_to_parse
-        )
+        if load_set_files:
+            self.iterate_all_cards(
+                MtgjsonStructuresObject().get_all_compiled_file_names(),
+                cards_to_parse,
+            )
 
     def iterate_all_cards(
         self,
@@ -53,31 +62,34 @@ class MtgjsonAtomicCardsObject:
             with set_file.open(encoding="utf-8") as file:
                 file_content = json.load(file)
 
-            valid_cards = file_content.get("data", {}).get("cards", [])
-
-            # Workaround for Dungeons so they can be included
-            dungeons = [
-                token
-                for token in file_content.get("data", {}).get("tokens", [])
-                if token.get("type") == "Dungeon"
-            ]
-            for dungeon in dungeons:
-                dungeon.update(
-                    {
-                        "manaValue": 0.0,
-                        "convertedManaCost": 0.0,
-                        "legalities": {},
-                        "purchaseUrls": {},
-                        "rulings": [],
-                    }
-                )
-
-            valid_cards.extend(dungeons)
-
             self.update_global_card_list(
-                file_content.get("data", {}).get("cards", []), valid_keys
+                self.get_set_cards(file_content.get("data", {})), valid_keys
             )
 
+    @staticmethod
+    def get_set_cards(set_contents: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """
+        Get the cards of a set that belong in AtomicCards, without
+        modifying the set's contents
+        :param set_contents: Contents of a set file
+        :return: Cards to add
+        """
+        # Workaround for Dungeons so they can be included
+        dungeons = [
+            {
+                **token,
+                "manaValue": 0.0,
+                "convertedManaCost": 0.0,
+                "legalities": {},
+                "purchaseUrls": {},
+                "rulings": [],
+            }
+            for token in set_contents.get("tokens", [])
+            if token.get("type") == "Dungeon"
+        ]
+
+        return list(set_contents.get("cards", [])) + dungeons
+
     def update_global_card_list(
         self, card_list: List[Dict[str, Any]], valid_keys: List[str]
     ) -> None:
@@ -101,8 +113,16 @@ class MtgjsonAtomicCardsObject:
                     "scryfallOracleId": atomic_card["identifiers"]["scryfallOracleId"]
                 }
 
-            for foreign_data in atomic_card.get("foreignData", {}):
-                foreign_data.pop("multiverseId", None)
+            # Copied, as the card's own foreign data may be used elsewhere
+            if "foreignData" in atomic_card:
+                atomic_card["foreignData"] = [
+                    {
+                        key: value
+                        for key, value in foreign_data.items()
+                        if key != "multiverseId"
+                    }
+                    for foreign_data in atomic_card["foreignData"]
+                ]
 
             # Strip out the (a), (b) stuff
             values = self.__name_regex.findall(atomic_card["name"])
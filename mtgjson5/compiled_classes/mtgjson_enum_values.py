@@ -4,7 +4,7 @@ MTGJSON EnumValues Object
 import json
 import logging
 import pathlib
-from typing import Any, Dict, List, Union
+from typing import Any, Dict, List, Optional, Union
 
 from ..compiled_classes.mtgjson_all_printings import MtgjsonAllPrintingsObject
 from ..mtgjson_config import MtgjsonConfig
@@ -54,16 +54,20 @@ class MtgjsonEnumValuesObject:
 
     deck_key_struct = {"deck": ["type"]}
 
-    def __init__(self) -> None:
+    def __init__(self, set_and_card_enums: Optional[Dict[str, Any]] = None) -> None:
         """
         Initializer to build the internal mapping
+        :param set_and_card_enums: Enums already compiled from AllPrintings,
+        instead of reading every set file again
         """
         self.attr_value_dict = {}
 
-        set_and_cards = self.construct_set_and_card_enums(
-            MtgjsonAllPrintingsObject().to_json()
-        )
-        self.attr_value_dict.update(set_and_cards)
+        if set_and_card_enums is None:
+            type_map = self.new_set_and_card_type_map()
+            for _, set_contents in MtgjsonAllPrintingsObject().iterate_set_contents():
+                self.add_set_to_type_map(type_map, set_contents)
+            set_and_card_enums = dict(sort_internal_lists(type_map))
+        self.attr_value_dict.update(set_and_card_enums)
 
         decks = self.construct_deck_enums(MtgjsonConfig().output_path.joinpath("decks"))
         self.attr_value_dict.update(decks)
@@ -121,68 +125,86 @@ class MtgjsonEnumValuesObject:
         :param all_printing_content: AllPrintings internally
         :return Sorted list of enum options for each key
         """
+        type_map = self.new_set_and_card_type_map()
+        for set_contents in all_printing_content.values():
+            self.add_set_to_type_map(type_map, set_contents)
+
+        return dict(sort_internal_lists(type_map))
+
+    @classmethod
+    def new_set_and_card_type_map(cls) -> Dict[str, Any]:
+        """
+        Create an empty mapping to collect set and card enums into
+        :return Mapping of each key to an empty set of options
+        """
         type_map: Dict[str, Any] = {}
-        for object_name, object_values in self.set_key_struct.items():
+        for object_name, object_values in cls.set_key_struct.items():
             type_map[object_name] = {}
             for object_field_name in object_values:
                 type_map[object_name][object_field_name] = set()
 
-        for set_contents in all_printing_content.values():
-            for set_contents_key in set_contents.keys():
-                if set_contents_key in self.set_key_struct["set"]:
-                    value = set_contents.get(set_contents_key)
-                    if isinstance(value, list):
-                        type_map["set"][set_contents_key].update(value)
-                    else:
-                        type_map["set"][set_contents_key].add(value)
-                elif set_contents_key in self.set_key_struct["setInner"]:
-                    for set_inner_field in self.set_key_struct["setInner"][
-                        set_contents_key
-                    ]:
-                        if set_inner_field not in type_map:
-                            type_map[set_inner_field] = set()
-
-                        for inner_struct in set_contents.get(set_contents_key):
-                            value = inner_struct.get(set_inner_field)
-
-                            if isinstance(value, list):
-                                type_map[set_inner_field].update(value)
-                            else:
-                                type_map[set_inner_field].add(value)
-
-            match_keys = set(self.set_key_struct["card"]).union(
-                set(self.set_key_struct.keys())
-            )
-            for card in set_contents.get("cards", []) + set_contents.get("tokens", []):
-                for card_key in card.keys():
-                    if card_key not in match_keys:
-                        continue
-
-                    # Get the value when actually needed
-                    card_value = card[card_key]
-
-                    # For Dicts, we just enum the keys
-                    if isinstance(card_value, dict):
-                        for value in card_value.keys():
-                            type_map["card"][card_key].add(value)
-                        continue
+        return type_map
 
-                    # String, Integer, etc can be added as-is
-                    if not isinstance(card_value, list):
-                        type_map["card"][card_key].add(card_value)
+    @classmethod
+    def add_set_to_type_map(
+        cls, type_map: Dict[str, Any], set_contents: Dict[Any, Any]
+    ) -> None:
+        """
+        Collect the enum options found in a single set
+        :param type_map: Mapping from new_set_and_card_type_map() to update
+        :param set_contents: Contents of a set file
+        """
+        for set_contents_key in set_contents.keys():
+            if set_contents_key in cls.set_key_struct["set"]:
+                value = set_contents.get(set_contents_key)
+                if isinstance(value, list):
+                    type_map["set"][set_contents_key].update(value)
+                else:
+                    type_map["set"][set_contents_key].add(value)
+            elif set_contents_key in cls.set_key_struct["setInner"]:
+                for set_inner_field in cls.set_key_struct["setInner"][set_contents_key]:
+                    if set_inner_field not in type_map:
+                        type_map[set_inner_field] = set()
+
+                    for inner_struct in set_contents[set_contents_key]:
+                        value = inner_struct.get(set_inner_field)
+
+                        if isinstance(value, list):
+                            type_map[set_inner_field].update(value)
+                        else:
+                            type_map[set_inner_field].add(value)
+
+        match_keys = set(cls.set_key_struct["card"]).union(
+            set(cls.set_key_struct.keys())
+        )
+        for card in set_contents.get("cards", []) + set_contents.get("tokens", []):
+            for card_key in card.keys():
+                if card_key not in match_keys:
+                    continue
+
+                # Get the value when actually needed
+                card_value = card[card_key]
+
+                # For Dicts, we just enum the keys
+                if isinstance(card_value, dict):
+                    for value in card_value.keys():
+                        type_map["card"][card_key].add(value)
+                    continue
+
+                # String, Integer, etc can be added as-is
+                if not isinstance(card_value, list):
+                    type_map["card"][card_key].add(card_value)
+                    continue
+
+                for single_value in card_value:
+                    # Iterating a non-dict is fine
+                    if not isinstance(single_value, dict):
+                        type_map["card"][card_key].add(single_value)
                         continue
 
-                    for single_value in card_value:
-                        # Iterating a non-dict is fine
-                        if not isinstance(single_value, dict):
-                            type_map["card"][card_key].add(single_value)
-                            continue
-
-                        # Internal attributes are sometimes added
-                        for attribute in self.set_key_struct.get(card_key, []):
-                            type_map[card_key][attribute].add(single_value[attribute])
-
-        return dict(sort_internal_lists(type_map))
+                    # Internal attributes are sometimes added
+                    for attribute in cls.set_key_struct.get(card_key, []):
+                        type_map[card_key][attribute].add(single_value[attribute])
 
     def to_json(self) -> Dict[str, Union[Dict[str, List[str]], List[str]]]:
         """
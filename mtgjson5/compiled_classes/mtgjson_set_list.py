@@ -2,7 +2,7 @@
 MTGJSON SetList Object
 """
 import json
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional
 
 from ..mtgjson_config import MtgjsonConfig
 from .mtgjson_structures import MtgjsonStructuresObject
@@ -15,13 +15,17 @@ class MtgjsonSetListObject:
 
     set_list: List[Dict[str, str]]
 
-    def __init__(self) -> None:
+    def __init__(self, set_list: Optional[List[Dict[str, Any]]] = None) -> None:
         """
         Initializer to build up the object
+        :param set_list: Entries to use instead of reading the set files
         """
-        self.set_list = self.get_all_set_list(
-            files_to_ignore=MtgjsonStructuresObject().get_all_compiled_file_names()
-        )
+        if set_list is None:
+            self.set_list = self.get_all_set_list(
+                files_to_ignore=MtgjsonStructuresObject().get_all_compiled_file_names()
+            )
+        else:
+            self.set_list = sorted(set_list, key=lambda set_info: set_info["name"])
 
     @staticmethod
     def get_all_set_list(files_to_ignore: List[str]) -> List[Dict[str, str]]:
@@ -42,16 +46,27 @@ class MtgjsonSetListObject:
             with set_file.open(encoding="utf-8") as f:
                 set_data = json.load(f).get("data", {})
 
-            if not set_data.get("name"):
-                continue
+            set_list_entry = MtgjsonSetListObject.get_set_list_entry(set_data)
+            if set_list_entry:
+                all_sets_data.append(set_list_entry)
 
-            for key in ["booster", "cards", "tokens"]:
-                if key in set_data:
-                    del set_data[key]
+        return sorted(all_sets_data, key=lambda set_info: set_info["name"])
 
-            all_sets_data.append(set_data)
+    @staticmethod
+    def get_set_list_entry(set_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        Summarize a set for SetList, without modifying the set's contents
+        :param set_data: Contents of a set file
+        :return: Set without its cards, or None if it isn't a complete set
+        """
+        if not set_data.get("name"):
+            return None
 
-        return sorted(all_sets_data, key=lambda set_info: set_info["name"])
+        return {
+            key: value
+            for key, value in set_data.items()
+            if key not in ["booster", "cards", "tokens"]
+        }
 
     def to_json(self) -> List[Any]:
         """
@@ -7,12 +7,12 @@ import pathlib
 from collections import defaultdict
 from typing import DefaultDict, Dict, List, Set, Union
 
+from ..mtgjson_identifier_index import MtgjsonIdentifierIndex
 from ..providers.tcgplayer import (
     TCGPlayerProvider,
     convert_sku_data_enum,
     get_tcgplayer_sku_data,
 )
-from ..utils import generate_card_mapping
 
 LOGGER = logging.getLogger(__name__)
 
@@ -27,15 +27,18 @@ class MtgjsonTcgplayerSkusObject:
     def __init__(self, all_printings_path: pathlib.Path) -> None:
         self.enhanced_tcgplayer_skus = defaultdict(list)
 
-        tcg_normal_to_mtgjson_map = generate_card_mapping(
-            all_printings_path, ("identifiers", "tcgplayerProductId"), ("uuid",)
-        )
-        tcg_etched_to_mtgjson_map = generate_card_mapping(
-            all_printings_path, ("identifiers", "tcgplayerEtchedProductId"), ("uuid",)
-        )
-
         for group in TCGPlayerProvider().get_tcgplayer_magic_set_ids():
             tcgplayer_sku_data = get_tcgplayer_sku_data(group)
+
+            # Only map the products of this group
+            product_ids = [str(product["productId"]) for product in tcgplayer_sku_data]
+            tcg_normal_to_mtgjson_map = MtgjsonIdentifierIndex().get_mapping(
+                all_printings_path, "tcgplayerProductId", product_ids
+            )
+            tcg_etched_to_mtgjson_map = MtgjsonIdentifierIndex().get_mapping(
+                all_printings_path, "tcgplayerEtchedProductId", product_ids
+            )
+
             for product in tcgplayer_sku_data:
                 product_id = str(product["productId"])
                 normal_keys: Set[str] = tcg_normal_to_mtgjson_map.get(product_id, set())
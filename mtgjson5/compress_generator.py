@@ -1,16 +1,33 @@
 """
 MTGJSON Compression Operations
 """
+import bz2
+import gzip
+import io
 import logging
+import lzma
+import os
 import pathlib
 import shutil
-import subprocess
-from typing import List, Union
+import time
+import zipfile
+from typing import IO, Any, List, Tuple, Union, cast
 
+import gevent
+import gevent.event
+import gevent.pool
+import gevent.subprocess
+
+from . import constants
 from .compiled_classes import MtgjsonStructuresObject
+from .mtgjson_config import MtgjsonConfig
 
 LOGGER = logging.getLogger(__name__)
 
+CompressionCommand = List[Union[str, pathlib.Path]]
+# Bytes to be compressed, and the command compressing them
+CompressionJob = Tuple[int, CompressionCommand]
+
 
 def compress_mtgjson_contents(directory: pathlib.Path) -> None:
     """
@@ -18,120 +35,470 @@ def compress_mtgjson_contents(directory: pathlib.Path) -> None:
     :param directory Directory to compress
     """
     LOGGER.info(f"Starting compression on {directory.name}")
+    start_time = time.perf_counter()
 
     single_set_files = [
         file
         for file in directory.glob("*.json")
         if file.stem not in MtgjsonStructuresObject().get_all_compiled_file_names()
     ]
-    for set_file in single_set_files:
-        _compress_mtgjson_file(set_file)
-
     deck_files = list(directory.joinpath("decks").glob("*.json"))
-    for deck_file in deck_files:
-        _compress_mtgjson_file(deck_file)
-
     sql_files = (
         list(directory.glob("*.sql"))
         + list(directory.glob("*.sqlite"))
         + list(directory.glob("*.psql"))
     )
-    for sql_file in sql_files:
-        _compress_mtgjson_file(sql_file)
-
     csv_files = list(directory.joinpath("csv").glob("*.csv"))
-    for csv_file in csv_files:
-        _compress_mtgjson_file(csv_file)
-
     parquet_files = list(directory.joinpath("parquet").glob("*.parquet"))
-    for parquet_file in parquet_files:
-        _compress_mtgjson_file(parquet_file)
-
     compiled_files = [
         file
         for file in directory.glob("*.json")
         if file.stem in MtgjsonStructuresObject().get_all_compiled_file_names()
     ]
-    for compiled_file in compiled_files:
-        _compress_mtgjson_file(compiled_file)
 
-    if single_set_files:
-        _compress_mtgjson_directory(
-            single_set_files, directory, MtgjsonStructuresObject().all_sets_directory
-        )
+    compression_jobs: List[CompressionJob] = []
+    for file in (
+        single_set_files
+        + deck_files
+        + sql_files
+        + csv_files
+        + parquet_files
+        + compiled_files
+    ):
+        compression_jobs.extend(_get_file_compression_jobs(file))
 
-    if deck_files:
-        _compress_mtgjson_directory(
-            deck_files, directory, MtgjsonStructuresObject().all_decks_directory
-        )
+    archive_directories = []
+    for files, output_file in [
+        (single_set_files, MtgjsonStructuresObject().all_sets_directory),
+        (deck_files, MtgjsonStructuresObject().all_decks_directory),
+        (csv_files, MtgjsonStructuresObject().all_csvs_directory),
+        (parquet_files, MtgjsonStructuresObject().all_parquets_directory),
+    ]:
+        if not files:
+            continue
 
-    if csv_files:
-        _compress_mtgjson_directory(
-            csv_files, directory, MtgjsonStructuresObject().all_csvs_directory
+        archive_directory = _link_archive_directory(files, directory, output_file)
+        archive_directories.append(archive_directory)
+        compression_jobs.extend(
+            _get_directory_compression_jobs(
+                archive_directory, sum(file.stat().st_size for file in files)
+            )
         )
 
-    if parquet_files:
-        _compress_mtgjson_directory(
-            parquet_files, directory, MtgjsonStructuresObject().all_parquets_directory
-        )
+    try:
+        _compressor(compression_jobs)
+    finally:
+        for archive_directory in archive_directories:
+            LOGGER.info(f"Removing temporary directory {archive_directory.name}")
+            shutil.rmtree(archive_directory, ignore_errors=True)
+
+    LOGGER.info(
+        f"Finished compression on {directory.name} "
+        f"in {time.perf_counter() - start_time:.1f}s"
+    )
 
-    LOGGER.info(f"Finished compression on {directory.name}")
+
+def get_compression_job_limit() -> int:
+    """
+    Determine how many compression commands can run at once
+    :return: Configured job limit, or one per CPU
+    """
+    job_limit = MtgjsonConfig().get("MTGJSON", "compression_jobs")
+    return max(1, int(job_limit)) if job_limit else os.cpu_count() or 1
+
+
+def get_compression_threads_per_job() -> int:
+    """
+    Determine how many threads each compression command can use, so
+    the commands running at once don't use more threads than CPUs
+    :return: Threads per compression command
+    """
+    return max(1, (os.cpu_count() or 1) // get_compression_job_limit())
+
+
+def _get_compression_programs() -> Tuple[str, str, str]:
+    """
+    Pick the bzip2, gzip and xz programs to use, preferring
+    multi-threaded ones that write the same formats
+    :return: bzip2, gzip, and xz programs
+    """
+    threads = get_compression_threads_per_job()
+    return (
+        f"pbzip2 -p{threads}" if shutil.which("pbzip2") else "bzip2",
+        f"pigz -p {threads}" if shutil.which("pigz") else "gzip",
+        f"xz -T{threads}",
+    )
 
 
-def _compress_mtgjson_directory(
+def _link_archive_directory(
     files: List[pathlib.Path], directory: pathlib.Path, output_file: str
-) -> None:
+) -> pathlib.Path:
     """
-    Create a temporary directory of files to be compressed
+    Create a temporary directory of files to be compressed. Files are hard
+    linked instead of copied, where the filesystem allows it
     :param files: Files to compress into a single archive
     :param directory: Directory to dump archive into
     :param output_file: Output archive name
+    :return: Temporary directory
     """
     temp_dir = directory.joinpath(output_file)
 
     LOGGER.info(f"Creating temporary directory {output_file}")
     temp_dir.mkdir(parents=True, exist_ok=True)
     for file in files:
-        shutil.copy(str(file), str(temp_dir))
+        linked_file = temp_dir.joinpath(file.name)
+        linked_file.unlink(missing_ok=True)
+        try:
+            os.link(file, linked_file)
+        except OSError:
+            shutil.copy(str(file), str(linked_file))
 
-    LOGGER.info(f"Compressing {output_file}")
+    return temp_dir
 
-    compression_commands: List[List[Union[str, pathlib.Path]]] = [
-        ["tar", "-jcf", f"{temp_dir}.tar.bz2", "-C", temp_dir.parent, temp_dir.name],
-        ["tar", "-Jcf", f"{temp_dir}.tar.xz", "-C", temp_dir.parent, temp_dir.name],
-        ["tar", "-zcf", f"{temp_dir}.tar.gz", "-C", temp_dir.parent, temp_dir.name],
-        ["zip", "-rj", f"{temp_dir}.zip", temp_dir],
+
+def _get_directory_compression_jobs(
+    temp_dir: pathlib.Path, size: int
+) -> List[CompressionJob]:
+    """
+    Commands to compress a directory into all MTGJSON supported archive formats
+    :param temp_dir: Directory to compress
+    :param size: Bytes within the directory
+    :return: Compression jobs
+    """
+    bzip2_program, gzip_program, xz_program = _get_compression_programs()
+
+    compression_commands: List[CompressionCommand] = [
+        ["tar", "-I", bzip2_program, "-cf", f"{temp_dir}.tar.bz2"],
+        ["tar", "-I", xz_program, "-cf", f"{temp_dir}.tar.xz"],
+        ["tar", "-I", gzip_program, "-cf", f"{temp_dir}.tar.gz"],
     ]
-    _compressor(compression_commands)
+    for command in compression_commands:
+        command.extend(["-C", temp_dir.parent, temp_dir.name])
+    compression_commands.append(["zip", "-rjq", f"{temp_dir}.zip", temp_dir])
 
-    LOGGER.info(f"Removing temporary directory {output_file}")
-    shutil.rmtree(temp_dir, ignore_errors=True)
+    return [(size, command) for command in compression_commands]
 
 
-def _compress_mtgjson_file(file: pathlib.Path) -> None:
+def _get_file_compression_jobs(file: pathlib.Path) -> List[CompressionJob]:
     """
-    Compress a single file into all MTGJSON supported compression formats
+    Commands to compress a single file into all MTGJSON supported compression formats
     :param file: File to compress
+    :return: Compression jobs
     """
-    LOGGER.info(f"Compressing {file.name}")
+    bzip2_program, gzip_program, xz_program = _get_compression_programs()
+
+    compression_commands: List[Tuple[str, CompressionCommand]] = [
+        ("bz2", [*bzip2_program.split(), "--keep", "--force", file]),
+        ("gz", [*gzip_program.split(), "--keep", "--force", file]),
+        ("xz", [*xz_program.split(), "--keep", "--force", file]),
+        ("zip", ["zip", "--junk-paths", "--quiet", f"{file}.zip", file]),
+    ]
 
-    compression_commands: List[List[Union[str, pathlib.Path]]] = [
-        ["bzip2", "--keep", "--force", file],
-        ["gzip", "--keep", "--force", file],
-        ["xz", "--keep", "--force", file],
-        ["zip", "--junk-paths", f"{file}.zip", file],
+    size = file.stat().st_size
+    return [
+        (size, command)
+        for extension, command in compression_commands
+        if not _is_output_current(file, file.with_name(f"{file.name}.{extension}"))
     ]
-    _compressor(compression_commands)
 
 
-def _compressor(compression_commands: List[List[Union[str, pathlib.Path]]]) -> None:
+def _is_output_current(file: pathlib.Path, output_file: pathlib.Path) -> bool:
     """
-    Execute a series of compression commands in true parallel
-    :param compression_commands: Function to compress with
+    Determine if a compressed output was already written from the file
+    as it is now, such as by compressing it while it was being written
+    :param file: File that was compressed
+    :param output_file: Compressed output
+    :return: If the output is no older than the file
     """
-    # Compress the file in parallel outside of Python
-    # Multiprocessing cannot be used with gevent
-    for command in compression_commands:
-        with subprocess.Popen(command, stdout=subprocess.DEVNULL) as proc:
-            if proc.wait() != 0:
-                LOGGER.error(f"Failed to compress {str(proc.args)}")
+    return (
+        output_file.is_file()
+        and output_file.stat().st_mtime_ns >= file.stat().st_mtime_ns
+    )
+
+
+def _compressor(compression_jobs: List[CompressionJob]) -> None:
+    """
+    Execute compression commands in true parallel, outside of Python,
+    up to the configured job limit at a time
+    :param compression_jobs: Commands to compress with
+    :raises RuntimeError: If any command failed
+    """
+    job_limit = get_compression_job_limit()
+    LOGGER.info(
+        f"Running {len(compression_jobs)} compression jobs, {job_limit} at a time"
+    )
+
+    # Largest first, so one big file isn't left running alone at the end
+    compression_commands = [
+        command
+        for _, command in sorted(compression_jobs, key=lambda job: job[0], reverse=True)
+    ]
+
+    # Multiprocessing cannot be used with gevent, but
+    # subprocesses can be waited on cooperatively
+    pool = gevent.pool.Pool(job_limit)
+    greenlets = [
+        pool.spawn(_run_compression_command, command)
+        for command in compression_commands
+    ]
+    pool.join()
+
+    # Every job is left to finish, then the build fails if any of them did
+    failed_commands = [
+        command
+        for command, greenlet in zip(compression_commands, greenlets)
+        if not greenlet.successful() or not greenlet.value
+    ]
+    if failed_commands:
+        raise RuntimeError(
+            f"{len(failed_commands)} compression jobs failed, "
+            f"including {failed_commands[0]}"
+        )
+
+
+def _run_compression_command(command: CompressionCommand) -> bool:
+    """
+    Run a single compression command, logging failures
+    :param command: Command to run
+    :return: If the command succeeded
+    """
+    LOGGER.debug(f"Compressing {command[-1]} with {command[0]}")
+    with gevent.subprocess.Popen(command, stdout=gevent.subprocess.DEVNULL) as proc:
+        if proc.wait() != 0:
+            LOGGER.error(f"Failed to compress {str(proc.args)}")
+            return False
+    return True
+
+
+class _HashedOutputFile:
+    """
+    Output file that hashes its contents as they are written,
+    and stores the hash next to it once closed
+    """
+
+    output_file: pathlib.Path
+    hash_file: pathlib.Path
+    __file: io.BufferedWriter
+    __hash: Any
+    __discarded: bool
+
+    def __init__(self, output_file: pathlib.Path) -> None:
+        """
+        Open the output file for writing
+        :param output_file: File to write to
+        """
+        self.output_file = output_file
+        self.hash_file = output_file.with_name(
+            f"{output_file.name}.{constants.HASH_TO_GENERATE.name}"
+        )
+        self.__file = output_file.open("wb")
+        # Hash can be adjusted in consts.py file
+        self.__hash = constants.HASH_TO_GENERATE.copy()
+        self.__discarded = False
+
+    def write(self, data: bytes) -> int:
+        """
+        Write and hash data
+        :param data: Data to write
+        :return: Bytes written
+        """
+        if self.__discarded:
+            return len(data)
+
+        self.__hash.update(data)
+        return self.__file.write(data)
+
+    def flush(self) -> None:
+        """
+        Flush written data to disk
+        """
+        if not self.__discarded:
+            self.__file.flush()
+
+    def close(self) -> None:
+        """
+        Close the output file, then write its hash out to "FILENAME.HASH_NAME"
+        """
+        if self.__discarded:
+            return
+
+        self.__file.close()
+        self.hash_file.write_text(self.__hash.hexdigest(), encoding="utf-8")
+
+    def discard(self) -> None:
+        """
+        Close the output file without finishing it, and remove it and its hash.
+        Anything written afterwards (Ex: a compressor's trailer) is ignored
+        """
+        self.__discarded = True
+        self.__file.close()
+        self.output_file.unlink(missing_ok=True)
+        self.hash_file.unlink(missing_ok=True)
+
+
+class MtgjsonCompressingWriter(io.BufferedIOBase):
+    """
+    Binary output file that writes all MTGJSON supported compression
+    formats of itself, and the hashes of every output, in the same pass.
+    Chunks are compressed in native threads, one per format, as zlib,
+    bz2, lzma and hashlib all release the GIL while they work
+    """
+
+    chunk_size: int
+    __buffer: bytearray
+    __outputs: List[_HashedOutputFile]
+    __compressors: List[Any]
+    __pending: List[gevent.event.AsyncResult]
+
+    def __init__(self, write_file: pathlib.Path, chunk_size: int = 1 << 20) -> None:
+        """
+        Open the output file and each of its compressed outputs
+        :param write_file: File to write to
+        :param chunk_size: How much data to collect before compressing it
+        """
+        super().__init__()
+        self.chunk_size = chunk_size
+        self.__buffer = bytearray()
+        self.__pending = []
+
+        self.__outputs = [
+            _HashedOutputFile(write_file.with_name(f"{write_file.name}{extension}"))
+            for extension in ["", ".bz2", ".gz", ".xz", ".zip"]
+        ]
+        raw_output, bz2_output, gz_output, xz_output, zip_output = self.__outputs
+
+        # Output files aren't seekable, so the zip is written as a stream
+        self.__zip_file = zipfile.ZipFile(
+            cast(IO[bytes], zip_output), "w", compression=zipfile.ZIP_DEFLATED
+        )
+        self.__compressors = [
+            raw_output,
+            bz2.BZ2File(bz2_output, "wb"),
+            gzip.GzipFile(str(gz_output.output_file), "wb", fileobj=gz_output),
+            lzma.LZMAFile(cast(IO[bytes], xz_output), "wb"),
+            self.__zip_file.open(write_file.name, "w", force_zip64=True),
+        ]
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data: Any) -> int:
+        """
+        Collect data, compressing it once a full chunk is available
+        :param data: Data to write
+        :return: Bytes written
+        """
+        if self.closed:
+            raise ValueError("write to closed file")
+
+        self.__buffer.extend(data)
+        if len(self.__buffer) >= self.chunk_size:
+            self.__compress_buffer()
+        return len(data)
+
+    def __compress_buffer(self) -> None:
+        """
+        Hand the collected data to each output's thread. The previous chunk
+        must be finished first, so each output receives its chunks in order
+        """
+        chunk = bytes(self.__buffer)
+        self.__buffer.clear()
+
+        self.__wait_for_pending()
+        threadpool = gevent.get_hub().threadpool
+        self.__pending = [
+            threadpool.spawn(compressor.write, chunk)
+            for compressor in self.__compressors
+        ]
+
+    def __wait_for_pending(self) -> None:
+        """
+        Wait for every output to finish its chunk, raising any failures
+        """
+        for result in self.__pending:
+            result.get()
+        self.__pending = []
+
+    def close(self) -> None:
+        """
+        Compress the remaining data and close every output. The uncompressed
+        output is closed first, so the compressed ones are never older
+        """
+        if self.closed:
+            return
+
+        try:
+            self.__compress_buffer()
+            self.__wait_for_pending()
+            self.__outputs[0].close()
+
+            threadpool = gevent.get_hub().threadpool
+            for result in [
+                threadpool.spawn(self.__close_compressed_output, compressor, output)
+                for compressor, output in zip(
+                    self.__compressors[1:], self.__outputs[1:]
+                )
+            ]:
+                result.get()
+        finally:
+            super().close()
+
+    def discard(self) -> None:
+        """
+        Stop writing without finishing any output, and remove every
+        output and hash, so a partial file can't look complete
+        """
+        if self.closed:
+            return
+
+        try:
+            for result in self.__pending:
+                result.wait()
+            for output in self.__outputs:
+                output.discard()
+        finally:
+            super().close()
+
+    def __close_compressed_output(
+        self, compressor: Any, output: _HashedOutputFile
+    ) -> None:
+        """
+        Finish a compressed output, then close its file
+        :param compressor: Compressor writing the output
+        :param output: Output file
+        """
+        compressor.close()
+        if output is self.__outputs[-1]:
+            self.__zip_file.close()
+        output.close()
+
+
+def open_output_file(write_file: pathlib.Path) -> io.TextIOWrapper:
+    """
+    Open an output file for writing, compressing it in the same pass
+    if inline compression is enabled
+    :param write_file: File to write to
+    :return: Text file to write to
+    """
+    write_file.parent.mkdir(parents=True, exist_ok=True)
+    if MtgjsonConfig().inline_compression:
+        return io.TextIOWrapper(
+            cast(IO[bytes], MtgjsonCompressingWriter(write_file)), encoding="utf-8"
+        )
+    return write_file.open("w", encoding="utf-8")
+
+
+def discard_output_file(output: io.TextIOWrapper, write_file: pathlib.Path) -> None:
+    """
+    Close an output file opened by open_output_file without finishing it,
+    and remove everything written for it
+    :param output: Text file that was being written to
+    :param write_file: File that was being written to
+    """
+    raw_output = output.detach()
+    if isinstance(raw_output, MtgjsonCompressingWriter):
+        raw_output.discard()
+        return
+
+    raw_output.close()
+    write_file.unlink(missing_ok=True)
@@ -24,6 +24,9 @@ CACHE_PATH: pathlib.Path = TOP_LEVEL_DIR.joinpath(".mtgjson5_cache")
 
 HASH_TO_GENERATE = hashlib.sha256()
 
+# Greenlets per parallel_call, and connections kept open per HTTP session
+PARALLEL_CALL_POOL_SIZE: int = 32
+
 CARD_MARKET_BUFFER: str = "10101"
 CARD_KINGDOM_REFERRAL: str = (
     "?partner=mtgjson&utm_source=mtgjson&utm_medium=affiliate&utm_campaign=mtgjson"
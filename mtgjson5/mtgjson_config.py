@@ -24,6 +24,7 @@ class MtgjsonConfig:
     config_parser: configparser.ConfigParser
     mtgjson_version: str
     use_cache: bool
+    inline_compression: bool
     output_path: pathlib.Path
 
     def __init__(
@@ -57,6 +58,7 @@ class MtgjsonConfig:
             )
 
         self.use_cache = self.get_boolean("MTGJSON", "use_cache", False)
+        self.inline_compression = False
         self.output_path = constants.ENV_OUT_PATH.joinpath(
             f"mtgjson_build_{self.mtgjson_version}"
         )
@@ -0,0 +1,188 @@
+"""
+MTGJSON Identifier Index, to share third party ID lookups across price providers
+"""
+import collections
+import logging
+import pathlib
+import sqlite3
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+import gevent.lock
+from singleton_decorator import singleton
+
+from . import constants
+from .utils import get_all_cards_and_tokens
+
+LOGGER = logging.getLogger(__name__)
+
+# Identifiers price providers map to MTGJSON UUIDs
+INDEXED_IDENTIFIERS = (
+    "cardKingdomFoilId",
+    "cardKingdomId",
+    "cardsphereId",
+    "mcmId",
+    "mtgoFoilId",
+    "mtgoId",
+    "tcgplayerEtchedProductId",
+    "tcgplayerProductId",
+)
+
+# Bumped whenever the index layout changes, so older indexes are rebuilt
+INDEX_VERSION = 2
+
+# Third party IDs looked up per query, kept under SQLite's variable limit
+LOOKUP_BATCH_SIZE = 500
+
+
+@singleton
+class MtgjsonIdentifierIndex:
+    """
+    Third party ID => MTGJSON UUIDs indexes of an AllPrintings file,
+    built in a single pass over it and kept on disk in SQLite, so each
+    price provider doesn't load AllPrintings again for its own mapping
+    """
+
+    index_path: pathlib.Path
+    __build_lock: gevent.lock.Semaphore
+
+    def __init__(self, index_path: Optional[pathlib.Path] = None) -> None:
+        """
+        :param index_path: Where the index is kept
+        """
+        self.index_path = index_path or constants.CACHE_PATH.joinpath(
+            "identifier_index.sqlite"
+        )
+        self.__build_lock = gevent.lock.Semaphore()
+
+    def get_mapping(
+        self,
+        all_printings_path: pathlib.Path,
+        identifier: str,
+        third_party_ids: Optional[Iterable[str]] = None,
+    ) -> Dict[str, Set[str]]:
+        """
+        Get the mapping of one identifier to the cards that have it.
+        Without third party IDs, every value of the identifier is mapped,
+        so the whole mapping is held in memory. Callers that only need
+        some of them should pass the IDs they're looking up
+        :param all_printings_path: AllPrintings file the cards are from
+        :param identifier: Identifier to map (Ex: mcmId)
+        :param third_party_ids: Only map these values of the identifier
+        :return: Mapping from the identifier's values => MTGJSON UUIDs
+        """
+        if identifier not in INDEXED_IDENTIFIERS:
+            raise ValueError(f"{identifier} is not an indexed identifier")
+
+        with self.__build_lock:
+            self.__build_if_stale(all_printings_path)
+
+        mapping: Dict[str, Set[str]] = collections.defaultdict(set)
+        connection = sqlite3.connect(self.index_path)
+        try:
+            if third_party_ids is None:
+                rows: Iterable[Tuple[str, str]] = connection.execute(
+                    "SELECT third_party_id, uuid FROM identifiers "
+                    "WHERE identifier = ? ORDER BY rowid",
+                    (identifier,),
+                )
+            else:
+                rows = get_mapped_rows(connection, identifier, third_party_ids)
+
+            for third_party_id, mtgjson_uuid in rows:
+                mapping[third_party_id].add(mtgjson_uuid)
+        finally:
+            connection.close()
+
+        return mapping
+
+    def __build_if_stale(self, all_printings_path: pathlib.Path) -> None:
+        """
+        Build the index, unless it was already built from this AllPrintings
+        :param all_printings_path: AllPrintings file the cards are from
+        """
+        source = get_source_fingerprint(all_printings_path)
+
+        self.index_path.parent.mkdir(parents=True, exist_ok=True)
+        connection = sqlite3.connect(self.index_path)
+        try:
+            connection.execute("CREATE TABLE IF NOT EXISTS meta (source TEXT)")
+            if connection.execute("SELECT source FROM meta").fetchone() == (source,):
+                return
+
+            LOGGER.info(f"Building identifier index from {all_printings_path}")
+            with connection:
+                connection.execute("DELETE FROM meta")
+                connection.execute("DROP TABLE IF EXISTS identifiers")
+                connection.execute(
+                    "CREATE TABLE identifiers "
+                    "(identifier TEXT, third_party_id TEXT, uuid TEXT)"
+                )
+                connection.executemany(
+                    "INSERT INTO identifiers VALUES (?, ?, ?)",
+                    get_identifier_rows(all_printings_path),
+                )
+                connection.execute(
+                    "CREATE INDEX identifiers_by_identifier "
+                    "ON identifiers (identifier, third_party_id)"
+                )
+                connection.execute("INSERT INTO meta VALUES (?)", (source,))
+        finally:
+            connection.close()
+
+
+def get_source_fingerprint(all_printings_path: pathlib.Path) -> str:
+    """
+    :param all_printings_path: AllPrintings file the cards are from
+    :return: Fingerprint that changes whenever the file is rewritten
+    """
+    all_printings_path = all_printings_path.expanduser().resolve()
+    if not all_printings_path.is_file():
+        return f"{INDEX_VERSION}:{all_printings_path}:missing"
+
+    stat = all_printings_path.stat()
+    return f"{INDEX_VERSION}:{all_printings_path}:{stat.st_size}:{stat.st_mtime_ns}"
+
+
+def get_mapped_rows(
+    connection: sqlite3.Connection, identifier: str, third_party_ids: Iterable[str]
+) -> List[Tuple[str, str]]:
+    """
+    Look up the cards of some values of an identifier, a batch at a time
+    :param connection: Connection to the index
+    :param identifier: Identifier to map (Ex: mcmId)
+    :param third_party_ids: Values of the identifier to look up
+    :return: Values of the identifier, and the MTGJSON UUIDs they belong to,
+    in the order the cards were indexed
+    """
+    unique_ids = list(dict.fromkeys(third_party_ids))
+    rows: List[Tuple[int, str, str]] = []
+    for start in range(0, len(unique_ids), LOOKUP_BATCH_SIZE):
+        batch = unique_ids[start : start + LOOKUP_BATCH_SIZE]
+        rows.extend(
+            connection.execute(
+                "SELECT rowid, third_party_id, uuid FROM identifiers "
+                "WHERE identifier = ? "
+                f"AND third_party_id IN ({', '.join('?' * len(batch))})",
+                (identifier, *batch),
+            )
+        )
+
+    return [
+        (third_party_id, mtgjson_uuid)
+        for _, third_party_id, mtgjson_uuid in sorted(rows)
+    ]
+
+
+def get_identifier_rows(
+    all_printings_path: pathlib.Path,
+) -> Iterator[Tuple[str, str, str]]:
+    """
+    Read every indexed identifier of every card and token, in one pass
+    :param all_printings_path: AllPrintings file the cards are from
+    :return: Identifier, its value, and the MTGJSON UUID it belongs to
+    """
+    for card in get_all_cards_and_tokens(all_printings_path):
+        identifiers = card.get("identifiers", {})
+        for identifier in INDEXED_IDENTIFIERS:
+            if identifier in identifiers and "uuid" in card:
+                yield identifier, str(identifiers[identifier]), card["uuid"]
@@ -0,0 +1,159 @@
+"""
+MTGJSON Oracle Cache, to share per-oracle card lookups across a build
+"""
+import collections
+import json
+import logging
+import pathlib
+import time
+from typing import Any, Callable, Dict, Optional, Tuple
+
+import gevent.event
+from singleton_decorator import singleton
+
+from .mtgjson_config import MtgjsonConfig
+
+LOGGER = logging.getLogger(__name__)
+
+
+@singleton
+class MtgjsonOracleCache:
+    """
+    Bounded, least-recently-used memo of lookups that only depend on a
+    card's oracle identity (like its printings and rulings), so they are
+    fetched once per build instead of once per reprint
+    """
+
+    max_entries: int
+    max_age_hours: float
+    persist_path: Optional[pathlib.Path]
+    hits: Dict[str, int]
+    misses: Dict[str, int]
+    __entries: "collections.OrderedDict[Tuple[str, str], Any]"
+    __in_flight: Dict[Tuple[str, str], gevent.event.AsyncResult]
+
+    def __init__(self) -> None:
+        self.max_entries = int(
+            MtgjsonConfig().get("MTGJSON", "oracle_cache_size", fallback="100000")
+        )
+        self.max_age_hours = float(
+            MtgjsonConfig().get("MTGJSON", "oracle_cache_max_age_hours", fallback="24")
+        )
+        persist_path = MtgjsonConfig().get("MTGJSON", "oracle_cache_path")
+        self.persist_path = pathlib.Path(persist_path) if persist_path else None
+
+        self.hits = collections.Counter()
+        self.misses = collections.Counter()
+        self.__entries = collections.OrderedDict()
+        self.__in_flight = {}
+
+        if self.persist_path:
+            self.load()
+
+    def get_or_fetch(
+        self, kind: str, oracle_id: str, fetcher: Callable[[], Optional[Any]]
+    ) -> Optional[Any]:
+        """
+        Get a cached value, or fetch and cache it. Concurrent requests for
+        the same value wait on the first fetch rather than repeating it
+        :param kind: What is being looked up (Ex: printings, rulings)
+        :param oracle_id: Oracle ID of the card
+        :param fetcher: Produces the value; None means it failed and isn't cached
+        :return: Value for the card, or None if it could not be fetched
+        """
+        key = (kind, oracle_id)
+        if key in self.__entries:
+            self.hits[kind] += 1
+            self.__entries.move_to_end(key)
+            return self.__entries[key]
+
+        if key in self.__in_flight:
+            self.hits[kind] += 1
+            return self.__in_flight[key].get()
+
+        self.misses[kind] += 1
+        in_flight = gevent.event.AsyncResult()
+        self.__in_flight[key] = in_flight
+        try:
+            value = fetcher()
+        except Exception as exception:
+            in_flight.set_exception(exception)
+            raise
+        finally:
+            del self.__in_flight[key]
+
+        in_flight.set(value)
+        if value is not None:
+            self.__store(key, value)
+        return value
+
+    def __store(self, key: Tuple[str, str], value: Any) -> None:
+        """
+        Add a value, evicting the least recently used ones past capacity
+        :param key: Kind and oracle ID
+        :param value: Value to store
+        """
+        self.__entries[key] = value
+        self.__entries.move_to_end(key)
+        while len(self.__entries) > self.max_entries:
+            self.__entries.popitem(last=False)
+
+    def load(self) -> None:
+        """
+        Load entries saved by a previous run, unless they are too old
+        """
+        if not self.persist_path or not self.persist_path.is_file():
+            return
+
+        with self.persist_path.open(encoding="utf-8") as file:
+            contents = json.load(file)
+
+        age_hours = (time.time() - contents.get("saved_at", 0)) / 3600
+        if age_hours > self.max_age_hours:
+            LOGGER.info(
+                f"Ignoring oracle cache {self.persist_path}, "
+                f"as it is {age_hours:.1f} hours old"
+            )
+            return
+
+        for kind, oracle_id, value in contents.get("entries", []):
+            self.__store((kind, oracle_id), value)
+        LOGGER.info(
+            f"Loaded {len(self.__entries)} oracle cache entries from {self.persist_path}"
+        )
+
+    def save(self) -> None:
+        """
+        Save entries for the next run, if persistence is enabled
+        """
+        if not self.persist_path:
+            return
+
+        self.persist_path.parent.mkdir(parents=True, exist_ok=True)
+        with self.persist_path.open("w", encoding="utf-8") as file:
+            json.dump(
+                {
+                    "saved_at": time.time(),
+                    "entries": [
+                        [kind, oracle_id, value]
+                        for (kind, oracle_id), value in self.__entries.items()
+                    ],
+                },
+                file,
+                ensure_ascii=False,
+            )
+        LOGGER.info(
+            f"Saved {len(self.__entries)} oracle cache entries to {self.persist_path}"
+        )
+
+    def log_statistics(self) -> None:
+        """
+        Log hit and miss counters for each kind of lookup
+        """
+        for kind in sorted(set(self.hits) | set(self.misses)):
+            total = self.hits[kind] + self.misses[kind]
+            LOGGER.info(
+                f"Oracle cache {kind}: {self.hits[kind]} hits, "
+                f"{self.misses[kind]} misses "
+                f"({self.hits[kind] / total:.1%} hit rate)"
+            )
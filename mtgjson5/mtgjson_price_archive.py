@@ -0,0 +1,213 @@
+"""
+MTGJSON Price Archive, to keep each day's prices in a partition of its own
+"""
+import contextlib
+import heapq
+import itertools
+import logging
+import pathlib
+import re
+import sqlite3
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from . import constants
+
+LOGGER = logging.getLogger(__name__)
+
+# Price columns of a partition, as (side, finish) of the price data
+PRICE_COLUMNS = {
+    "buylist_normal": ("buylist", "normal"),
+    "buylist_foil": ("buylist", "foil"),
+    "retail_normal": ("retail", "normal"),
+    "retail_foil": ("retail", "foil"),
+}
+
+PARTITION_FILE_PATTERN = re.compile(r"^(\d{4}-\d{2}-\d{2})\.sqlite$")
+
+
+class MtgjsonPriceArchive:
+    """
+    Price history kept as one SQLite partition per date, each holding
+    a row of that date's prices for every card and provider, so a day
+    can be added or dropped without reading or rewriting the others
+    """
+
+    archive_path: pathlib.Path
+
+    def __init__(self, archive_path: Optional[pathlib.Path] = None) -> None:
+        """
+        :param archive_path: Directory the partitions are kept in
+        """
+        self.archive_path = archive_path or constants.CACHE_PATH.joinpath(
+            "price_archive"
+        )
+        self.archive_path.mkdir(parents=True, exist_ok=True)
+
+    def get_dates(self) -> List[str]:
+        """
+        :return: Dates with a partition, oldest first
+        """
+        dates = []
+        for path in self.archive_path.iterdir():
+            match = PARTITION_FILE_PATTERN.match(path.name)
+            if match:
+                dates.append(match.group(1))
+        return sorted(dates)
+
+    def get_partition_path(self, date: str) -> pathlib.Path:
+        """
+        :param date: Date of the partition
+        :return: Where the partition is kept
+        """
+        return self.archive_path.joinpath(f"{date}.sqlite")
+
+    def add_prices(self, price_data: Dict[str, Any]) -> List[str]:
+        """
+        Add MTGJSON price data to the partitions of the dates it has.
+        Prices already archived for a card are only replaced by new ones
+        :param price_data: MTGJSON price data, by UUID
+        :return: Dates that were added to
+        """
+        rows_by_date: Dict[str, Dict[Tuple[str, str, str], Dict[str, Any]]] = {}
+        for uuid, sources in price_data.items():
+            for source, providers in sources.items():
+                for provider, provider_prices in providers.items():
+                    for column, (side, finish) in PRICE_COLUMNS.items():
+                        for date, price in (
+                            provider_prices.get(side, {}).get(finish, {}).items()
+                        ):
+                            rows_by_date.setdefault(date, {}).setdefault(
+                                (uuid, source, provider),
+                                {"currency": provider_prices.get("currency")},
+                            )[column] = price
+
+        for date, rows in sorted(rows_by_date.items()):
+            with contextlib.closing(self.__connect(date)) as connection:
+                with connection:
+                    connection.executemany(
+                        "INSERT INTO prices VALUES (?, ?, ?, ?, ?, ?, ?, ?) "
+                        "ON CONFLICT (uuid, source, provider) DO UPDATE SET "
+                        "currency = excluded.currency, "
+                        + ", ".join(
+                            f"{column} = COALESCE(excluded.{column}, {column})"
+                            for column in PRICE_COLUMNS
+                        ),
+                        (
+                            (
+                                *key,
+                                row["currency"],
+                                *(row.get(column) for column in PRICE_COLUMNS),
+                            )
+                            for key, row in rows.items()
+                        ),
+                    )
+            LOGGER.info(f"Archived {len(rows)} prices for {date}")
+
+        return sorted(rows_by_date)
+
+    def remove_partition(self, date: str) -> None:
+        """
+        Drop a date from the archive
+        :param date: Date of the partition
+        """
+        self.get_partition_path(date).unlink(missing_ok=True)
+
+    def prune(self, prune_date: str) -> List[str]:
+        """
+        Drop every date older than the retention window, a partition at a time
+        :param prune_date: Oldest date kept
+        :return: Dates that were dropped
+        """
+        pruned_dates = [date for date in self.get_dates() if date < prune_date]
+        for date in pruned_dates:
+            self.remove_partition(date)
+
+        LOGGER.info(f"Pruned {len(pruned_dates)} dates of prices before {prune_date}")
+        return pruned_dates
+
+    def iterate_card_prices(self) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """
+        Read the price history of each card, merging the partitions as
+        they're read so only one card's prices are held at a time
+        :return: MTGJSON UUID and price data of each card, ordered by UUID
+        """
+        with contextlib.ExitStack() as stack:
+            partition_rows = []
+            for partition_index, date in enumerate(self.get_dates()):
+                connection = stack.enter_context(
+                    contextlib.closing(self.__connect(date))
+                )
+                partition_rows.append(
+                    iterate_partition_rows(connection, partition_index, date)
+                )
+
+            for uuid, card_rows in itertools.groupby(
+                heapq.merge(*partition_rows), key=lambda row: row[0]
+            ):
+                yield uuid, build_card_prices(card_rows)
+
+    def __connect(self, date: str) -> sqlite3.Connection:
+        """
+        Connect to a partition, creating it if needed
+        :param date: Date of the partition
+        :return: Connection to the partition
+        """
+        connection = sqlite3.connect(self.get_partition_path(date))
+        connection.execute(
+            "CREATE TABLE IF NOT EXISTS prices ("
+            "uuid TEXT, source TEXT, provider TEXT, currency TEXT, "
+            + ", ".join(f"{column} REAL" for column in PRICE_COLUMNS)
+            + ", PRIMARY KEY (uuid, source, provider)) WITHOUT ROWID"
+        )
+        return connection
+
+
+def iterate_partition_rows(
+    connection: sqlite3.Connection, partition_index: int, date: str
+) -> Iterator[Tuple[Any, ...]]:
+    """
+    Read the rows of a partition, tagged so partitions merge oldest first
+    :param connection: Connection to the partition
+    :param partition_index: Position of the partition, oldest first
+    :param date: Date of the partition
+    :return: Rows of the partition, ordered by UUID, source, and provider
+    """
+    for uuid, source, provider, *prices in connection.execute(
+        "SELECT * FROM prices ORDER BY uuid, source, provider"
+    ):
+        yield (uuid, source, provider, partition_index, date, *prices)
+
+
+def build_card_prices(card_rows: Iterator[Tuple[Any, ...]]) -> Dict[str, Any]:
+    """
+    Build the MTGJSON price data of a card from its archived rows
+    :param card_rows: Rows of the card, by source and provider, oldest first
+    :return: MTGJSON price data of the card
+    """
+    card_prices: Dict[str, Any] = {}
+    for _, source, provider, _, date, currency, *prices in card_rows:
+        provider_prices = card_prices.setdefault(source, {}).setdefault(
+            provider,
+            {
+                "buylist": {"normal": {}, "foil": {}},
+                "retail": {"normal": {}, "foil": {}},
+            },
+        )
+        for (side, finish), price in zip(PRICE_COLUMNS.values(), prices):
+            if price is not None:
+                provider_prices[side][finish][date] = price
+
+        # The newest partition's currency wins
+        provider_prices["currency"] = currency
+
+    # Sides and finishes without any prices aren't output
+    for providers in card_prices.values():
+        for provider_prices in providers.values():
+            for side in ("buylist", "retail"):
+                for finish in ("normal", "foil"):
+                    if not provider_prices[side][finish]:
+                        del provider_prices[side][finish]
+                if not provider_prices[side]:
+                    del provider_prices[side]
+
+    return card_prices
@@ -0,0 +1,62 @@
+"""
+MTGJSON Resources, to share the bundled resource files across a build
+"""
+import json
+import logging
+from typing import Any, Dict, Optional, Tuple
+
+from singleton_decorator import singleton
+
+from . import constants
+
+LOGGER = logging.getLogger(__name__)
+
+
+@singleton
+class MtgjsonResources:
+    """
+    Lazily loaded, read only copies of the files in mtgjson5/resources,
+    so each is parsed once per build instead of once per card or set
+    """
+
+    __resources: Dict[str, Any]
+    __set_watermarks: Optional[Dict[Tuple[str, str], str]]
+
+    def __init__(self) -> None:
+        self.__resources = {}
+        self.__set_watermarks = None
+
+    def get(self, resource_name: str) -> Any:
+        """
+        Get the contents of a resource file, loading it on first use.
+        Contents are shared, so they must not be modified
+        :param resource_name: Resource file, without its extension
+        :return: Resource contents
+        """
+        if resource_name not in self.__resources:
+            LOGGER.debug(f"Loading resource {resource_name}")
+            with constants.RESOURCE_PATH.joinpath(f"{resource_name}.json").open(
+                encoding="utf-8"
+            ) as file:
+                self.__resources[resource_name] = json.load(file)
+
+        return self.__resources[resource_name]
+
+    def get_set_watermark(self, set_code: str, card_name: str) -> Optional[str]:
+        """
+        Get the watermark of a card with a "set" watermark
+        :param set_code: Set the card is in
+        :param card_name: Name of the card, or of one of its faces
+        :return: Watermark, if the card has one
+        """
+        if self.__set_watermarks is None:
+            set_watermarks: Dict[Tuple[str, str], str] = {}
+            for watermark_set_code, cards in self.get("set_code_watermarks").items():
+                for card in cards:
+                    for face_name in card["name"].split(" // "):
+                        set_watermarks.setdefault(
+                            (watermark_set_code, face_name), str(card["watermark"])
+                        )
+            self.__set_watermarks = set_watermarks
+
+        return self.__set_watermarks.get((set_code.upper(), card_name))
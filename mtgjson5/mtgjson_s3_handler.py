@@ -1,13 +1,25 @@
 """
 S3 Uploader to store MTGJSON files in a Bucket
 """
+import collections
+import hashlib
 import logging
 import pathlib
+import time
 import urllib.parse
-from typing import Dict, Optional
+from typing import Any, Dict, Optional
 
 import boto3
+import boto3.exceptions
+import boto3.s3.transfer
 import botocore.exceptions
+import gevent.pool
+
+from .mtgjson_config import MtgjsonConfig
+from .utils import get_file_hash, get_file_hash_path, is_file_hash_current
+
+# Object metadata key holding the SHA-256 of the uploaded file
+SHA256_METADATA_KEY = "sha256"
 
 
 class MtgjsonS3Handler:
@@ -17,11 +29,25 @@ class MtgjsonS3Handler:
 
     logger: logging.Logger
     s3_client: boto3.client
+    transfer_config: boto3.s3.transfer.TransferConfig
 
     def __init__(self) -> None:
         self.logger = logging.getLogger(__name__)
         self.s3_client = boto3.client("s3")
 
+        # Large files are uploaded in parts, several parts at a time
+        multipart_chunk_size = (
+            int(MtgjsonConfig().get("MTGJSON", "s3_multipart_chunk_mb", fallback="64"))
+            * 2**20
+        )
+        self.transfer_config = boto3.s3.transfer.TransferConfig(
+            multipart_threshold=multipart_chunk_size,
+            multipart_chunksize=multipart_chunk_size,
+            max_concurrency=int(
+                MtgjsonConfig().get("MTGJSON", "s3_max_concurrency", fallback="10")
+            ),
+        )
+
     def download_file(
         self, bucket_name: str, bucket_object_path: str, local_save_file_path: str
     ) -> bool:
@@ -37,7 +63,10 @@ class MtgjsonS3Handler:
                 bucket_name, bucket_object_path, local_save_file_path
             )
             return True
-        except botocore.exceptions.ClientError as error:
+        except (
+            botocore.exceptions.BotoCoreError,
+            botocore.exceptions.ClientError,
+        ) as error:
             self.logger.error(
                 f"Failed to download s3://{bucket_name}/{bucket_object_path}: {error}"
             )
@@ -50,6 +79,7 @@ class MtgjsonS3Handler:
         bucket_object_path: str,
         tags: Optional[Dict[str, str]] = None,
         cache_ttl_sec: int = 86400,
+        metadata: Optional[Dict[str, str]] = None,
     ) -> bool:
         """
         Upload a file to S3
@@ -58,26 +88,125 @@ class MtgjsonS3Handler:
         :param bucket_object_path: Path in S3 Bucket to upload to
         :param tags: Tags to upload with
         :param cache_ttl_sec: How long to tell browsers to cache the file for (Default: 1 day)
+        :param metadata: Object metadata to upload with
         :returns True if upload succeeded
         """
         try:
-            extra_args = {"CacheControl": f"max-age={cache_ttl_sec}"}
+            extra_args: Dict[str, Any] = {"CacheControl": f"max-age={cache_ttl_sec}"}
             if tags:
                 extra_args["Tagging"] = urllib.parse.urlencode(tags)
+            if metadata:
+                extra_args["Metadata"] = metadata
 
             self.s3_client.upload_file(
-                local_file_path, bucket_name, bucket_object_path, ExtraArgs=extra_args
+                local_file_path,
+                bucket_name,
+                bucket_object_path,
+                ExtraArgs=extra_args,
+                Config=self.transfer_config,
             )
             self.logger.info(
                 f"Successfully uploaded {local_file_path} to s3://{bucket_name}/{bucket_object_path}"
             )
             return True
-        except botocore.exceptions.ClientError as error:
+        except (
+            botocore.exceptions.BotoCoreError,
+            botocore.exceptions.ClientError,
+            boto3.exceptions.S3UploadFailedError,
+        ) as error:
             self.logger.error(
                 f"Failed to upload {local_file_path} to s3://{bucket_name}/{bucket_object_path}: {error}"
             )
         return False
 
+    def get_object_head(
+        self, bucket_name: str, bucket_object_path: str
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Get the ETag and metadata of an object, without downloading it
+        :param bucket_name: S3 Bucket the object is in
+        :param bucket_object_path: Path within Bucket the object resides at
+        :returns Object head, if the object exists
+        """
+        try:
+            response: Dict[str, Any] = self.s3_client.head_object(
+                Bucket=bucket_name, Key=bucket_object_path
+            )
+            return response
+        except (
+            botocore.exceptions.BotoCoreError,
+            botocore.exceptions.ClientError,
+        ):
+            # Object doesn't exist yet (or can't be read), so upload it
+            return None
+
+    def list_objects(self, bucket_name: str, prefix: str) -> Optional[Dict[str, str]]:
+        """
+        List the objects under a path in S3
+        :param bucket_name: S3 Bucket to list
+        :param prefix: Path within Bucket to list objects under
+        :returns Object paths, and their ETags, or None if they couldn't be listed
+        """
+        objects: Dict[str, str] = {}
+        try:
+            paginator = self.s3_client.get_paginator("list_objects_v2")
+            for page in paginator.paginate(Bucket=bucket_name, Prefix=prefix):
+                for bucket_object in page.get("Contents", []):
+                    objects[bucket_object["Key"]] = bucket_object["ETag"]
+        except (
+            botocore.exceptions.BotoCoreError,
+            botocore.exceptions.ClientError,
+        ) as error:
+            self.logger.error(f"Failed to list s3://{bucket_name}/{prefix}: {error}")
+            return None
+        return objects
+
+    def delete_object(self, bucket_name: str, bucket_object_path: str) -> bool:
+        """
+        Delete an object from S3
+        :param bucket_name: S3 Bucket the object is in
+        :param bucket_object_path: Path within Bucket the object resides at
+        :returns True if the object was deleted
+        """
+        try:
+            self.s3_client.delete_object(Bucket=bucket_name, Key=bucket_object_path)
+            return True
+        except (
+            botocore.exceptions.BotoCoreError,
+            botocore.exceptions.ClientError,
+        ) as error:
+            self.logger.error(
+                f"Failed to delete s3://{bucket_name}/{bucket_object_path}: {error}"
+            )
+            return False
+
+    @staticmethod
+    def is_object_unchanged(
+        local_file: pathlib.Path, local_sha256: str, object_head: Dict[str, Any]
+    ) -> bool:
+        """
+        Determine if an object already holds the contents of a local file
+        :param local_file: Path on local system
+        :param local_sha256: SHA-256 of the local file
+        :param object_head: Head of the existing object
+        :returns True if the object doesn't need to be uploaded again
+        """
+        object_sha256 = object_head.get("Metadata", {}).get(SHA256_METADATA_KEY)
+        if object_sha256:
+            return bool(object_sha256 == local_sha256)
+
+        # Objects uploaded before hashes were stored can still be matched by
+        # ETag, which is the MD5 of the contents unless uploaded in parts
+        object_etag = str(object_head.get("ETag", "")).strip('"')
+        if not object_etag or "-" in object_etag:
+            return False
+
+        md5_hash = hashlib.md5()
+        with local_file.open("rb") as file:
+            for chunk in iter(lambda: file.read(1 << 24), b""):
+                md5_hash.update(chunk)
+        return md5_hash.hexdigest() == object_etag
+
     def upload_directory(
         self,
         directory_path: pathlib.Path,
@@ -85,17 +214,87 @@ class MtgjsonS3Handler:
         tags: Optional[Dict[str, str]] = None,
     ) -> None:
         """
-        Upload a directory to S3
+        Upload a directory to S3, several files at a time. Files
+        already uploaded with the same contents are skipped
         :param directory_path: Path on local system to recursively upload
         :param bucket_name: S3 Bucket to upload to
         :param tags: Tags to upload each file with
         """
         self.logger.info(f"Uploading {directory_path} contents to {bucket_name}")
-        for item in directory_path.glob("**/*"):
-            if item.is_file():
-                self.upload_file(
-                    str(item),
+        start_time = time.perf_counter()
+
+        upload_workers = int(
+            MtgjsonConfig().get("MTGJSON", "s3_upload_workers", fallback="8")
+        )
+        pool = gevent.pool.Pool(max(1, upload_workers))
+        uploads = [
+            (
+                item,
+                pool.spawn(
+                    self.upload_changed_file,
+                    item,
                     bucket_name,
                     str(item.relative_to(directory_path.parent)),
                     tags,
-                )
+                ),
+            )
+            for item in directory_path.glob("**/*")
+            if item.is_file()
+        ]
+        pool.join(raise_error=True)
+
+        upload_results: Dict[str, int] = collections.Counter(
+            upload.value for _, upload in uploads
+        )
+        uploaded_bytes = sum(
+            item.stat().st_size
+            for item, upload in uploads
+            if upload.value == "uploaded"
+        )
+        elapsed_time = time.perf_counter() - start_time
+        self.logger.info(
+            f"Finished uploading {directory_path} to {bucket_name}: "
+            f"{upload_results['uploaded']} uploaded, "
+            f"{upload_results['unchanged']} unchanged, "
+            f"{upload_results['failed']} failed. "
+            f"{uploaded_bytes / 2**20:,.1f} MiB in {elapsed_time:.1f}s "
+            f"({uploaded_bytes / 2**20 / max(elapsed_time, 1e-9):,.1f} MiB/s)"
+        )
+
+    def upload_changed_file(
+        self,
+        local_file: pathlib.Path,
+        bucket_name: str,
+        bucket_object_path: str,
+        tags: Optional[Dict[str, str]] = None,
+    ) -> str:
+        """
+        Upload a file to S3, unless the object already has the same contents
+        :param local_file: Path on local system to upload
+        :param bucket_name: S3 Bucket to upload to
+        :param bucket_object_path: Path in S3 Bucket to upload to
+        :param tags: Tags to upload with
+        :returns "uploaded", "unchanged", or "failed"
+        """
+        local_sha256 = (
+            get_file_hash_path(local_file).read_text(encoding="utf-8").strip()
+            if is_file_hash_current(local_file)
+            else get_file_hash(local_file)
+        )
+
+        object_head = self.get_object_head(bucket_name, bucket_object_path)
+        if object_head and self.is_object_unchanged(
+            local_file, local_sha256, object_head
+        ):
+            self.logger.debug(f"Skipping unchanged {local_file}")
+            return "unchanged"
+
+        if self.upload_file(
+            str(local_file),
+            bucket_name,
+            bucket_object_path,
+            tags,
+            metadata={SHA256_METADATA_KEY: local_sha256},
+        ):
+            return "uploaded"
+        return "failed"
@@ -0,0 +1,162 @@
+"""
+MTGJSON Stream Writer, to write compiled outputs one entry at a time
+"""
+import io
+import json
+import pathlib
+from types import TracebackType
+from typing import Any, Optional, Type
+
+from .classes import MtgjsonMetaObject
+from .compress_generator import discard_output_file, open_output_file
+
+
+class MtgjsonStreamWriter:
+    """
+    Writes {"meta": ..., "data": ...} either one data entry at a time, so only
+    the entry being written has to be held in memory, or as a single data
+    object. Output is byte-identical to dumping the whole object at once with
+    json.dump(), only sorting the keys of the data
+    """
+
+    pretty_print: bool
+    sort_keys: bool
+    write_file: pathlib.Path
+    __file: io.TextIOWrapper
+    __open: bool
+    __entries_written: int
+    __data_written: bool
+
+    def __init__(
+        self, write_file: pathlib.Path, pretty_print: bool, sort_keys: bool = True
+    ) -> None:
+        """
+        Open the output file and write the meta header
+        :param write_file: File to write to
+        :param pretty_print: Pretty or minimal
+        :param sort_keys: Should data keys be sorted within each entry
+        """
+        self.pretty_print = pretty_print
+        self.sort_keys = sort_keys
+        self.write_file = write_file
+        self.__entries_written = 0
+        self.__data_written = False
+
+        self.__file = open_output_file(write_file)
+        self.__open = True
+        self.__file.write(f'{{{self.__newline(1)}"meta": ')
+        self.__write_encoded(MtgjsonMetaObject(), 1, False)
+        self.__file.write(f',{self.__newline(1) if pretty_print else " "}"data": ')
+
+    def __enter__(self) -> "MtgjsonStreamWriter":
+        return self
+
+    def __exit__(
+        self,
+        exc_type: Optional[Type[BaseException]],
+        exc_value: Optional[BaseException],
+        traceback: Optional[TracebackType],
+    ) -> None:
+        if exc_type:
+            # Don't make a partial file look complete
+            self.discard()
+        self.close()
+
+    def __newline(self, depth: int) -> str:
+        """
+        Line break and indentation for a nesting depth, if pretty printing
+        :param depth: How deeply nested the next line is
+        :return: Separator to write
+        """
+        return "\n" + " " * 4 * depth if self.pretty_print else ""
+
+    def __write_encoded(self, content: Any, depth: int, sort_keys: bool) -> None:
+        """
+        Serialize content the way it would appear nested in the file
+        :param content: Content to serialize
+        :param depth: How deeply nested the content is
+        :param sort_keys: Should keys be sorted
+        """
+        if not self.pretty_print:
+            # One shot encoding is done in C, and is much faster
+            self.__file.write(
+                json.dumps(
+                    content,
+                    sort_keys=sort_keys,
+                    ensure_ascii=False,
+                    default=lambda o: o.to_json(),
+                )
+            )
+            return
+
+        # Indented encoding is done in Python either way, so write it
+        # piece by piece instead of building the whole string first
+        encoder = json.JSONEncoder(
+            indent=4,
+            sort_keys=sort_keys,
+            ensure_ascii=False,
+            default=lambda o: o.to_json(),
+        )
+        newline = self.__newline(depth)
+        for chunk in encoder.iterencode(content):
+            # Encoded strings never contain raw line breaks, so every
+            # line break is formatting that needs to be indented further
+            self.__file.write(chunk.replace("\n", newline))
+
+    def write(self, key: str, content: Any) -> None:
+        """
+        Write a single entry of the data object. Entries are written in
+        the order given, so callers wanting sorted keys must sort them
+        :param key: Key of the entry (Ex: Set code)
+        :param content: Contents of the entry
+        """
+        if self.__data_written:
+            raise ValueError("Data was already written as a single object")
+
+        separator = "," if self.pretty_print else ", "
+        self.__file.write(
+            f"{separator if self.__entries_written else '{'}{self.__newline(2)}"
+            f"{json.dumps(key, ensure_ascii=False)}: "
+        )
+        self.__write_encoded(content, 2, self.sort_keys)
+        self.__entries_written += 1
+
+    def write_data(self, content: Any) -> None:
+        """
+        Write the whole data object at once, for outputs that
+        aren't split into entries (Ex: SetList is a list)
+        :param content: Contents of the data object
+        """
+        if self.__data_written or self.__entries_written:
+            raise ValueError("Data was already written")
+
+        self.__write_encoded(content, 1, self.sort_keys)
+        self.__data_written = True
+
+    def close(self) -> None:
+        """
+        Close the data object and the output file
+        """
+        if not self.__open:
+            return
+
+        if self.__entries_written:
+            closing = f"{self.__newline(1)}}}"
+        elif self.__data_written:
+            closing = ""
+        else:
+            closing = "{}"
+        self.__file.write(f"{closing}{self.__newline(0)}}}")
+        self.__file.close()
+        self.__open = False
+
+    def discard(self) -> None:
+        """
+        Stop writing, and remove the partial output along with any
+        compressed copies and hashes of it written alongside
+        """
+        if not self.__open:
+            return
+
+        self.__open = False
+        discard_output_file(self.__file, self.write_file)
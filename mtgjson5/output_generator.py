@@ -1,181 +1,154 @@
 """
 MTGJSON output generator to write out contents to file & accessory methods
 """
-import json
 import logging
+import os
 import pathlib
-from typing import Any, Dict, List
+import time
+from typing import Any, Dict, Iterable, List, Sequence, Tuple
+
+import gevent.threadpool
 
 from . import constants
+from .all_printings_sinks import (
+    AbstractAllPrintingsSink,
+    AllIdentifiersSink,
+    AllPrintingsFileSink,
+    AtomicCardsSink,
+    DeckCardIndexSink,
+    EnumValuesSink,
+    FormatPrintingsSink,
+    SetListSink,
+)
 from .classes import MtgjsonDeckHeaderObject, MtgjsonMetaObject
 from .compiled_classes import (
-    MtgjsonAllIdentifiersObject,
     MtgjsonAllPrintingsObject,
     MtgjsonAtomicCardsObject,
     MtgjsonCardTypesObject,
     MtgjsonCompiledListObject,
     MtgjsonDeckListObject,
-    MtgjsonEnumValuesObject,
     MtgjsonKeywordsObject,
-    MtgjsonSetListObject,
     MtgjsonStructuresObject,
     MtgjsonTcgplayerSkusObject,
 )
 from .mtgjson_config import MtgjsonConfig
+from .mtgjson_stream_writer import MtgjsonStreamWriter
 from .price_builder import build_prices
 from .providers import GitHubDecksProvider
-from .utils import get_file_hash
+from .utils import get_file_hash, get_file_hash_path, is_file_hash_current
 
 LOGGER = logging.getLogger(__name__)
 
 
 def generate_compiled_prices_output(
-    all_price_data: Dict[str, Any], today_price_data: Dict[str, Any], pretty_print: bool
+    all_price_data: Iterable[Tuple[str, Dict[str, Any]]],
+    today_price_data: Dict[str, Any],
+    pretty_print: bool,
 ) -> None:
     """
-    Dump AllPrices to a file
-    :param all_price_data: Data to dump for larger file
+    Dump AllPrices to a file, a card at a time
+    :param all_price_data: Prices of each card to dump for larger file
     :param today_price_data: data to dump for smaller file
     :param pretty_print: Pretty or minimal
     """
     LOGGER.info("Building Prices")
-    create_compiled_output(
+    create_streamed_compiled_output(
         MtgjsonStructuresObject().all_prices,
         all_price_data,
         pretty_print,
         sort_keys=False,
     )
 
-    create_compiled_output(
+    create_streamed_compiled_output(
         MtgjsonStructuresObject().all_prices_today,
-        today_price_data,
+        today_price_data.items(),
         pretty_print,
         sort_keys=False,
     )
 
 
-def build_format_specific_files(
-    all_printings: MtgjsonAllPrintingsObject, pretty_print: bool
+def build_atomic_specific_files(
+    atomic_cards_by_format: Dict[str, MtgjsonAtomicCardsObject], pretty_print: bool
 ) -> None:
-    """
-    Compile *Printings files based on AllPrintings
-    :param all_printings: Holder of AllPrintings content
-    :param pretty_print: Should outputs be pretty or minimal
-    """
-    # Format specific set code split up
-    format_map = construct_format_map()
-
-    # Standard.json
-    create_compiled_output(
-        MtgjsonStructuresObject().all_printings_standard,
-        all_printings.get_set_contents(format_map["standard"]),
-        pretty_print,
-    )
-
-    # Pioneer.json
-    create_compiled_output(
-        MtgjsonStructuresObject().all_printings_pioneer,
-        all_printings.get_set_contents(format_map["pioneer"]),
-        pretty_print,
-    )
-
-    # Modern.json
-    create_compiled_output(
-        MtgjsonStructuresObject().all_printings_modern,
-        all_printings.get_set_contents(format_map["modern"]),
-        pretty_print,
-    )
-
-    # Legacy.json
-    create_compiled_output(
-        MtgjsonStructuresObject().all_printings_legacy,
-        all_printings.get_set_contents(format_map["legacy"]),
-        pretty_print,
-    )
-
-    # Vintage.json
-    create_compiled_output(
-        MtgjsonStructuresObject().all_printings_vintage,
-        all_printings.get_set_contents(format_map["vintage"]),
-        pretty_print,
-    )
-
-
-def build_atomic_specific_files(pretty_print: bool) -> None:
     """
     Compile *Atomic files based on AtomicCards
+    :param atomic_cards_by_format: Atomic cards legal in each format
     :param pretty_print: Should outputs be pretty or minimal
     """
-    # Format specific card split up
-    card_format_map = construct_atomic_cards_format_map()
-
     # StandardCards.json
     create_compiled_output(
         MtgjsonStructuresObject().atomic_cards_standard,
-        MtgjsonAtomicCardsObject(card_format_map["standard"]),
+        atomic_cards_by_format["standard"],
         pretty_print,
     )
 
     # PioneerCards.json
     create_compiled_output(
         MtgjsonStructuresObject().atomic_cards_pioneer,
-        MtgjsonAtomicCardsObject(card_format_map["pioneer"]),
+        atomic_cards_by_format["pioneer"],
         pretty_print,
     )
 
     # ModernCards.json
     create_compiled_output(
         MtgjsonStructuresObject().atomic_cards_modern,
-        MtgjsonAtomicCardsObject(card_format_map["modern"]),
+        atomic_cards_by_format["modern"],
         pretty_print,
     )
 
     # LegacyCards.json
     create_compiled_output(
         MtgjsonStructuresObject().atomic_cards_legacy,
-        MtgjsonAtomicCardsObject(card_format_map["legacy"]),
+        atomic_cards_by_format["legacy"],
         pretty_print,
     )
 
     # VintageCards.json
     create_compiled_output(
         MtgjsonStructuresObject().atomic_cards_vintage,
-        MtgjsonAtomicCardsObject(card_format_map["vintage"]),
+        atomic_cards_by_format["vintage"],
         pretty_print,
     )
 
     # PauperCards.json
     create_compiled_output(
         MtgjsonStructuresObject().atomic_cards_pauper,
-        MtgjsonAtomicCardsObject(card_format_map["pauper"]),
+        atomic_cards_by_format["pauper"],
         pretty_print,
     )
 
 
-def build_all_printings_files(pretty_print: bool) -> None:
+def build_all_printings_files(
+    pretty_print: bool, sinks: Sequence[AbstractAllPrintingsSink] = ()
+) -> None:
     """
-    Construct all entities that rely upon AllPrintings
-    to avoid loading them into RAM too many times
+    Construct all entities that rely upon AllPrintings, reading
+    and parsing each set only once and handing it to every sink
     :param pretty_print: Pretty or minimal
+    :param sinks: Additional sinks to feed each set to
     """
     all_printings = MtgjsonAllPrintingsObject()
-
-    # AllPrintings.json
-    create_compiled_output(
-        MtgjsonStructuresObject().all_printings,
-        all_printings.get_set_contents(),
-        pretty_print,
-    )
-
-    # <FORMAT>.json
-    build_format_specific_files(all_printings, pretty_print)
-
-    # AllIdentifiers.json
-    create_compiled_output(
-        MtgjsonStructuresObject().all_identifiers,
-        MtgjsonAllIdentifiersObject(all_printings.to_json()),
-        pretty_print,
-    )
+    all_sinks: List[AbstractAllPrintingsSink] = [
+        # AllPrintings.json
+        AllPrintingsFileSink(pretty_print),
+        # <FORMAT>.json
+        FormatPrintingsSink(pretty_print),
+        # AllIdentifiers.json
+        AllIdentifiersSink(pretty_print),
+        *sinks,
+    ]
+
+    try:
+        for set_code, set_contents in all_printings.iterate_set_contents():
+            for sink in all_sinks:
+                sink.add_set(set_code, set_contents)
+    except BaseException:
+        for sink in all_sinks:
+            sink.discard()
+        raise
+
+    for sink in all_sinks:
+        sink.close()
 
 
 def generate_compiled_output_files(pretty_print: bool) -> None:
@@ -185,8 +158,16 @@ def generate_compiled_output_files(pretty_print: bool) -> None:
     """
     LOGGER.info("Building Compiled Outputs")
 
-    # AllPrintings, <FORMAT>, & AllIdentifiers
-    build_all_printings_files(pretty_print)
+    # AllPrintings, <FORMAT>, & AllIdentifiers, collecting
+    # what the other outputs need from AllPrintings on the way
+    atomic_cards_sink = AtomicCardsSink()
+    set_list_sink = SetListSink()
+    enum_values_sink = EnumValuesSink()
+    deck_card_index_sink = DeckCardIndexSink()
+    build_all_printings_files(
+        pretty_print,
+        [atomic_cards_sink, set_list_sink, enum_values_sink, deck_card_index_sink],
+    )
 
     # AllTcgplayerSkus.json
     create_compiled_output(
@@ -230,22 +211,24 @@ def generate_compiled_output_files(pretty_print: bool) -> None:
 
     # SetList.json
     create_compiled_output(
-        MtgjsonStructuresObject().set_list, MtgjsonSetListObject(), pretty_print
+        MtgjsonStructuresObject().set_list, set_list_sink.get_set_list(), pretty_print
     )
 
     # AtomicCards.json
     create_compiled_output(
         MtgjsonStructuresObject().atomic_cards,
-        MtgjsonAtomicCardsObject(),
+        atomic_cards_sink.atomic_cards,
         pretty_print,
     )
 
     # <FORMAT>Atomic.json
-    build_atomic_specific_files(pretty_print)
+    build_atomic_specific_files(atomic_cards_sink.atomic_cards_by_format, pretty_print)
 
     # All Pre-constructed Decks
     deck_names = []
-    for mtgjson_deck_obj in GitHubDecksProvider().iterate_precon_decks():
+    for mtgjson_deck_obj in GitHubDecksProvider().iterate_precon_decks(
+        deck_card_index_sink.deck_card_index
+    ):
         mtgjson_deck_header_obj = MtgjsonDeckHeaderObject(mtgjson_deck_obj)
         create_compiled_output(
             f"decks/{mtgjson_deck_header_obj.file_name}",
@@ -264,7 +247,7 @@ def generate_compiled_output_files(pretty_print: bool) -> None:
     # EnumValues.json - Depends on Keywords & Decks
     create_compiled_output(
         MtgjsonStructuresObject().enum_values,
-        MtgjsonEnumValuesObject(),
+        enum_values_sink.get_enum_values(),
         pretty_print,
     )
 
@@ -284,104 +267,43 @@ def create_compiled_output(
     LOGGER.debug(f"Finished Generating {compiled_name}")
 
 
-def construct_format_map(
-    all_printings_path: pathlib.Path = MtgjsonConfig().output_path.joinpath(
-        f"{MtgjsonStructuresObject().all_printings}.json"
-    ),
-    normal_sets_only: bool = True,
-) -> Dict[str, List[str]]:
-    """
-    For each set in AllPrintings, determine what format(s) the set is
-    legal in and put the set's key into that specific entry in the
-    return value.
-    :param all_printings_path: Path to AllPrintings.json
-    :param normal_sets_only: Should we only handle normal sets
-    :return: Format Map for future identifications
-    """
-    format_map: Dict[str, List[str]] = {
-        magic_format: [] for magic_format in constants.SUPPORTED_FORMAT_OUTPUTS
-    }
-
-    if not all_printings_path.is_file():
-        LOGGER.warning(f"{all_printings_path} was not found, skipping format map")
-        return {}
-
-    with all_printings_path.open(encoding="utf-8") as file:
-        content = json.load(file)
-
-    for set_code_key, set_code_content in content.get("data", {}).items():
-        if (
-            normal_sets_only
-            and set_code_content.get("type") not in constants.SUPPORTED_SET_TYPES
-        ):
-            continue
-
-        formats_set_legal_in = constants.SUPPORTED_FORMAT_OUTPUTS
-        for card in set_code_content.get("cards"):
-            # Don't include Alchemy cards in determining legality
-            if card.get("name", "").startswith("A-"):
-                continue
-
-            card_legalities = set(card.get("legalities").keys())
-            formats_set_legal_in = formats_set_legal_in.intersection(card_legalities)
-
-        for magic_format in formats_set_legal_in:
-            format_map[magic_format].append(set_code_key)
-
-    return format_map
-
-
-def construct_atomic_cards_format_map(
-    all_printings_path: pathlib.Path = MtgjsonConfig().output_path.joinpath(
-        f"{MtgjsonStructuresObject().all_printings}.json"
-    ),
-) -> Dict[str, Any]:
+def create_streamed_compiled_output(
+    compiled_name: str,
+    compiled_entries: Iterable[Tuple[str, Any]],
+    pretty_print: bool,
+    sort_keys: bool = True,
+) -> None:
     """
-    Construct a format map for cards instead of sets,
-    allowing for easy parsing and dispatching to different
-    files.
-    :param all_printings_path: Path to AllPrintings.json
-    :return: Cards in a format map
+    Log and write out a compiled output file, an entry at a time
+    :param compiled_name: What file to save
+    :param compiled_entries: Keys and contents of the data entries, in order
+    :param pretty_print: Pretty or minimal
+    :param sort_keys: Sort the keys within each entry before dumping
     """
-    format_card_map: Dict[str, List[Dict[str, Any]]] = {
-        magic_format: [] for magic_format in constants.SUPPORTED_FORMAT_OUTPUTS
-    }
-
-    if not all_printings_path.is_file():
-        LOGGER.warning(f"{all_printings_path} was not found, skipping format map")
-        return {}
-
-    with all_printings_path.open(encoding="utf-8") as file:
-        content = json.load(file)
-
-    for set_contents in content.get("data", {}).values():
-        set_cards: List[Dict[str, Any]] = set_contents.get("cards", [])
-
-        # Workaround for Dungeons so they can be included
-        for token in set_contents.get("tokens", []):
-            if token.get("type") == "Dungeon":
-                token["legalities"] = {
-                    t_format: "Legal" for t_format in format_card_map.keys()
-                }
-                set_cards.append(token)
-
-        for card in set_cards:
-            for magic_format in format_card_map.keys():
-                if card.get("legalities", {}).get(magic_format) in {
-                    "Legal",
-                    "Restricted",
-                }:
-                    format_card_map[magic_format].append(card)
-
-    return format_card_map
+    LOGGER.info(f"Generating {compiled_name}")
+    with MtgjsonStreamWriter(
+        MtgjsonConfig().output_path.joinpath(f"{compiled_name}.json"),
+        pretty_print,
+        sort_keys,
+    ) as writer:
+        for key, content in compiled_entries:
+            writer.write(key, content)
+    LOGGER.debug(f"Finished Generating {compiled_name}")
 
 
 def generate_output_file_hashes(directory: pathlib.Path) -> None:
     """
     Given a directory, hash each file within it and write that hash
-    out to the file "FILENAME.HASH_NAME"
+    out to the file "FILENAME.HASH_NAME". Files are hashed across a
+    thread pool, and hashes already written alongside a file (Ex: while
+    compressing it inline) are reused if they are up to date
     :param directory: Directory to hash
     """
+    LOGGER.info(f"Hashing files in {directory.name}")
+    start_time = time.perf_counter()
+
+    files_to_hash = []
+    reused_hashes = 0
     for file in directory.glob("**/*"):
         if file.is_dir():
             continue
@@ -390,15 +312,58 @@ def generate_output_file_hashes(directory: pathlib.Path) -> None:
         if file.name.endswith(constants.HASH_TO_GENERATE.name):
             continue
 
-        generated_hash = get_file_hash(file)
-        if not generated_hash:
+        if is_file_hash_current(file):
+            reused_hashes += 1
             continue
 
-        hash_file_name = f"{file.name}.{constants.HASH_TO_GENERATE.name}"
-        with file.parent.joinpath(hash_file_name).open(
-            "w", encoding="utf-8"
-        ) as hash_file:
-            hash_file.write(generated_hash)
+        files_to_hash.append(file)
+
+    total_bytes = sum(file.stat().st_size for file in files_to_hash)
+    hash_workers = get_hash_worker_limit()
+    LOGGER.info(
+        f"Hashing {len(files_to_hash)} files ({total_bytes / 2**20:,.1f} MiB) "
+        f"with {hash_workers} threads, reusing {reused_hashes} hashes"
+    )
+
+    hashed_bytes = 0
+    last_progress_time = time.perf_counter()
+    # gevent's threads are native threads, so files are truly hashed in parallel
+    threadpool = gevent.threadpool.ThreadPool(hash_workers)
+    try:
+        for file, generated_hash in zip(
+            files_to_hash, threadpool.imap(get_file_hash, files_to_hash)
+        ):
+            hashed_bytes += file.stat().st_size
+            if not generated_hash:
+                continue
+
+            with get_file_hash_path(file).open("w", encoding="utf-8") as hash_file:
+                hash_file.write(generated_hash)
+
+            if time.perf_counter() - last_progress_time >= 10:
+                last_progress_time = time.perf_counter()
+                LOGGER.info(
+                    f"Hashed {hashed_bytes / 2**20:,.1f} of "
+                    f"{total_bytes / 2**20:,.1f} MiB"
+                )
+    finally:
+        threadpool.kill()
+
+    elapsed_time = time.perf_counter() - start_time
+    LOGGER.info(
+        f"Finished hashing {directory.name}: {hashed_bytes / 2**20:,.1f} MiB "
+        f"in {elapsed_time:.1f}s "
+        f"({hashed_bytes / 2**20 / max(elapsed_time, 1e-9):,.1f} MiB/s)"
+    )
+
+
+def get_hash_worker_limit() -> int:
+    """
+    Determine how many files can be hashed at once
+    :return: Configured worker limit, or one per CPU
+    """
+    hash_workers = MtgjsonConfig().get("MTGJSON", "hash_workers")
+    return max(1, int(hash_workers)) if hash_workers else os.cpu_count() or 1
 
 
 def write_to_file(
@@ -411,25 +376,10 @@ def write_to_file(
     :param pretty_print: Pretty or minimal
     :param sort_keys: Should data keys be sorted
     """
-    write_file = MtgjsonConfig().output_path.joinpath(f"{file_name}.json")
-    write_file.parent.mkdir(parents=True, exist_ok=True)
-
-    if sort_keys:
-        # NOTE: Super large files will cause this to run out of memory
-        file_contents = json.loads(
-            json.dumps(
-                file_contents,
-                sort_keys=True,
-                ensure_ascii=False,
-                default=lambda o: o.to_json(),
-            )
-        )
-
-    with write_file.open("w", encoding="utf-8") as file:
-        json.dump(
-            obj={"meta": MtgjsonMetaObject(), "data": file_contents},
-            fp=file,
-            indent=(4 if pretty_print else None),
-            ensure_ascii=False,
-            default=lambda o: o.to_json(),
-        )
+    with MtgjsonStreamWriter(
+        MtgjsonConfig().output_path.joinpath(f"{file_name}.json"),
+        pretty_print,
+        sort_keys,
+    ) as writer:
+        # Keys are sorted as the contents are serialized, in a single pass
+        writer.write_data(file_contents)
@@ -5,16 +5,18 @@ import datetime
 import json
 import logging
 import lzma
-import pathlib
-import subprocess
-from typing import Any, Dict, Tuple
+import shutil
+import time
+from typing import Any, Dict, Iterable, List, Optional, Tuple
 
 import dateutil.relativedelta
-import mergedeep
+import gevent
 import requests
 
 from . import constants
+from .classes import MtgjsonPricesAccumulator, MtgjsonPricesObject
 from .mtgjson_config import MtgjsonConfig
+from .mtgjson_price_archive import MtgjsonPriceArchive
 from .mtgjson_s3_handler import MtgjsonS3Handler
 from .providers import (
     CardHoarderProvider,
@@ -26,38 +28,35 @@ from .providers import (
 
 LOGGER = logging.getLogger(__name__)
 
+PRICE_PROVIDERS = (
+    CardHoarderProvider,
+    TCGPlayerProvider,
+    CardMarketProvider,
+    CardKingdomProvider,
+    MultiverseBridgeProvider,
+)
 
-def prune_prices_archive(content: Dict[str, Any], months: int = 3) -> None:
+
+def get_price_retention_months() -> int:
+    """
+    How long prices are archived for, from [Prices] retention_months
+    :return: Months of prices kept
+    """
+    return int(MtgjsonConfig().get("Prices", "retention_months", fallback="3"))
+
+
+def get_prune_date(months: Optional[int] = None) -> str:
     """
-    Prune entries from the MTGJSON database that are older than `months` old
-    :param content: Dataset to modify
-    :param months: How many months back should we keep (default = 3)
+    Get the date prices older than `months` old are pruned before
+    :param months: How many months back should we keep (default = configured)
+    :return: Oldest date kept
     """
-    prune_date_str = (
+    if months is None:
+        months = get_price_retention_months()
+
+    return (
         datetime.date.today() + dateutil.relativedelta.relativedelta(months=-months)
     ).strftime("%Y-%m-%d")
-    keys_pruned = 0
-
-    def prune_recursive(obj: Dict[str, Any], depth: int = 0) -> None:
-        """
-        Recursive pruner to pluck out bad dates and empty fields
-        """
-        nonlocal keys_pruned
-        if depth == 5:
-            for date in list(obj.keys()):
-                if date < prune_date_str:
-                    del obj[date]
-                    keys_pruned += 1
-        elif isinstance(obj, dict):
-            for key, value in list(obj.items()):
-                prune_recursive(value, depth + 1)
-                if not value:
-                    del obj[key]
-                    keys_pruned += 1
-
-    LOGGER.info("Determining keys to prune")
-    prune_recursive(content)
-    LOGGER.info(f"Pruned {keys_pruned} structs")
 
 
 def build_today_prices() -> Dict[str, Any]:
@@ -71,41 +70,73 @@ def build_today_prices() -> Dict[str, Any]:
         )
         return {}
 
-    card_hoarder = _generate_prices(CardHoarderProvider())
-    tcgplayer = _generate_prices(TCGPlayerProvider())
-    card_market = _generate_prices(CardMarketProvider())
-    card_kingdom = _generate_prices(CardKingdomProvider())
-    cardsphere = _generate_prices(MultiverseBridgeProvider())
+    # Providers spend most of their time downloading, so fetch them all at once
+    timeout = get_price_provider_timeout()
+    greenlets = [
+        gevent.spawn(_generate_prices, provider_class, timeout)
+        for provider_class in PRICE_PROVIDERS
+    ]
+    gevent.joinall(greenlets)
 
-    final_results: Dict[str, Any] = {}
-    mergedeep.merge(
-        final_results, card_hoarder, tcgplayer, card_market, card_kingdom, cardsphere
-    )
+    # Merge in a fixed order, no matter which provider finished first
+    final_results = MtgjsonPricesAccumulator()
+    for greenlet in greenlets:
+        final_results.add_all(greenlet.value or {})
 
-    return final_results
+    return final_results.to_json()
 
 
-def _generate_prices(provider: Any) -> Dict[str, Any]:
+def get_price_provider_timeout() -> Optional[float]:
     """
-    Generate the prices for a source and prepare them for
-    merging with other entities
-    :param provider: MTGJSON Provider that implements generate_today_price_dict
-    :return Manageable data for MTGJSON prices
+    How long each price provider may take, from [MTGJSON] price_provider_timeout.
+    The timeout can only interrupt a provider while it waits on I/O, so
+    CPU bound work (Ex: parsing a price guide) runs past it until it yields
+    :return: Seconds before a price provider is abandoned, or None for no limit
     """
+    timeout_option = MtgjsonConfig().get(
+        "MTGJSON", "price_provider_timeout", fallback="3600"
+    )
     try:
-        preprocess_prices = provider.generate_today_price_dict(
-            MtgjsonConfig().output_path.joinpath("AllPrintings.json")
+        timeout = float(timeout_option)
+    except ValueError:
+        LOGGER.warning(
+            f"Invalid price_provider_timeout {timeout_option}, using 3600 seconds"
         )
+        timeout = 3600
+    return timeout if timeout > 0 else None
 
-        final_prices: Dict[str, Any] = json.loads(
-            json.dumps(preprocess_prices, default=lambda o: o.to_json())
-        )
-        return final_prices
-    except Exception as exception:
+
+def _generate_prices(
+    provider_class: Any, timeout: Optional[float] = None
+) -> Dict[str, MtgjsonPricesObject]:
+    """
+    Generate the prices for a source
+    :param provider_class: MTGJSON Provider that implements generate_today_price_dict
+    :param timeout: Seconds the provider may wait on I/O, if limited
+    :return Prices of each card, by MTGJSON UUID
+    """
+    provider_name = provider_class.__name__
+    all_printings_path = MtgjsonConfig().output_path.joinpath("AllPrintings.json")
+    final_prices: Dict[str, MtgjsonPricesObject]
+    start_time = time.perf_counter()
+    try:
+        with gevent.Timeout(timeout):
+            provider = provider_class()
+            final_prices = provider.generate_today_price_dict(all_printings_path)
+    except gevent.Timeout:
         LOGGER.error(
-            f"Failed to compile for {type(provider).__name__} with error: {exception}"
+            f"Failed to compile for {provider_name}: timed out after {timeout}s"
         )
         return {}
+    except Exception as exception:
+        LOGGER.error(f"Failed to compile for {provider_name} with error: {exception}")
+        return {}
+
+    LOGGER.info(
+        f"Compiled {provider_name} prices for {len(final_prices)} cards "
+        f"in {time.perf_counter() - start_time:.1f}s"
+    )
+    return final_prices
 
 
 def get_price_archive_data(
@@ -135,29 +166,129 @@ def get_price_archive_data(
     return contents
 
 
-def write_price_archive_data(
-    local_save_path: pathlib.Path, price_data: Dict[str, Any]
-) -> None:
+def get_price_partitions_path(bucket_object_path: str) -> str:
     """
-    Write price data to a compressed archive file
-    :param local_save_path: Where to save compressed archive file
-    :param price_data: Data to compress into that archive file
+    Where the partitions of the price archive are kept in the bucket
+    :param bucket_object_path: Path of the single file price archive
+    :return: Path within the bucket partitions are kept under
     """
-    local_save_path.parent.mkdir(parents=True, exist_ok=True)
-    tmp_save_path = local_save_path.parent.joinpath(local_save_path.stem)
+    return (
+        MtgjsonConfig().get("Prices", "bucket_partitions_path", fallback="")
+        or f"{bucket_object_path}.partitions"
+    )
 
-    LOGGER.info(f"Dumping price data to {tmp_save_path}")
-    with tmp_save_path.open("w") as temp_file:
-        json.dump(price_data, temp_file)
-    LOGGER.info(
-        f"Finished writing to {tmp_save_path} (Size = {tmp_save_path.stat().st_size} bytes)"
+
+def download_price_archive(
+    archive: MtgjsonPriceArchive, bucket_name: str, bucket_object_path: str
+) -> List[str]:
+    """
+    Download the partitions of the price archive that changed since they
+    were last downloaded. An archive that's still a single file is split
+    into partitions instead, the first time
+    :param archive: Local price archive
+    :param bucket_name: Bucket the archive is kept in
+    :param bucket_object_path: Path of the single file price archive
+    :return: Dates that only exist locally, and must be uploaded
+    :raises RuntimeError: If the archive couldn't be fully downloaded
+    """
+    partitions_path = get_price_partitions_path(bucket_object_path)
+    remote_partitions = MtgjsonS3Handler().list_objects(
+        bucket_name, f"{partitions_path}/"
     )
+    if remote_partitions is None:
+        # Splitting the single archive again would overwrite newer partitions
+        raise RuntimeError(
+            f"Unable to list price archive partitions in s3://{bucket_name}/{partitions_path}"
+        )
+    if not remote_partitions:
+        LOGGER.info("No price archive partitions found, splitting single archive")
+        return archive.add_prices(
+            get_price_archive_data(bucket_name, bucket_object_path)
+        )
 
-    LOGGER.info(f"Compressing {tmp_save_path} for upload")
-    subprocess.check_call(["xz", str(tmp_save_path)])
-    LOGGER.info(
-        f"Finished compressing content to {local_save_path} (Size = {local_save_path.stat().st_size} bytes)"
+    failed_dates = []
+    for partition_object_path, etag in sorted(remote_partitions.items()):
+        date = partition_object_path.rsplit("/", 1)[-1].split(".", 1)[0]
+        partition_path = archive.get_partition_path(date)
+        etag_path = partition_path.with_suffix(".etag")
+        if (
+            partition_path.is_file()
+            and etag_path.is_file()
+            and etag_path.read_text(encoding="utf-8") == etag
+        ):
+            continue
+
+        LOGGER.info(f"Downloading price archive partition {date}")
+        compressed_path = partition_path.with_suffix(".sqlite.xz")
+        if not MtgjsonS3Handler().download_file(
+            bucket_name, partition_object_path, str(compressed_path)
+        ):
+            failed_dates.append(date)
+            continue
+
+        with lzma.open(compressed_path) as source, partition_path.open("wb") as target:
+            shutil.copyfileobj(source, target)
+        compressed_path.unlink()
+        etag_path.write_text(etag, encoding="utf-8")
+
+    # Prices built without every day would be published with those days missing
+    if failed_dates:
+        raise RuntimeError(
+            f"Unable to download price archive partitions {', '.join(failed_dates)}"
+        )
+
+    return []
+
+
+def upload_price_archive(
+    archive: MtgjsonPriceArchive,
+    bucket_name: str,
+    bucket_object_path: str,
+    dates: List[str],
+    prune_date: str,
+) -> None:
+    """
+    Upload the partitions of the price archive that changed,
+    and delete those that expired
+    :param archive: Local price archive
+    :param bucket_name: Bucket the archive is kept in
+    :param bucket_object_path: Path of the single file price archive
+    :param dates: Dates that changed
+    :param prune_date: Partitions before this date have expired
+    """
+    partitions_path = get_price_partitions_path(bucket_object_path)
+
+    for date in dates:
+        partition_path = archive.get_partition_path(date)
+        if not partition_path.is_file():
+            continue
+
+        compressed_path = partition_path.with_suffix(".sqlite.xz")
+        with partition_path.open("rb") as source, lzma.open(
+            compressed_path, "wb"
+        ) as target:
+            shutil.copyfileobj(source, target)
+
+        partition_object_path = f"{partitions_path}/{compressed_path.name}"
+        if MtgjsonS3Handler().upload_file(
+            str(compressed_path), bucket_name, partition_object_path
+        ):
+            object_head = MtgjsonS3Handler().get_object_head(
+                bucket_name, partition_object_path
+            )
+            if object_head:
+                partition_path.with_suffix(".etag").write_text(
+                    object_head["ETag"], encoding="utf-8"
+                )
+        compressed_path.unlink()
+
+    remote_partitions = MtgjsonS3Handler().list_objects(
+        bucket_name, f"{partitions_path}/"
     )
+    for partition_object_path in remote_partitions or {}:
+        if partition_object_path.rsplit("/", 1)[-1] < prune_date:
+            LOGGER.info(f"Deleting expired price partition {partition_object_path}")
+            MtgjsonS3Handler().delete_object(bucket_name, partition_object_path)
 
 
 def download_old_all_printings() -> None:
@@ -180,11 +311,13 @@ def download_old_all_printings() -> None:
         f.write(lzma.decompress(file_bytes).decode())
 
 
-def build_prices() -> Tuple[Dict[str, Any], Dict[str, Any]]:
+def build_prices() -> Tuple[Iterable[Tuple[str, Dict[str, Any]]], Dict[str, Any]]:
     """
     The full build prices operation
     Prune & Update remote database
-    :return Latest prices
+    :return Prices of each card, read from the archive as they're iterated,
+    and today's prices
+    :raises RuntimeError: If the price archive couldn't be downloaded
     """
     LOGGER.info("Prices Build - Building Prices")
 
@@ -198,31 +331,37 @@ def build_prices() -> Tuple[Dict[str, Any], Dict[str, Any]]:
     today_prices = build_today_prices()
     if not today_prices:
         LOGGER.warning("Pricing information failed to generate")
-        return {}, {}
+        return [], {}
 
-    if not MtgjsonConfig().has_section("Prices"):
-        return today_prices, today_prices
+    # Blank settings, as in the example config, mean there's no archive
+    if not (
+        MtgjsonConfig().has_option("Prices", "bucket_name")
+        and MtgjsonConfig().has_option("Prices", "bucket_object_path")
+    ):
+        return today_prices.items(), today_prices
 
     bucket_name = MtgjsonConfig().get("Prices", "bucket_name")
     bucket_object_path = MtgjsonConfig().get("Prices", "bucket_object_path")
 
-    archive_prices = get_price_archive_data(bucket_name, bucket_object_path)
-
-    # Update local copy of database
-    LOGGER.info("Merging old and new price data")
-    mergedeep.merge(archive_prices, today_prices)
+    # Only today's partition is added, and expired partitions dropped whole
+    archive = MtgjsonPriceArchive()
+    changed_dates = download_price_archive(archive, bucket_name, bucket_object_path)
+    changed_dates += archive.add_prices(today_prices)
 
     # Prune local copy of database
     LOGGER.info("Pruning price data")
-    prune_prices_archive(archive_prices)
-
-    LOGGER.info("Compressing price data")
-    local_zip_file = constants.CACHE_PATH.joinpath(bucket_object_path)
-    write_price_archive_data(local_zip_file, archive_prices)
+    prune_date = get_prune_date()
+    for date in archive.prune(prune_date):
+        archive.get_partition_path(date).with_suffix(".etag").unlink(missing_ok=True)
 
     # Push changes to remote database
     LOGGER.info("Uploading price data")
-    MtgjsonS3Handler().upload_file(str(local_zip_file), bucket_name, bucket_object_path)
-    local_zip_file.unlink()
+    upload_price_archive(
+        archive,
+        bucket_name,
+        bucket_object_path,
+        sorted(set(changed_dates)),
+        prune_date,
+    )
 
-    return archive_prices, today_prices
+    return archive.iterate_card_prices(), today_prices
@@ -7,11 +7,13 @@ import datetime
 import logging
 from typing import Any, Dict, List, Optional, Set, Union
 
+import requests
 import requests_cache
 
 from mtgjson5 import constants
 from mtgjson5.classes import MtgjsonPricesObject
 from mtgjson5.mtgjson_config import MtgjsonConfig
+from mtgjson5.utils import get_pooled_session
 
 LOGGER = logging.getLogger(__name__)
 
@@ -66,6 +68,14 @@ class AbstractProvider(abc.ABC):
         """
         return cls.class_id
 
+    def get_session(self) -> Union[requests.Session, requests_cache.CachedSession]:
+        """
+        Get this provider's pooled session, which keeps
+        connections alive between downloads
+        :return: Session that does downloading
+        """
+        return get_pooled_session(self.get_class_name())
+
     @staticmethod
     def log_download(response: Any) -> None:
         """
@@ -3,15 +3,14 @@ CardHoarder 3rd party provider
 """
 import logging
 import pathlib
-from collections import defaultdict
 from typing import Any, Dict, List, Optional, Set, Union
 
 from singleton_decorator import singleton
 
 from ..classes import MtgjsonPricesObject
 from ..mtgjson_config import MtgjsonConfig
+from ..mtgjson_identifier_index import MtgjsonIdentifierIndex
 from ..providers.abstract import AbstractProvider
-from ..utils import get_all_cards_and_tokens, retryable_session
 
 LOGGER = logging.getLogger(__name__)
 
@@ -65,7 +64,7 @@ class CardHoarderProvider(AbstractProvider):
         :param url: URL to download from
         :param params: Options for URL download
         """
-        session = retryable_session()
+        session = self.get_session()
         session.headers.update(self.session_header)
 
         response = session.get(url)
@@ -165,12 +164,14 @@ class CardHoarderProvider(AbstractProvider):
         :param all_printings_path: AllPrintings to generate mapping from
         :return MTGO to MTGJSON mapping
         """
-        mtgo_to_mtgjson: Dict[str, Set[str]] = defaultdict(set)
-        for card in get_all_cards_and_tokens(all_printings_path):
-            identifiers = card["identifiers"]
-            if "mtgoId" in identifiers:
-                mtgo_to_mtgjson[identifiers["mtgoId"]].add(card["uuid"])
-            if "mtgoFoilId" in identifiers:
-                mtgo_to_mtgjson[identifiers["mtgoFoilId"]].add(card["uuid"])
+        mtgo_to_mtgjson = MtgjsonIdentifierIndex().get_mapping(
+            all_printings_path, "mtgoId"
+        )
+        for mtgo_foil_id, mtgjson_uuids in (
+            MtgjsonIdentifierIndex()
+            .get_mapping(all_printings_path, "mtgoFoilId")
+            .items()
+        ):
+            mtgo_to_mtgjson[mtgo_foil_id].update(mtgjson_uuids)
 
         return mtgo_to_mtgjson
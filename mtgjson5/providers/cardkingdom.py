@@ -10,8 +10,8 @@ from singleton_decorator import singleton
 
 from .. import constants
 from ..classes import MtgjsonPricesObject, MtgjsonSealedProductObject
+from ..mtgjson_identifier_index import MtgjsonIdentifierIndex
 from ..providers.abstract import AbstractProvider
-from ..utils import generate_card_mapping, retryable_session
 
 LOGGER = logging.getLogger(__name__)
 
@@ -47,7 +47,7 @@ class CardKingdomProvider(AbstractProvider):
         :param url: URL to download from
         :param params: Options for URL download
         """
-        session = retryable_session()
+        session = self.get_session()
         session.headers.update(self.session_header)
 
         response = session.get(url)
@@ -75,14 +75,14 @@ class CardKingdomProvider(AbstractProvider):
         price_data_rows = request_api_response.get("data", [])
 
         # Start with non-foil IDs
-        card_kingdom_id_to_mtgjson = generate_card_mapping(
-            all_printings_path, ("identifiers", "cardKingdomId"), ("uuid",)
+        card_kingdom_id_to_mtgjson = MtgjsonIdentifierIndex().get_mapping(
+            all_printings_path, "cardKingdomId"
         )
 
         # Then add in foil IDs
         card_kingdom_id_to_mtgjson.update(
-            generate_card_mapping(
-                all_printings_path, ("identifiers", "cardKingdomFoilId"), ("uuid",)
+            MtgjsonIdentifierIndex().get_mapping(
+                all_printings_path, "cardKingdomFoilId"
             )
         )
 
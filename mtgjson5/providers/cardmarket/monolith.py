@@ -11,7 +11,7 @@ import pathlib
 import time
 import zlib
 from collections import defaultdict
-from typing import Any, Dict, List, Optional, Union
+from typing import Any, Dict, List, Optional, Set, Union
 
 import mkmsdk.exceptions
 import pandas
@@ -19,11 +19,11 @@ from mkmsdk.api_map import _API_MAP
 from mkmsdk.mkm import Mkm
 from singleton_decorator import singleton
 
-from ... import constants
 from ...classes import MtgjsonPricesObject
 from ...mtgjson_config import MtgjsonConfig
+from ...mtgjson_identifier_index import MtgjsonIdentifierIndex
+from ...mtgjson_resources import MtgjsonResources
 from ...providers.abstract import AbstractProvider
-from ...utils import generate_card_mapping
 
 LOGGER = logging.getLogger(__name__)
 
@@ -94,46 +94,14 @@ class CardMarketProvider(AbstractProvider):
         if not self.__keys_found:
             return {}
 
-        mtgjson_id_map = generate_card_mapping(
-            all_printings_path, ("identifiers", "mcmId"), ("uuid",)
+        mtgjson_id_map = MtgjsonIdentifierIndex().get_mapping(
+            all_printings_path, "mcmId"
         )
 
         LOGGER.info("Building CardMarket retail data")
         price_data: pandas.DataFrame = pandas.read_csv(self._get_card_market_data())
-        data_frame_columns = list(price_data.columns)
 
-        product_id_index = data_frame_columns.index("idProduct")
-        avg_sell_price_index = data_frame_columns.index("AVG1")
-        avg_foil_price_index = data_frame_columns.index("Foil AVG1")
-
-        today_dict: Dict[str, MtgjsonPricesObject] = {}
-        for row in pandas.DataFrame(price_data).iterrows():
-            columns: List[float] = [
-                -1 if math.isnan(value) else value for value in row[1].tolist()
-            ]
-
-            product_id = str(int(columns[product_id_index]))
-            if product_id in mtgjson_id_map:
-                mtgjson_uuids = mtgjson_id_map[product_id]
-                for mtgjson_uuid in mtgjson_uuids:
-                    avg_sell_price = columns[avg_sell_price_index]
-                    avg_foil_price = columns[avg_foil_price_index]
-
-                    if mtgjson_uuid not in today_dict:
-                        if avg_sell_price == -1 and avg_foil_price == -1:
-                            continue
-
-                        today_dict[mtgjson_uuid] = MtgjsonPricesObject(
-                            "paper", "cardmarket", self.today_date, "EUR"
-                        )
-
-                    if avg_sell_price != -1:
-                        today_dict[mtgjson_uuid].sell_normal = avg_sell_price
-
-                    if avg_foil_price != -1:
-                        today_dict[mtgjson_uuid].sell_foil = avg_foil_price
-
-        return today_dict
+        return build_today_prices(price_data, mtgjson_id_map, self.today_date)
 
     def __init_set_map(self) -> None:
         """
@@ -164,10 +132,7 @@ class CardMarketProvider(AbstractProvider):
             }
 
         # Update the set map with manual overrides
-        with constants.RESOURCE_PATH.joinpath("mkm_set_name_fixes.json").open(
-            encoding="utf-8"
-        ) as f:
-            mkm_set_name_fixes = json.load(f)
+        mkm_set_name_fixes = MtgjsonResources().get("mkm_set_name_fixes")
 
         for old_set_name, new_set_name in mkm_set_name_fixes.items():
             if old_set_name.lower() not in self.set_map:
@@ -287,3 +252,64 @@ class CardMarketProvider(AbstractProvider):
         for key in set_in_progress.keys():
             set_in_progress[key].sort(key=lambda x: x.get("number"))
         return set_in_progress
+
+
+def build_today_prices(
+    price_data: pandas.DataFrame,
+    mtgjson_id_map: Dict[str, Set[str]],
+    today_date: str,
+) -> Dict[str, MtgjsonPricesObject]:
+    """
+    Build a single-day price structure from a Card Market price guide,
+    joining the guide against the cards instead of walking it row by row
+    :param price_data: Price guide, with idProduct, AVG1 and Foil AVG1 columns
+    :param mtgjson_id_map: MCM product ID => MTGJSON UUIDs
+    :param today_date: Date the prices are for
+    :return MTGJSON prices single day structure
+    """
+    prices = pandas.DataFrame(
+        {
+            "idProduct": price_data["idProduct"].fillna(-1).astype("int64"),
+            "normal": price_data["AVG1"].astype(float),
+            "foil": price_data["Foil AVG1"].astype(float),
+        }
+    )
+    prices = prices[prices["normal"].notna() | prices["foil"].notna()]
+
+    # Product IDs are keyed as strings, so only those written the way
+    # an integer is can match a product in the price guide
+    uuids = pandas.DataFrame(
+        [
+            (int(product_id), mtgjson_uuid)
+            for product_id, mtgjson_uuids in mtgjson_id_map.items()
+            if product_id.lstrip("-").isdecimal() and str(int(product_id)) == product_id
+            for mtgjson_uuid in mtgjson_uuids
+        ],
+        columns=["idProduct", "uuid"],
+    ).astype({"idProduct": "int64"})
+
+    # When a product is listed more than once, later rows win,
+    # but missing prices never overwrite found ones
+    card_prices = (
+        prices.merge(uuids, on="idProduct")
+        .groupby("uuid", sort=False)[["normal", "foil"]]
+        .last()
+    )
+
+    today_dict: Dict[str, MtgjsonPricesObject] = {}
+    for mtgjson_uuid, avg_sell_price, avg_foil_price in zip(
+        card_prices.index.tolist(),
+        card_prices["normal"].tolist(),
+        card_prices["foil"].tolist(),
+    ):
+        today_dict[mtgjson_uuid] = MtgjsonPricesObject(
+            "paper", "cardmarket", today_date, "EUR"
+        )
+
+        if not math.isnan(avg_sell_price):
+            today_dict[mtgjson_uuid].sell_normal = avg_sell_price
+
+        if not math.isnan(avg_foil_price):
+            today_dict[mtgjson_uuid].sell_foil = avg_foil_price
+
+    return today_dict
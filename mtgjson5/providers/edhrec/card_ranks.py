@@ -5,7 +5,6 @@ from singleton_decorator import singleton
 
 from ...mtgjson_config import MtgjsonConfig
 from ...providers.abstract import AbstractProvider
-from ...utils import retryable_session
 
 LOGGER = logging.getLogger(__name__)
 
@@ -23,7 +22,7 @@ class EdhrecProviderCardRanks(AbstractProvider):
     def download(
         self, url: str, params: Optional[Dict[str, Union[str, int]]] = None
     ) -> Any:
-        session = retryable_session()
+        session = self.get_session()
         session.headers.update(self.session_header)
 
         response = session.get(url)
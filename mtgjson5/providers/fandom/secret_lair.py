@@ -4,7 +4,6 @@ import bs4
 from singleton_decorator import singleton
 
 from mtgjson5.providers.abstract import AbstractProvider
-from mtgjson5.utils import retryable_session
 
 
 @singleton
@@ -25,7 +24,7 @@ class FandomProviderSecretLair(AbstractProvider):
         for user consumption
         :returns Mapping of Card ID to Secret Lair Drop Name
         """
-        session = retryable_session()
+        session = self.get_session()
         response = session.get(url if url else self.PAGE_URL)
         self.log_download(response)
 
@@ -7,7 +7,7 @@ from typing import Any, Dict, Optional, Union
 from singleton_decorator import singleton
 
 from ..providers.abstract import AbstractProvider
-from ..utils import recursive_sort, retryable_session
+from ..utils import recursive_sort
 
 LOGGER = logging.getLogger(__name__)
 
@@ -43,7 +43,7 @@ class GitHubBoostersProvider(AbstractProvider):
         :param url: Download URL
         :param params: Options for URL download
         """
-        session = retryable_session()
+        session = self.get_session()
 
         response = session.get(url)
         self.log_download(response)
@@ -6,7 +6,7 @@ import json
 import logging
 import pathlib
 from collections import defaultdict
-from typing import Any, Dict, Iterator, List, Optional, Union
+from typing import Any, Dict, Iterator, List, Optional, Set, Union
 
 from singleton_decorator import singleton
 
@@ -15,10 +15,13 @@ from ..classes.mtgjson_deck import MtgjsonDeckObject
 from ..compiled_classes.mtgjson_structures import MtgjsonStructuresObject
 from ..mtgjson_config import MtgjsonConfig
 from ..providers.abstract import AbstractProvider
-from ..utils import parallel_call, retryable_session
+from ..utils import parallel_call
 
 LOGGER = logging.getLogger(__name__)
 
+# Set code -> MTGJSON UUID -> Cards with that UUID
+DeckCardIndex = Dict[str, Dict[str, List[Dict[str, Any]]]]
+
 
 @singleton
 class GitHubDecksProvider(AbstractProvider):
@@ -31,8 +34,9 @@ class GitHubDecksProvider(AbstractProvider):
     all_printings_file: pathlib.Path = MtgjsonConfig().output_path.joinpath(
         f"{MtgjsonStructuresObject().all_printings}.json"
     )
-    all_printings_cards: Dict[str, Any]
+    all_printings_cards: DeckCardIndex
     decks_by_set: Dict[str, List[MtgjsonDeckObject]]
+    __precon_decks: Optional[List[Dict[str, Any]]]
 
     def __init__(self) -> None:
         """
@@ -40,6 +44,7 @@ class GitHubDecksProvider(AbstractProvider):
         """
         super().__init__(self._build_http_header())
         self.decks_by_set = defaultdict(list)
+        self.__precon_decks = None
 
     def _build_http_header(self) -> Dict[str, str]:
         """
@@ -105,7 +110,7 @@ class GitHubDecksProvider(AbstractProvider):
         :param url: Download URL
         :param params: Options for URL download
         """
-        session = retryable_session()
+        session = self.get_session()
 
         response = session.get(url)
         self.log_download(response)
@@ -115,24 +120,57 @@ class GitHubDecksProvider(AbstractProvider):
         LOGGER.error(f"Error downloading GitHub Decks: {response} --- {response.text}")
         return []
 
-    def iterate_precon_decks(self) -> Iterator[MtgjsonDeckObject]:
+    def get_precon_decks(self) -> List[Dict[str, Any]]:
+        """
+        Get the pre-constructed decks, downloading them once
+        :return: Pre-constructed decks
+        """
+        if self.__precon_decks is None:
+            self.__precon_decks = self.download(self.decks_api_url)
+        return self.__precon_decks
+
+    def get_precon_deck_card_uuids(self) -> Dict[str, Set[str]]:
+        """
+        Get the cards the pre-constructed decks are built from, so
+        only those have to be indexed from AllPrintings
+        :return: Set code => MTGJSON UUIDs of the cards used from that set
+        """
+        card_uuids: Dict[str, Set[str]] = defaultdict(set)
+        for deck in self.get_precon_decks():
+            for decks_key in ("cards", "sideboard", "commander"):
+                for card in deck.get(decks_key, []):
+                    card_uuids[card["set_code"].upper()].add(card["mtgjson_uuid"])
+        return card_uuids
+
+    def iterate_precon_decks(
+        self, deck_card_index: Optional[DeckCardIndex] = None
+    ) -> Iterator[MtgjsonDeckObject]:
         """
         Iterate the pre-constructed headers file to generate
         full MTGJSON deck objects
+        :param deck_card_index: Cards already indexed from AllPrintings,
+        instead of reading AllPrintings again
         :return: Iterator of a deck object
         """
-        if not self.all_printings_file.is_file():
+        if deck_card_index is not None:
+            self.all_printings_cards = deck_card_index
+        elif not self.all_printings_file.is_file():
             LOGGER.error("Unable to construct decks. AllPrintings not found")
             return
-
-        if self.all_printings_file.stat().st_size <= 2000:
+        elif self.all_printings_file.stat().st_size <= 2000:
             LOGGER.error("Unable to construct decks. AllPrintings not fully formed")
             return
+        else:
+            with self.all_printings_file.open(encoding="utf-8") as file:
+                all_printings = json.load(file).get("data", {})
+
+            self.all_printings_cards = defaultdict(dict)
+            for set_code, set_contents in all_printings.items():
+                add_set_to_deck_card_index(
+                    self.all_printings_cards, set_code, set_contents
+                )
 
-        with self.all_printings_file.open(encoding="utf-8") as file:
-            self.all_printings_cards = json.load(file).get("data", {})
-
-        for deck in self.download(self.decks_api_url):
+        for deck in self.get_precon_decks():
             this_deck = MtgjsonDeckObject()
             this_deck.name = deck["name"]
             this_deck.code = deck["set_code"].upper()
@@ -159,6 +197,26 @@ class GitHubDecksProvider(AbstractProvider):
             yield this_deck
 
 
+def add_set_to_deck_card_index(
+    deck_card_index: DeckCardIndex,
+    set_code: str,
+    set_contents: Dict[str, Any],
+    card_uuids: Optional[Set[str]] = None,
+) -> None:
+    """
+    Index a set's cards by their MTGJSON UUID, for building decks
+    :param deck_card_index: Index to add to
+    :param set_code: Set code the set is stored under in AllPrintings
+    :param set_contents: Contents of the set
+    :param card_uuids: Only index these cards, if given
+    """
+    cards_by_uuid: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+    for mtgjson_card in set_contents.get("cards", []):
+        if card_uuids is None or mtgjson_card["uuid"] in card_uuids:
+            cards_by_uuid[mtgjson_card["uuid"]].append(mtgjson_card)
+    deck_card_index[set_code] = cards_by_uuid
+
+
 def build_single_card(card: Dict[str, Any]) -> List[Dict[str, Any]]:
     """
     Given a card, add components necessary to turn it into
@@ -171,15 +229,17 @@ def build_single_card(card: Dict[str, Any]) -> List[Dict[str, Any]]:
         card["set_code"].upper()
     )
 
-    if not set_to_build_from:
+    if set_to_build_from is None:
         LOGGER.warning(f"Set {card['set_code'].upper()} not found for {card['name']}")
         return []
 
-    for mtgjson_card in set_to_build_from["cards"]:
-        if card["mtgjson_uuid"] == mtgjson_card["uuid"]:
-            mtgjson_card["count"] = card["count"]
-            mtgjson_card["isFoil"] = card["foil"]
-            cards.append(copy.deepcopy(mtgjson_card))
+    for mtgjson_card in set_to_build_from.get(card["mtgjson_uuid"], []):
+        # Copied, as the indexed card may be used by other outputs
+        cards.append(
+            copy.deepcopy(
+                {**mtgjson_card, "count": card["count"], "isFoil": card["foil"]}
+            )
+        )
 
     if not cards:
         LOGGER.warning(f"No matches found for {card}")
@@ -8,7 +8,6 @@ from singleton_decorator import singleton
 
 from ..mtgjson_config import MtgjsonConfig
 from ..providers.abstract import AbstractProvider
-from ..utils import retryable_session
 
 LOGGER = logging.getLogger(__name__)
 
@@ -61,7 +60,7 @@ class MTGBanProvider(AbstractProvider):
         :param url: URL to download from
         :param params: Options for URL download
         """
-        session = retryable_session()
+        session = self.get_session()
         session.headers.update(self.session_header)
 
         response = session.get(url)
@@ -4,13 +4,13 @@ MultiverseBridge 3rd party provider
 import logging
 import pathlib
 import time
-from typing import Any, Dict, List, Optional, Set, Union
+from typing import Any, Dict, List, Optional, Union
 
 from singleton_decorator import singleton
 
 from ..classes import MtgjsonPricesObject
+from ..mtgjson_identifier_index import MtgjsonIdentifierIndex
 from ..providers.abstract import AbstractProvider
-from ..utils import generate_card_mapping, retryable_session
 
 LOGGER = logging.getLogger(__name__)
 
@@ -40,7 +40,7 @@ class MultiverseBridgeProvider(AbstractProvider):
     def download(
         self, url: str, params: Optional[Dict[str, Union[str, int]]] = None
     ) -> Any:
-        session = retryable_session()
+        session = self.get_session()
         session.headers.update(self.session_header)
         response = session.get(url)
         self.log_download(response)
@@ -97,8 +97,8 @@ class MultiverseBridgeProvider(AbstractProvider):
             self.ROSETTA_STONE_PRICES_URL
         )
 
-        cardsphere_id_to_mtgjson: Dict[str, Set[Any]] = generate_card_mapping(
-            all_printings_path, ("identifiers", "cardsphereId"), ("uuid",)
+        cardsphere_id_to_mtgjson = MtgjsonIdentifierIndex().get_mapping(
+            all_printings_path, "cardsphereId"
         )
 
         default_prices_obj = MtgjsonPricesObject(
@@ -0,0 +1,169 @@
+"""
+Scryfall bulk data dumps, loaded from local disk
+"""
+import gzip
+import json
+import logging
+import pathlib
+import re
+from collections import defaultdict
+from typing import Any, Dict, Iterator, List, Optional, Set, TextIO, Tuple
+
+from ...constants import LANGUAGE_MAP
+
+LOGGER = logging.getLogger(__name__)
+
+
+class ScryfallBulkData:
+    """
+    In-memory indexes over Scryfall's bulk "all_cards" (or "default_cards")
+    and "rulings" dumps, so set builds can resolve their lookups
+    without paging through the search API
+    """
+
+    cards_by_set: Dict[str, List[Dict[str, Any]]]
+    cards_by_set_number_lang: Dict[Tuple[str, str, str], Dict[str, Any]]
+    set_codes_by_oracle_id: Dict[str, Set[str]]
+    rulings_by_oracle_id: Dict[str, List[Dict[str, Any]]]
+    has_all_languages: bool
+    has_rulings: bool
+
+    __read_size: int = 1 << 20
+    __separator_regex = re.compile(r"[\s,\[]*")
+
+    def __init__(
+        self,
+        cards_path: pathlib.Path,
+        rulings_path: Optional[pathlib.Path] = None,
+    ) -> None:
+        """
+        Stream the bulk dumps in and index them
+        :param cards_path: Path to an all_cards or default_cards dump
+        :param rulings_path: Path to a rulings dump, if rulings should be served
+        """
+        self.cards_by_set = defaultdict(list)
+        self.cards_by_set_number_lang = {}
+        self.set_codes_by_oracle_id = defaultdict(set)
+        self.rulings_by_oracle_id = defaultdict(list)
+        self.has_rulings = rulings_path is not None
+
+        LOGGER.info(f"Loading Scryfall bulk cards from {cards_path}")
+        for card in self.__stream_json_array(cards_path):
+            self.__index_card(card)
+
+        # A default_cards dump holds a single print per card, so a card found
+        # in both English and another language means we were given all_cards
+        self.has_all_languages = any(
+            lang != "en" and (set_code, number, "en") in self.cards_by_set_number_lang
+            for set_code, number, lang in self.cards_by_set_number_lang
+        )
+        LOGGER.info(
+            f"Loaded {len(self.cards_by_set_number_lang)} Scryfall bulk cards "
+            f"across {len(self.cards_by_set)} sets "
+            f"({'all' if self.has_all_languages else 'default'} languages)"
+        )
+
+        if rulings_path:
+            LOGGER.info(f"Loading Scryfall bulk rulings from {rulings_path}")
+            for ruling in self.__stream_json_array(rulings_path):
+                self.rulings_by_oracle_id[ruling["oracle_id"]].append(ruling)
+            LOGGER.info(
+                f"Loaded Scryfall bulk rulings for "
+                f"{len(self.rulings_by_oracle_id)} oracle cards"
+            )
+
+    def __index_card(self, card: Dict[str, Any]) -> None:
+        """
+        Add a single Scryfall card to the lookup indexes
+        :param card: Scryfall card object
+        """
+        self.cards_by_set[card["set"]].append(card)
+        self.cards_by_set_number_lang[
+            (card["set"], card["collector_number"], card["lang"])
+        ] = card
+
+        oracle_ids: Set[Optional[str]] = {card.get("oracle_id")} | {
+            face.get("oracle_id") for face in card.get("card_faces", [])
+        }
+        for oracle_id in filter(None, oracle_ids):
+            self.set_codes_by_oracle_id[oracle_id].add(card["set"].upper())
+
+    def __stream_json_array(self, file_path: pathlib.Path) -> Iterator[Any]:
+        """
+        Read a (possibly gzipped) JSON array one element at a time,
+        so the raw dump never has to be held in memory as a whole
+        :param file_path: JSON array file to read
+        :return: Each element of the array
+        """
+        decoder = json.JSONDecoder()
+        file: TextIO
+        if file_path.suffix == ".gz":
+            file = gzip.open(file_path, "rt", encoding="utf-8")
+        else:
+            file = file_path.open(encoding="utf-8")
+
+        with file:
+            buffer = ""
+            for chunk in iter(lambda: file.read(self.__read_size), ""):
+                buffer += chunk
+                position = 0
+                while True:
+                    separator = self.__separator_regex.match(buffer, position)
+                    position = separator.end() if separator else position
+                    if position >= len(buffer) or buffer[position] == "]":
+                        break
+                    try:
+                        element, position = decoder.raw_decode(buffer, position)
+                    except json.JSONDecodeError:
+                        # Element continues into the next chunk
+                        break
+                    yield element
+                buffer = buffer[position:]
+
+        if buffer.strip() not in ("", "]"):
+            raise ValueError(f"Unable to parse the end of {file_path}: {buffer[:80]}")
+
+    def get_set_cards(self, set_code: str) -> List[Dict[str, Any]]:
+        """
+        Get every print in a set, in English or its printed language,
+        the same way the search API returns them by default
+        :param set_code: Set to get cards for
+        :return: Scryfall card objects
+        """
+        prints_by_number: Dict[str, Dict[str, Any]] = {}
+        for card in self.cards_by_set.get(set_code.lower(), []):
+            number = card["collector_number"]
+            if number not in prints_by_number or card["lang"] == "en":
+                prints_by_number[number] = card
+
+        return list(prints_by_number.values())
+
+    def get_foreign_cards(self, set_code: str, number: str) -> List[Dict[str, Any]]:
+        """
+        Get the non-English prints of a single card
+        :param set_code: Set the card was printed in
+        :param number: Collector number of the card
+        :return: Scryfall card objects
+        """
+        return [
+            self.cards_by_set_number_lang[(set_code.lower(), number, lang)]
+            for lang in LANGUAGE_MAP
+            if lang != "en"
+            and (set_code.lower(), number, lang) in self.cards_by_set_number_lang
+        ]
+
+    def get_printings(self, oracle_id: str) -> List[str]:
+        """
+        Get every set a card was printed in
+        :param oracle_id: Scryfall oracle ID of the card
+        :return: Sorted set codes
+        """
+        return sorted(self.set_codes_by_oracle_id.get(oracle_id, set()))
+
+    def get_rulings(self, oracle_id: str) -> List[Dict[str, Any]]:
+        """
+        Get the rulings of a card
+        :param oracle_id: Scryfall oracle ID of the card
+        :return: Scryfall ruling objects
+        """
+        return self.rulings_by_oracle_id.get(oracle_id, [])
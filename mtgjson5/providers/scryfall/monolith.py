@@ -9,15 +9,14 @@ import sys
 import time
 from typing import Any, Dict, List, Optional, Set, Union
 
-import ratelimit
 import requests.exceptions
 from singleton_decorator import singleton
 
 from ... import constants
 from ...mtgjson_config import MtgjsonConfig
 from ...providers.abstract import AbstractProvider
-from ...utils import retryable_session
 from . import sf_utils
+from .bulk_data import ScryfallBulkData
 
 LOGGER = logging.getLogger(__name__)
 
@@ -32,6 +31,7 @@ class ScryfallProvider(AbstractProvider):
     ALL_SETS_URL: str = "https://api.scryfall.com/sets/"
     CARDS_URL: str = "https://api.scryfall.com/cards/"
     CARDS_URL_ALL_DETAIL_BY_SET_CODE: str = "https://api.scryfall.com/cards/search?include_extras=true&include_variations=true&order=set&q=e%3A{}&unique=prints"
+    CARDS_URL_ALL_LANGUAGES_BY_SET_CODE: str = "https://api.scryfall.com/cards/search?include_extras=true&include_variations=true&order=set&q=e%3A{}+lang%3Aany&unique=prints"
     CARDS_WITHOUT_LIMITS_URL: str = "https://api.scryfall.com/cards/search?q=(o:deck%20o:any%20o:number%20o:cards%20o:named)%20or%20(o:deck%20o:have%20o:up%20o:to%20o:cards%20o:named)"
     CARDS_IN_BASE_SET_URL: str = "https://api.scryfall.com/cards/search?order=set&q=set:{0}%20is:booster%20unique:prints"
     CARDS_IN_SET: str = (
@@ -43,11 +43,20 @@ class ScryfallProvider(AbstractProvider):
         "https://api.scryfall.com/cards/search?q=spellbook:%22{}%22&include_extras=true"
     )
     cards_without_limits: Set[str]
+    bulk_data: Optional[ScryfallBulkData]
 
     def __init__(self) -> None:
         super().__init__(self._build_http_header())
         self.cards_without_limits = set(self.generate_cards_without_limits())
 
+        self.bulk_data = None
+        if MtgjsonConfig().has_option("Scryfall", "bulk_cards_path"):
+            rulings_path = MtgjsonConfig().get("Scryfall", "bulk_rulings_path")
+            self.bulk_data = ScryfallBulkData(
+                pathlib.Path(MtgjsonConfig().get("Scryfall", "bulk_cards_path")),
+                pathlib.Path(rulings_path) if rulings_path else None,
+            )
+
     def _build_http_header(self) -> Dict[str, str]:
         return sf_utils.build_http_header()
 
@@ -90,8 +99,6 @@ class ScryfallProvider(AbstractProvider):
 
         return all_cards
 
-    @ratelimit.sleep_and_retry
-    @ratelimit.limits(calls=40, period=1)
     def download(
         self,
         url: str,
@@ -105,7 +112,8 @@ class ScryfallProvider(AbstractProvider):
         :param params: Options for URL download
         :param retry_ttl: How many times to retry if Chunk Error
         """
-        session = retryable_session()
+        sf_utils.wait_for_rate_limit()
+        session = self.get_session()
         session.headers.update(self.session_header)
 
         try:
@@ -139,16 +147,38 @@ class ScryfallProvider(AbstractProvider):
         :param set_code: Set to download (Ex: AER, M19)
         :return: List of all card objects
         """
-        LOGGER.info(f"Downloading {set_code} cards")
-        scryfall_cards = self.download_all_pages(
-            self.CARDS_URL_ALL_DETAIL_BY_SET_CODE.format(set_code)
-        )
+        if self.bulk_data:
+            LOGGER.info(f"Loading {set_code} cards from bulk data")
+            scryfall_cards = self.bulk_data.get_set_cards(set_code)
+        else:
+            LOGGER.info(f"Downloading {set_code} cards")
+            scryfall_cards = self.download_all_pages(
+                self.CARDS_URL_ALL_DETAIL_BY_SET_CODE.format(set_code)
+            )
 
         # Return sorted by card name, and by card number if the same name is found
         return sorted(
             scryfall_cards, key=lambda card: (card["name"], card["collector_number"])
         )
 
+    def download_foreign_cards(self, set_code: str) -> List[Dict[str, Any]]:
+        """
+        Get all non-English prints from Scryfall API for a particular set code,
+        in a single sweep over the set
+        :param set_code: Set to download (Ex: AER, M19)
+        :return: List of all foreign card objects
+        """
+        if self.bulk_data and self.bulk_data.has_all_languages:
+            LOGGER.info(f"Loading {set_code} foreign cards from bulk data")
+            scryfall_cards = self.bulk_data.cards_by_set.get(set_code.lower(), [])
+        else:
+            LOGGER.info(f"Downloading {set_code} foreign cards")
+            scryfall_cards = self.download_all_pages(
+                self.CARDS_URL_ALL_LANGUAGES_BY_SET_CODE.format(set_code)
+            )
+
+        return [card for card in scryfall_cards if card["lang"] != "en"]
+
     def generate_cards_without_limits(self) -> List[str]:
         """
         Grab all cards that can have as many copies
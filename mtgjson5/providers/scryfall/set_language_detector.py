@@ -9,7 +9,6 @@ from singleton_decorator import singleton
 from ...constants import LANGUAGE_MAP
 from ...providers.abstract import AbstractProvider
 from ...providers.scryfall import sf_utils
-from ...utils import retryable_session
 
 LOGGER = logging.getLogger(__name__)
 
@@ -31,7 +30,8 @@ class ScryfallProviderSetLanguageDetector(AbstractProvider):
         params: Optional[Dict[str, Union[str, int]]] = None,
         retry_ttl: int = 3,
     ) -> Any:
-        session = retryable_session()
+        sf_utils.wait_for_rate_limit()
+        session = self.get_session()
 
         try:
             response = session.get(url)
@@ -1,6 +1,8 @@
 import logging
 from typing import Dict
 
+import ratelimit
+
 from ...mtgjson_config import MtgjsonConfig
 
 LOGGER = logging.getLogger(__name__)
@@ -28,3 +30,13 @@ def build_http_header() -> Dict[str, str]:
         "Connection": "Keep-Alive",
     }
     return headers
+
+
+@ratelimit.sleep_and_retry
+@ratelimit.limits(calls=40, period=1)
+def wait_for_rate_limit() -> None:
+    """
+    Block until another request may be sent to Scryfall.
+    All Scryfall providers call this before each request, so
+    concurrently building sets still share a single budget
+    """
@@ -13,8 +13,9 @@ from singleton_decorator import singleton
 
 from ..classes import MtgjsonPricesObject, MtgjsonSealedProductObject
 from ..mtgjson_config import MtgjsonConfig
+from ..mtgjson_identifier_index import MtgjsonIdentifierIndex
 from ..providers.abstract import AbstractProvider
-from ..utils import generate_card_mapping, parallel_call, retryable_session
+from ..utils import parallel_call
 
 LOGGER = logging.getLogger(__name__)
 
@@ -181,7 +182,7 @@ class TCGPlayerProvider(AbstractProvider):
         :param url: URL to download from
         :param params: Options for URL download
         """
-        session = retryable_session()
+        session = self.get_session()
         session.headers.update(self.session_header)
         response = session.get(
             url.replace("[API_VERSION]", self.api_version), params=params
@@ -232,14 +233,12 @@ class TCGPlayerProvider(AbstractProvider):
             return {}
 
         ids_and_names = self.get_tcgplayer_magic_set_ids()
-        tcg_to_mtgjson_map = generate_card_mapping(
-            all_printings_path, ("identifiers", "tcgplayerProductId"), ("uuid",)
+        tcg_to_mtgjson_map = MtgjsonIdentifierIndex().get_mapping(
+            all_printings_path, "tcgplayerProductId"
         )
         tcg_to_mtgjson_map.update(
-            generate_card_mapping(
-                all_printings_path,
-                ("identifiers", "tcgplayerEtchedProductId"),
-                ("uuid",),
+            MtgjsonIdentifierIndex().get_mapping(
+                all_printings_path, "tcgplayerEtchedProductId"
             )
         )
 
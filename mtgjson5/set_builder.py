@@ -1,7 +1,7 @@
 """
 MTGJSON Set Builder
 """
-import json
+import collections
 import logging
 import pathlib
 import re
@@ -23,6 +23,8 @@ from .classes import (
     MtgjsonSetObject,
     MtgjsonTranslationsObject,
 )
+from .mtgjson_oracle_cache import MtgjsonOracleCache
+from .mtgjson_resources import MtgjsonResources
 from .providers import (
     CardKingdomProvider,
     CardMarketProvider,
@@ -46,6 +48,54 @@ from .utils import get_str_or_none, load_local_set_data, parallel_call, url_keyg
 LOGGER = logging.getLogger(__name__)
 
 
+ForeignDataIndex = Dict[Tuple[str, str, str], Dict[str, Any]]
+
+
+class CardLinkingIndex:
+    """
+    Lookups over a group of cards, built once and shared by the
+    linking passes so they don't compare every card against every other
+    """
+
+    cards_by_name: Dict[str, List[MtgjsonCardObject]]
+    cards_by_face_name: Dict[Optional[str], List[MtgjsonCardObject]]
+    cards_by_illustration_id: Dict[Optional[str], List[MtgjsonCardObject]]
+    __positions: Dict[int, int]
+
+    def __init__(self, cards: List[MtgjsonCardObject]) -> None:
+        """
+        Index a group of cards
+        :param cards: Cards to index, in the order they should be linked
+        """
+        self.cards_by_name = collections.defaultdict(list)
+        self.cards_by_face_name = collections.defaultdict(list)
+        self.cards_by_illustration_id = collections.defaultdict(list)
+        self.__positions = {}
+
+        for position, card in enumerate(cards):
+            self.cards_by_name[card.name].append(card)
+            self.cards_by_face_name[card.face_name].append(card)
+            self.cards_by_illustration_id[
+                card.identifiers.scryfall_illustration_id
+            ].append(card)
+            self.__positions[id(card)] = position
+
+    def get_cards_by_face_names(self, face_names: List[str]) -> List[MtgjsonCardObject]:
+        """
+        Get all cards with one of the face names, in their original order
+        :param face_names: Face names to look for
+        :return: Matching cards
+        """
+        return sorted(
+            (
+                card
+                for face_name in set(face_names)
+                for card in self.cards_by_face_name.get(face_name, [])
+            ),
+            key=lambda card: self.__positions[id(card)],
+        )
+
+
 def parse_foreign(
     sf_prints_url: str, card_name: str, card_number: str, set_name: str
 ) -> List[MtgjsonForeignDataObject]:
@@ -57,7 +107,14 @@ def parse_foreign(
     :param set_name: Set name
     :return: Foreign entries object
     """
-    card_foreign_entries: List[MtgjsonForeignDataObject] = []
+    bulk_data = ScryfallProvider().bulk_data
+    if bulk_data and bulk_data.has_all_languages:
+        return parse_foreign_prints(
+            bulk_data.get_foreign_cards(set_name, card_number),
+            card_name,
+            card_number,
+            set_name,
+        )
 
     # Add information to get all languages
     sf_prints_url = sf_prints_url.replace("&unique=prints", "+lang%3Aany&unique=prints")
@@ -67,6 +124,69 @@ def parse_foreign(
         LOGGER.error(f"No data found for {sf_prints_url}: {prints_api_json}")
         return []
 
+    return parse_foreign_prints(prints_api_json, card_name, card_number, set_name)
+
+
+def build_foreign_data_index(set_codes: Set[str]) -> ForeignDataIndex:
+    """
+    Sweep each set for all of its non-English prints at once, so cards
+    can find their foreign data without a search of their own
+    :param set_codes: Sets to sweep
+    :return: Foreign prints by (set code, collector number, language)
+    """
+    foreign_data_index: ForeignDataIndex = {}
+    for set_code in sorted(set_codes):
+        for foreign_card in ScryfallProvider().download_foreign_cards(set_code):
+            foreign_data_index[
+                (
+                    foreign_card["set"],
+                    foreign_card["collector_number"],
+                    foreign_card["lang"],
+                )
+            ] = foreign_card
+
+    return foreign_data_index
+
+
+def get_foreign_data_from_index(
+    foreign_data_index: ForeignDataIndex,
+    card_name: str,
+    card_number: str,
+    set_name: str,
+) -> List[MtgjsonForeignDataObject]:
+    """
+    Get the foreign printings information for a specific card from
+    a pre-built index of its set
+    :param foreign_data_index: Index built by build_foreign_data_index()
+    :param card_name: Card name to parse (needed for double faced)
+    :param card_number: Card's number
+    :param set_name: Set name
+    :return: Foreign entries object
+    """
+    foreign_prints = [
+        foreign_data_index[(set_name, card_number, language)]
+        for language in constants.LANGUAGE_MAP
+        if (set_name, card_number, language) in foreign_data_index
+    ]
+    return parse_foreign_prints(foreign_prints, card_name, card_number, set_name)
+
+
+def parse_foreign_prints(
+    prints_api_json: List[Dict[str, Any]],
+    card_name: str,
+    card_number: str,
+    set_name: str,
+) -> List[MtgjsonForeignDataObject]:
+    """
+    Convert the foreign prints of a specific card to MTGJSON format
+    :param prints_api_json: Scryfall card objects that may be foreign prints
+    :param card_name: Card name to parse (needed for double faced)
+    :param card_number: Card's number
+    :param set_name: Set name
+    :return: Foreign entries object
+    """
+    card_foreign_entries: List[MtgjsonForeignDataObject] = []
+
     for foreign_card in prints_api_json:
         if (
             set_name != foreign_card["set"]
@@ -248,12 +368,34 @@ def get_card_cmc(mana_cost: str) -> float:
     return total
 
 
-def parse_printings(sf_prints_url: Optional[str]) -> List[str]:
+def parse_printings(
+    sf_prints_url: Optional[str], oracle_id: Optional[str] = None
+) -> List[str]:
     """
     Given a Scryfall printings URL, extract all sets a card was printed in
     :param sf_prints_url: URL to extract data from
+    :param oracle_id: Oracle ID of the card, to share lookups between its printings
     :return: List of all sets a specific card was printed in
     """
+    bulk_data = ScryfallProvider().bulk_data
+    if bulk_data and oracle_id:
+        return bulk_data.get_printings(oracle_id)
+
+    if not oracle_id:
+        return download_printings(sf_prints_url) or []
+
+    printings = MtgjsonOracleCache().get_or_fetch(
+        "printings", oracle_id, lambda: download_printings(sf_prints_url)
+    )
+    return list(printings or [])
+
+
+def download_printings(sf_prints_url: Optional[str]) -> Optional[List[str]]:
+    """
+    Download all sets a card was printed in from a Scryfall printings URL
+    :param sf_prints_url: URL to extract data from
+    :return: List of all sets a specific card was printed in, or None on failure
+    """
     card_sets: Set[str] = set()
 
     while sf_prints_url:
@@ -261,7 +403,7 @@ def parse_printings(sf_prints_url: Optional[str]) -> List[str]:
 
         if prints_api_json["object"] == "error":
             LOGGER.error(f"Bad download: {sf_prints_url}")
-            break
+            return None
 
         for card in prints_api_json["data"]:
             card_sets.add(card.get("set").upper())
@@ -288,48 +430,81 @@ def parse_legalities(sf_card_legalities: Dict[str, str]) -> MtgjsonLegalitiesObj
     return card_legalities
 
 
-def parse_rulings(rulings_url: str) -> List[MtgjsonRulingObject]:
+def parse_rulings(
+    rulings_url: str, oracle_id: Optional[str] = None
+) -> List[MtgjsonRulingObject]:
     """
     Get the JSON data from Scryfall and convert it to MTGJSON format for rulings
     :param rulings_url: URL to get Scryfall JSON data from
+    :param oracle_id: Oracle ID of the card, to share lookups between its printings
     :return: MTGJSON rulings list
     """
+    rulings: Optional[List[List[str]]]
+    bulk_data = ScryfallProvider().bulk_data
+    if bulk_data and bulk_data.has_rulings and oracle_id:
+        rulings = sort_rulings(bulk_data.get_rulings(oracle_id))
+    elif oracle_id:
+        rulings = MtgjsonOracleCache().get_or_fetch(
+            "rulings", oracle_id, lambda: download_rulings(rulings_url)
+        )
+    else:
+        rulings = download_rulings(rulings_url)
+
+    return [MtgjsonRulingObject(date, text) for date, text in rulings or []]
+
+
+def download_rulings(rulings_url: str) -> Optional[List[List[str]]]:
+    """
+    Download the rulings of a card from Scryfall
+    :param rulings_url: URL to get Scryfall JSON data from
+    :return: Sorted [date, text] pairs, or None on failure
+    """
     rules_api_json: Dict[str, Any] = ScryfallProvider().download(rulings_url)
     if rules_api_json["object"] == "error":
         LOGGER.error(f"Error downloading URL {rulings_url}: {rules_api_json}")
-        return []
+        return None
 
-    mtgjson_rules: List[MtgjsonRulingObject] = []
+    return sort_rulings(rules_api_json["data"])
 
-    for sf_rule in rules_api_json["data"]:
-        mtgjson_rule = MtgjsonRulingObject(sf_rule["published_at"], sf_rule["comment"])
-        mtgjson_rules.append(mtgjson_rule)
 
-    return sorted(mtgjson_rules, key=lambda ruling: (ruling.date, ruling.text))
+def sort_rulings(sf_rulings: List[Dict[str, Any]]) -> List[List[str]]:
+    """
+    Reduce Scryfall rulings to sorted [date, text] pairs
+    :param sf_rulings: Scryfall ruling objects
+    :return: Sorted [date, text] pairs
+    """
+    return sorted(
+        [sf_rule["published_at"], sf_rule["comment"]] for sf_rule in sf_rulings
+    )
 
 
-def add_rebalanced_to_original_linkage(mtgjson_set: MtgjsonSetObject) -> None:
+def add_rebalanced_to_original_linkage(
+    mtgjson_set: MtgjsonSetObject, card_index: Optional[CardLinkingIndex] = None
+) -> None:
     """
     When Wizards rebalances a card, they break the link between
     the new card and the original card. We will create a two-way
     linkage back to and from the original card,
     should that prove useful to the end user.
     :param mtgjson_set MTGJSON Set object
+    :param card_index: Index over the set's cards, built if not provided
     """
     LOGGER.info(f"Linking rebalanced cards for {mtgjson_set.code}")
+    card_index = card_index or CardLinkingIndex(mtgjson_set.cards)
 
     for card in mtgjson_set.cards:
         if getattr(card, "is_rebalanced", False):
             original_card_name_to_find = card.name.replace("A-", "")
 
             original_card_uuids = []
-            for inner_card in mtgjson_set.cards:
-                if inner_card.name == original_card_name_to_find:
-                    # Doubly link these cards
-                    original_card_uuids.append(inner_card.uuid)
-                    if not hasattr(inner_card, "rebalanced_printings"):
-                        inner_card.rebalanced_printings = []
-                    inner_card.rebalanced_printings.append(card.uuid)
+            for inner_card in card_index.cards_by_name.get(
+                original_card_name_to_find, []
+            ):
+                # Doubly link these cards
+                original_card_uuids.append(inner_card.uuid)
+                if not hasattr(inner_card, "rebalanced_printings"):
+                    inner_card.rebalanced_printings = []
+                inner_card.rebalanced_printings.append(card.uuid)
 
             card.original_printings = original_card_uuids
 
@@ -398,10 +573,9 @@ def parse_keyrune_code(url: str) -> str:
     """
     file_stem = pathlib.Path(url).stem.upper()
 
-    with constants.RESOURCE_PATH.joinpath("keyrune_code_overrides.json").open(
-        encoding="utf-8"
-    ) as file:
-        upstream_to_keyrune_map: Dict[str, str] = json.load(file)
+    upstream_to_keyrune_map: Dict[str, str] = MtgjsonResources().get(
+        "keyrune_code_overrides"
+    )
 
     return upstream_to_keyrune_map.get(file_stem, file_stem)
 
@@ -412,10 +586,9 @@ def get_translation_data(mtgjson_set_name: str) -> Optional[Dict[str, str]]:
     :param mtgjson_set_name: Set name to try and find in translation data
     :returns Translation data for the set, if found
     """
-    with constants.RESOURCE_PATH.joinpath("mkm_set_name_translations.json").open(
-        encoding="utf-8"
-    ) as file:
-        translation_data: Dict[str, Dict[str, str]] = json.load(file)
+    translation_data: Dict[str, Dict[str, str]] = MtgjsonResources().get(
+        "mkm_set_name_translations"
+    )
 
     return translation_data.get(mtgjson_set_name)
 
@@ -469,12 +642,13 @@ def build_mtgjson_set(set_code: str) -> Optional[MtgjsonSetObject]:
     add_is_starter_option(set_code, mtgjson_set.search_uri, mtgjson_set.cards)
     add_rebalanced_to_original_linkage(mtgjson_set)
     relocate_miscellaneous_tokens(mtgjson_set)
+    card_index = CardLinkingIndex(mtgjson_set.cards)
 
     if mtgjson_set.code in {"CN2", "FRF", "ONS", "10E", "UNH"}:
-        link_same_card_different_details(mtgjson_set)
+        link_same_card_different_details(mtgjson_set, card_index)
 
     if mtgjson_set.code in {"EMN", "BRO"}:
-        add_meld_face_parts(mtgjson_set)
+        add_meld_face_parts(mtgjson_set, card_index)
 
     if mtgjson_set.code in {"SLD"}:
         add_secret_lair_names(mtgjson_set)
@@ -483,7 +657,7 @@ def build_mtgjson_set(set_code: str) -> Optional[MtgjsonSetObject]:
     mtgjson_set.base_set_size = base_total_sizes[0]
     mtgjson_set.total_set_size = base_total_sizes[1]
 
-    add_other_face_ids(mtgjson_set.cards)
+    add_other_face_ids(mtgjson_set.cards, card_index)
     add_variations_and_alternative_fields(mtgjson_set)
 
     # Build tokens, a little less of a process
@@ -592,11 +766,13 @@ def build_base_mtgjson_cards(
     cards = ScryfallProvider().download_cards(set_code)
     cards.extend(additional_cards or [])
 
+    foreign_data_index = build_foreign_data_index({card["set"] for card in cards})
+
     mtgjson_cards: List[MtgjsonCardObject] = parallel_call(
         build_mtgjson_card,
         cards,
         fold_list=True,
-        repeatable_args=(0, is_token, set_release_date),
+        repeatable_args=(0, is_token, set_release_date, foreign_data_index),
     )
 
     # Ensure we have a consistent ordering for our outputs
@@ -742,6 +918,7 @@ def build_mtgjson_card(
     face_id: int = 0,
     is_token: bool = False,
     set_release_date: str = "",
+    foreign_data_index: Optional[ForeignDataIndex] = None,
 ) -> List[MtgjsonCardObject]:
     """
     Construct a MTGJSON Card object from 3rd party
@@ -750,6 +927,7 @@ def build_mtgjson_card(
     :param face_id: What face to build for (set internally)
     :param is_token: Is this a token object? (some diff fields)
     :param set_release_date: Original set release date
+    :param foreign_data_index: Foreign prints of the card's set, if already swept
     :return: List of card objects that were constructed
     """
     LOGGER.info(f"Building {scryfall_object['set'].upper()}: {scryfall_object['name']}")
@@ -832,7 +1010,13 @@ def build_mtgjson_card(
         if face_id == 0:
             for i in range(1, len(scryfall_object["card_faces"])):
                 mtgjson_cards.extend(
-                    build_mtgjson_card(scryfall_object, i, is_token, set_release_date)
+                    build_mtgjson_card(
+                        scryfall_object,
+                        i,
+                        is_token,
+                        set_release_date,
+                        foreign_data_index,
+                    )
                 )
 
     # Start of single card builder
@@ -1043,14 +1227,20 @@ def build_mtgjson_card(
         or mtgjson_card.set_code.lower() == "tsb"
     )
     mtgjson_card.printings = parse_printings(
-        scryfall_object["prints_search_uri"].replace("%22", "")
+        scryfall_object["prints_search_uri"].replace("%22", ""),
+        mtgjson_card.identifiers.scryfall_oracle_id,
     )
     mtgjson_card.legalities = parse_legalities(
         scryfall_object["legalities"]
         if scryfall_object.get("set_type") not in ["memorabilia"]
         else {}
     )
-    mtgjson_card.rulings = parse_rulings(scryfall_object["rulings_uri"])
+    rulings = parse_rulings(
+        scryfall_object["rulings_uri"], mtgjson_card.identifiers.scryfall_oracle_id
+    )
+    if rulings:
+        # Empty rulings aren't published, so leave their slot unset
+        mtgjson_card.rulings = rulings
 
     card_types = parse_card_types(mtgjson_card.type)
     mtgjson_card.supertypes = card_types[0]
@@ -1115,12 +1305,20 @@ def build_mtgjson_card(
                 mtgjson_card.face_name = mtgjson_card.name
                 mtgjson_card.side = "b"
 
-    mtgjson_card.foreign_data = parse_foreign(
-        scryfall_object["prints_search_uri"].replace("%22", ""),
-        mtgjson_card.face_name if mtgjson_card.face_name else mtgjson_card.name,
-        mtgjson_card.number,
-        mtgjson_card.set_code.lower(),
-    )
+    if foreign_data_index is not None:
+        mtgjson_card.foreign_data = get_foreign_data_from_index(
+            foreign_data_index,
+            mtgjson_card.face_name if mtgjson_card.face_name else mtgjson_card.name,
+            mtgjson_card.number,
+            mtgjson_card.set_code.lower(),
+        )
+    else:
+        mtgjson_card.foreign_data = parse_foreign(
+            scryfall_object["prints_search_uri"].replace("%22", ""),
+            mtgjson_card.face_name if mtgjson_card.face_name else mtgjson_card.name,
+            mtgjson_card.number,
+            mtgjson_card.set_code.lower(),
+        )
 
     if mtgjson_card.name in ScryfallProvider().cards_without_limits:
         mtgjson_card.has_alternative_deck_limit = True
@@ -1183,15 +1381,23 @@ def add_variations_and_alternative_fields(mtgjson_set: MtgjsonSetObject) -> None
 
     LOGGER.info(f"Adding variations for {mtgjson_set.code}")
 
+    # Variations can only share a base name and face name, so group on those
+    # once instead of comparing every card against every other card
+    cards_by_name_and_face: Dict[
+        Tuple[str, Optional[str]], List[MtgjsonCardObject]
+    ] = collections.defaultdict(list)
+    for card in mtgjson_set.cards:
+        cards_by_name_and_face[(card.name.split(" (")[0], card.face_name)].append(card)
+
     distinct_card_printings_found: Set[str] = set()
     for this_card in mtgjson_set.cards:
         # Adds variations
         variations = [
             item.uuid
-            for item in mtgjson_set.cards
-            if item.name.split(" (")[0] == this_card.name.split(" (")[0]
-            and item.face_name == this_card.face_name
-            and item.uuid != this_card.uuid
+            for item in cards_by_name_and_face[
+                (this_card.name.split(" (")[0], this_card.face_name)
+            ]
+            if item.uuid != this_card.uuid
             and (item.number != this_card.number if item.number else True)
         ]
 
@@ -1220,25 +1426,27 @@ def add_variations_and_alternative_fields(mtgjson_set: MtgjsonSetObject) -> None
     LOGGER.info(f"Finished adding variations for {mtgjson_set.code}")
 
 
-def add_other_face_ids(cards_to_act_on: List[MtgjsonCardObject]) -> None:
+def add_other_face_ids(
+    cards_to_act_on: List[MtgjsonCardObject],
+    card_index: Optional[CardLinkingIndex] = None,
+) -> None:
     """
     Add other face IDs to all cards within a group based on
     that group. If a duplicate is found, the cards will link
     via other_face_ids
     :param cards_to_act_on: Cards to find duplicates of in the group
+    :param card_index: Index over the group, built if not provided
     """
     if not cards_to_act_on:
         return
 
     LOGGER.info("Adding otherFaceIds to group")
+    card_index = card_index or CardLinkingIndex(cards_to_act_on)
     for this_card in cards_to_act_on:
         # Adds other face ID list
         if this_card.get_names():
             this_card.other_face_ids = []
-            for other_card in cards_to_act_on:
-                if other_card.face_name not in this_card.get_names():
-                    continue
-
+            for other_card in card_index.get_cards_by_face_names(this_card.get_names()):
                 if other_card.uuid == this_card.uuid:
                     continue
 
@@ -1256,24 +1464,26 @@ def add_other_face_ids(cards_to_act_on: List[MtgjsonCardObject]) -> None:
     LOGGER.info("Finished adding otherFaceIds to group")
 
 
-def link_same_card_different_details(mtgjson_set: MtgjsonSetObject) -> None:
+def link_same_card_different_details(
+    mtgjson_set: MtgjsonSetObject, card_index: Optional[CardLinkingIndex] = None
+) -> None:
     """
     In several Magic sets, the foil and non-foil printings have different text
     (See 10th Edition, for example). If that's the case, we will link the
     Foil and NonFoil versions together in the identifiers for easier user management
     :param mtgjson_set: MTGJSON Set
+    :param card_index: Index over the set's cards, built if not provided
     """
     LOGGER.info(f"Linking multiple printings for {mtgjson_set.code}")
-    cards_seen = {}
+    card_index = card_index or CardLinkingIndex(mtgjson_set.cards)
 
     for mtgjson_card in mtgjson_set.cards:
-        if mtgjson_card.identifiers.scryfall_illustration_id not in cards_seen:
-            cards_seen[mtgjson_card.identifiers.scryfall_illustration_id] = mtgjson_card
+        other_mtgjson_card = card_index.cards_by_illustration_id[
+            mtgjson_card.identifiers.scryfall_illustration_id
+        ][0]
+        if other_mtgjson_card is mtgjson_card:
             continue
 
-        other_mtgjson_card = cards_seen[
-            mtgjson_card.identifiers.scryfall_illustration_id
-        ]
         if "nonfoil" in mtgjson_card.finishes:
             other_mtgjson_card.identifiers.mtgjson_non_foil_version_id = (
                 mtgjson_card.uuid
@@ -1482,11 +1692,7 @@ def get_base_and_total_set_sizes(mtgjson_set: MtgjsonSetObject) -> Tuple[int, in
     :param mtgjson_set: Mtgjson Set Object
     :return: Amount of cards in set (base, total)
     """
-    # Load cache if not loaded
-    with constants.RESOURCE_PATH.joinpath("base_set_sizes.json").open(
-        encoding="utf-8"
-    ) as f:
-        base_set_size_override = json.load(f)
+    base_set_size_override = MtgjsonResources().get("base_set_sizes")
 
     base_set_size = len(mtgjson_set.cards)
 
@@ -1531,10 +1737,9 @@ def get_signature_from_number(mtgjson_card: MtgjsonCardObject) -> Optional[str]:
     :param mtgjson_card: Card object to get required data from
     :returns Name of person who signed card, if applicable
     """
-    with constants.RESOURCE_PATH.joinpath("world_championship_signatures.json").open(
-        encoding="utf-8"
-    ) as f:
-        signatures_by_set: Dict[str, Dict[str, str]] = json.load(f)
+    signatures_by_set: Dict[str, Dict[str, str]] = MtgjsonResources().get(
+        "world_championship_signatures"
+    )
 
     if mtgjson_card.set_code not in signatures_by_set:
         return None
@@ -1546,7 +1751,9 @@ def get_signature_from_number(mtgjson_card: MtgjsonCardObject) -> Optional[str]:
     return signatures_by_set[mtgjson_card.set_code].get(match.group(1))
 
 
-def add_meld_face_parts(mtgjson_set: MtgjsonSetObject) -> None:
+def add_meld_face_parts(
+    mtgjson_set: MtgjsonSetObject, card_index: Optional[CardLinkingIndex] = None
+) -> None:
     """
     Some sets that like to torture us have cards with multiple cards
     required to summon the grand behemoth. This method creates a
@@ -1554,8 +1761,10 @@ def add_meld_face_parts(mtgjson_set: MtgjsonSetObject) -> None:
     processing. Order will be top card, bottom card, combined card
     ...until Wizards does something else.
     :param mtgjson_set: MTGJSON Set
+    :param card_index: Index over the set's cards, built if not provided
     """
     LOGGER.info(f"Adding Card Face Parts for {mtgjson_set.code}")
+    card_index = card_index or CardLinkingIndex(mtgjson_set.cards)
     for first_card in mtgjson_set.cards:
         if first_card.layout != "meld":
             continue
@@ -1569,12 +1778,8 @@ def add_meld_face_parts(mtgjson_set: MtgjsonSetObject) -> None:
         else:
             card_face_parts[0] = first_card.face_name
 
-        for other_card in mtgjson_set.cards:
-            if (
-                other_card.layout != "meld"
-                or first_card == other_card
-                or other_card.face_name not in first_card.get_names()
-            ):
+        for other_card in card_index.get_cards_by_face_names(first_card.get_names()):
+            if other_card.layout != "meld" or first_card == other_card:
                 continue
 
             if "a" in other_card.number:
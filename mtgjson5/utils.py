@@ -2,11 +2,12 @@
 MTGJSON simple utilities
 """
 import collections
+import functools
 import hashlib
-import inspect
 import itertools
 import json
 import logging
+import mmap
 import os
 import pathlib
 import time
@@ -20,6 +21,7 @@ import urllib3
 
 from mtgjson5 import constants
 from mtgjson5.mtgjson_config import MtgjsonConfig
+from mtgjson5.mtgjson_resources import MtgjsonResources
 
 LOGGER = logging.getLogger(__name__)
 
@@ -58,9 +60,11 @@ def url_keygen(unique_seed: Union[int, str], with_leading: bool = True) -> str:
     return f"{return_value}{hashlib.sha256(str(unique_seed).encode()).hexdigest()[:16]}"
 
 
+@functools.lru_cache(maxsize=None)
 def to_camel_case(snake_str: str) -> str:
     """
     Convert "snake_case" => "camelCase"
+    Only attribute names are converted, so results are kept
     :param snake_str: Snake String
     :return: Camel String
     """
@@ -101,19 +105,21 @@ def parse_magic_rules_subset(
 
 def retryable_session(
     retries: int = 8,
+    session_name: Optional[str] = None,
+    pool_size: int = constants.PARALLEL_CALL_POOL_SIZE,
 ) -> Union[requests.Session, requests_cache.CachedSession]:
     """
     Session with requests to allow for re-attempts at downloading missing data
     :param retries: How many retries to attempt
+    :param session_name: Name of the session's cache, if caching is enabled
+    :param pool_size: How many connections to keep open per host
     :return: Session that does downloading
     """
     session: Union[requests.Session, requests_cache.CachedSession]
 
     if MtgjsonConfig().use_cache:
-        stack = inspect.stack()
-        calling_class = stack[1][0].f_locals["self"].__class__.__name__
         session = requests_cache.CachedSession(
-            str(constants.CACHE_PATH.joinpath(calling_class))
+            str(constants.CACHE_PATH.joinpath(session_name or "mtgjson5"))
         )
     else:
         session = requests.Session()
@@ -126,7 +132,7 @@ def retryable_session(
         status_forcelist=(500, 502, 504),
     )
 
-    adapter = requests.adapters.HTTPAdapter(max_retries=retry)
+    adapter = requests.adapters.HTTPAdapter(pool_maxsize=pool_size, max_retries=retry)
     session.mount("http://", adapter)
     session.mount("https://", adapter)
 
@@ -134,6 +140,59 @@ def retryable_session(
     return session
 
 
+POOLED_SESSIONS: Dict[str, Union[requests.Session, requests_cache.CachedSession]] = {}
+
+
+def get_pooled_session(
+    session_name: str,
+) -> Union[requests.Session, requests_cache.CachedSession]:
+    """
+    Get a long-lived session, creating it on first use, so that
+    connections are kept alive and reused between downloads
+    :param session_name: Name of the session (Ex: Provider class name)
+    :return: Session that does downloading
+    """
+    if session_name not in POOLED_SESSIONS:
+        POOLED_SESSIONS[session_name] = retryable_session(session_name=session_name)
+    return POOLED_SESSIONS[session_name]
+
+
+def get_session_statistics() -> Dict[str, Dict[str, int]]:
+    """
+    Count requests made and connections opened by each pooled session
+    :return: Session name to its request, connection, and reuse counts
+    """
+    statistics = {}
+    for session_name, session in sorted(POOLED_SESSIONS.items()):
+        requests_made = connections_opened = 0
+        for adapter in set(session.adapters.values()):
+            if not isinstance(adapter, requests.adapters.HTTPAdapter):
+                continue
+            pools = adapter.poolmanager.pools
+            for pool_key in pools.keys():
+                requests_made += pools[pool_key].num_requests
+                connections_opened += pools[pool_key].num_connections
+
+        statistics[session_name] = {
+            "requests": requests_made,
+            "connections": connections_opened,
+            "reused": max(requests_made - connections_opened, 0),
+        }
+
+    return statistics
+
+
+def log_session_statistics() -> None:
+    """
+    Log how well each pooled session reused its connections
+    """
+    for session_name, counts in get_session_statistics().items():
+        LOGGER.info(
+            f"{session_name}: {counts['requests']} requests over "
+            f"{counts['connections']} connections ({counts['reused']} reused)"
+        )
+
+
 def parallel_call(
     function: Callable,
     args: Any,
@@ -141,7 +200,7 @@ def parallel_call(
     fold_list: bool = False,
     fold_dict: bool = False,
     force_starmap: bool = False,
-    pool_size: int = 32,
+    pool_size: int = constants.PARALLEL_CALL_POOL_SIZE,
 ) -> Any:
     """
     Execute a function in parallel
@@ -188,11 +247,13 @@ def sort_internal_lists(data: Any) -> Any:
     return data
 
 
-def get_file_hash(file_to_hash: pathlib.Path, block_size: int = 65536) -> str:
+def get_file_hash(file_to_hash: pathlib.Path, block_size: int = 1 << 24) -> str:
     """
-    Given a file, generate a hash of the contents
+    Given a file, generate a hash of the contents. The file is memory-mapped,
+    so blocks are hashed without being copied, and hashing large blocks
+    releases the GIL for other threads
     :param file_to_hash: File to generate the hash of
-    :param block_size: How big a chunk to read in at a time
+    :param block_size: How big a chunk to hash at a time
     :return file hash
     """
     if not file_to_hash.is_file():
@@ -203,15 +264,36 @@ def get_file_hash(file_to_hash: pathlib.Path, block_size: int = 65536) -> str:
     hash_operation = constants.HASH_TO_GENERATE.copy()
 
     with file_to_hash.open("rb") as file:
-        while True:
-            data = file.read(block_size)
-            if not data:
-                break
-            hash_operation.update(data)
+        # Empty files can't be memory-mapped, and have nothing to hash
+        if os.fstat(file.fileno()).st_size:
+            with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped_file:
+                with memoryview(mapped_file) as data:
+                    for offset in range(0, len(data), block_size):
+                        hash_operation.update(data[offset : offset + block_size])
 
     return hash_operation.hexdigest()
 
 
+def get_file_hash_path(file: pathlib.Path) -> pathlib.Path:
+    """
+    :param file: File that was hashed
+    :return: Where the hash of the file is written
+    """
+    return file.with_name(f"{file.name}.{constants.HASH_TO_GENERATE.name}")
+
+
+def is_file_hash_current(file: pathlib.Path) -> bool:
+    """
+    Determine if a file's hash was written after its last change
+    :param file: File that was hashed
+    :return: If the hash can be reused
+    """
+    hash_file = get_file_hash_path(file)
+    return (
+        hash_file.is_file() and hash_file.stat().st_mtime_ns >= file.stat().st_mtime_ns
+    )
+
+
 def get_str_or_none(value: Any) -> Optional[str]:
     """
     Given a value, get its string representation
@@ -336,10 +418,7 @@ def load_local_set_data() -> Dict[str, Dict[str, Any]]:
     """
     Loads the local set data
     """
-    with constants.RESOURCE_PATH.joinpath("additional_sets.json").open(
-        encoding="utf-8"
-    ) as f:
-        data: Dict[str, Dict[str, Any]] = json.load(f)
+    data: Dict[str, Dict[str, Any]] = MtgjsonResources().get("additional_sets")
     return data
 
 
@@ -1,8 +1,17 @@
 """Test the CardMarket provider."""
 
+import math
+import random
+
+import numpy
+import pandas
 import pytest
 
-from mtgjson5.providers.cardmarket.monolith import CardMarketProvider
+from mtgjson5.classes import MtgjsonPricesObject
+from mtgjson5.providers.cardmarket.monolith import (
+    CardMarketProvider,
+    build_today_prices,
+)
 
 testdata = [
     pytest.param(
@@ -47,3 +56,78 @@ def test_get_extras_set_id(keys_found, set_map, expected, mocker):
     obj.set_map = set_map
     actual = CardMarketProvider.__wrapped__.get_extras_set_id(obj, "throne of eldraine")
     assert actual == expected
+
+
+def legacy_build_today_prices(price_data, mtgjson_id_map, today_date):
+    """The row by row version build_today_prices replaced."""
+    data_frame_columns = list(price_data.columns)
+    product_id_index = data_frame_columns.index("idProduct")
+    avg_sell_price_index = data_frame_columns.index("AVG1")
+    avg_foil_price_index = data_frame_columns.index("Foil AVG1")
+
+    today_dict = {}
+    for row in pandas.DataFrame(price_data).iterrows():
+        columns = [-1 if math.isnan(value) else value for value in row[1].tolist()]
+
+        product_id = str(int(columns[product_id_index]))
+        if product_id in mtgjson_id_map:
+            for mtgjson_uuid in mtgjson_id_map[product_id]:
+                avg_sell_price = columns[avg_sell_price_index]
+                avg_foil_price = columns[avg_foil_price_index]
+
+                if mtgjson_uuid not in today_dict:
+                    if avg_sell_price == -1 and avg_foil_price == -1:
+                        continue
+                    today_dict[mtgjson_uuid] = MtgjsonPricesObject(
+                        "paper", "cardmarket", today_date, "EUR"
+                    )
+
+                if avg_sell_price != -1:
+                    today_dict[mtgjson_uuid].sell_normal = avg_sell_price
+                if avg_foil_price != -1:
+                    today_dict[mtgjson_uuid].sell_foil = avg_foil_price
+
+    return today_dict
+
+
+def build_price_guide(row_count):
+    """
+    A price guide with missing prices, repeated products and products
+    no card has, along with the map of the cards it prices
+    """
+    random_source = random.Random(row_count)
+    product_ids = [random_source.randrange(row_count) for _ in range(row_count)]
+
+    def price():
+        return random_source.choice([numpy.nan, 0.0, round(random_source.random(), 2)])
+
+    price_data = pandas.DataFrame(
+        {
+            "idProduct": product_ids[:-1] + [numpy.nan],
+            "Avg. Sell Price": [price() for _ in range(row_count)],
+            "AVG1": [price() for _ in range(row_count)],
+            "Foil AVG1": [price() for _ in range(row_count)],
+        }
+    )
+    mtgjson_id_map = {
+        str(product_id): {f"{product_id}-{copy}" for copy in range(product_id % 3)}
+        for product_id in range(-1, row_count, 2)
+    }
+    mtgjson_id_map["0042"] = {"padded"}
+    return price_data, mtgjson_id_map
+
+
+def serialize(today_dict):
+    """Today's prices, in the order they were added."""
+    return [(uuid, prices.to_json()) for uuid, prices in today_dict.items()]
+
+
+def test_build_today_prices_matches_legacy_output():
+    """Joining the price guide must price the same cards the same way."""
+    price_data, mtgjson_id_map = build_price_guide(5_000)
+
+    expected = legacy_build_today_prices(price_data, mtgjson_id_map, "2024-01-01")
+    actual = build_today_prices(price_data, mtgjson_id_map, "2024-01-01")
+
+    assert serialize(actual) == serialize(expected)
+    assert build_today_prices(price_data, {}, "2024-01-01") == {}
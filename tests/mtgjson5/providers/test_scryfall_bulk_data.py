@@ -0,0 +1,153 @@
+"""Test the Scryfall bulk data indexes against a small fixture dump."""
+
+import gzip
+import json
+
+import pytest
+
+from mtgjson5.providers.scryfall.bulk_data import ScryfallBulkData
+
+ORACLE_BOLT = "4457ed35-7c10-48c8-9776-456485fdf070"
+ORACLE_TWINS = "02ce3bb1-0ac0-4e6f-9b5b-1d1f0f1b9b1e"
+
+FIXTURE_CARDS = [
+    {
+        "set": "m10",
+        "collector_number": "146",
+        "lang": "en",
+        "name": "Lightning Bolt",
+        "oracle_id": ORACLE_BOLT,
+    },
+    {
+        "set": "m10",
+        "collector_number": "146",
+        "lang": "ja",
+        "name": "Lightning Bolt",
+        "printed_name": "稲妻",
+        "oracle_id": ORACLE_BOLT,
+    },
+    {
+        "set": "m10",
+        "collector_number": "146",
+        "lang": "de",
+        "name": "Lightning Bolt",
+        "printed_name": "Blitzschlag",
+        "oracle_id": ORACLE_BOLT,
+    },
+    {
+        "set": "4bb",
+        "collector_number": "208",
+        "lang": "ja",
+        "name": "Lightning Bolt",
+        "oracle_id": ORACLE_BOLT,
+    },
+    {
+        "set": "4bb",
+        "collector_number": "208",
+        "lang": "it",
+        "name": "Lightning Bolt",
+        "oracle_id": ORACLE_BOLT,
+    },
+    {
+        "set": "m10",
+        "collector_number": "300",
+        "lang": "en",
+        "name": "Twin A // Twin B",
+        "card_faces": [{"oracle_id": ORACLE_TWINS}, {"oracle_id": ORACLE_TWINS}],
+    },
+]
+
+FIXTURE_RULINGS = [
+    {
+        "object": "ruling",
+        "oracle_id": ORACLE_BOLT,
+        "source": "wotc",
+        "published_at": "2020-01-01",
+        "comment": "It deals 3 damage.",
+    }
+]
+
+
+def write_dump(path, contents, compress=False):
+    """Write contents the way Scryfall formats its bulk files, one object per line."""
+    lines = "[\n" + ",\n".join(json.dumps(entry) for entry in contents) + "\n]\n"
+    if compress:
+        with gzip.open(path, "wt", encoding="utf-8") as file:
+            file.write(lines)
+    else:
+        path.write_text(lines, encoding="utf-8")
+    return path
+
+
+@pytest.fixture(params=[False, True], ids=["plain", "gzip"])
+def bulk_data(request, tmp_path, monkeypatch):
+    """Load the fixture dump, forcing elements to be split across read chunks."""
+    monkeypatch.setattr(ScryfallBulkData, "_ScryfallBulkData__read_size", 7)
+    suffix = ".json.gz" if request.param else ".json"
+    cards_path = write_dump(
+        tmp_path.joinpath(f"all-cards{suffix}"), FIXTURE_CARDS, request.param
+    )
+    rulings_path = write_dump(
+        tmp_path.joinpath(f"rulings{suffix}"), FIXTURE_RULINGS, request.param
+    )
+    return ScryfallBulkData(cards_path, rulings_path)
+
+
+def test_all_entries_are_indexed(bulk_data):
+    """Every card and ruling in the dump should be reachable."""
+    assert len(bulk_data.cards_by_set_number_lang) == len(FIXTURE_CARDS)
+    assert bulk_data.has_all_languages
+    assert bulk_data.has_rulings
+
+
+def test_set_cards_prefer_english_then_printed_language(bulk_data):
+    """Sets should only return one print per card, like a default search."""
+    m10_cards = bulk_data.get_set_cards("M10")
+    assert [(card["collector_number"], card["lang"]) for card in m10_cards] == [
+        ("146", "en"),
+        ("300", "en"),
+    ]
+
+    assert [card["lang"] for card in bulk_data.get_set_cards("4BB")] == ["ja"]
+    assert not bulk_data.get_set_cards("XYZ")
+
+
+def test_foreign_cards_by_set_and_number(bulk_data):
+    """Foreign prints come back in language order and skip English."""
+    foreign_cards = bulk_data.get_foreign_cards("m10", "146")
+    assert [card["lang"] for card in foreign_cards] == ["de", "ja"]
+    assert not bulk_data.get_foreign_cards("m10", "300")
+
+
+def test_printings_by_oracle_id(bulk_data):
+    """Printings include foreign only sets and card face oracle IDs."""
+    assert bulk_data.get_printings(ORACLE_BOLT) == ["4BB", "M10"]
+    assert bulk_data.get_printings(ORACLE_TWINS) == ["M10"]
+    assert not bulk_data.get_printings("missing")
+
+
+def test_rulings_by_oracle_id(bulk_data):
+    """Rulings are served by oracle ID."""
+    assert [ruling["comment"] for ruling in bulk_data.get_rulings(ORACLE_BOLT)] == [
+        "It deals 3 damage."
+    ]
+    assert not bulk_data.get_rulings(ORACLE_TWINS)
+
+
+def test_default_cards_dump_is_detected(tmp_path):
+    """A dump without any card in multiple languages is treated as default_cards."""
+    cards_path = write_dump(
+        tmp_path.joinpath("default-cards.json"),
+        [card for card in FIXTURE_CARDS if card["lang"] == "en"],
+    )
+    bulk_data = ScryfallBulkData(cards_path)
+    assert not bulk_data.has_all_languages
+    assert not bulk_data.has_rulings
+
+
+def test_unterminated_dump_raises(tmp_path):
+    """A truncated dump should fail loudly instead of silently losing cards."""
+    cards_path = tmp_path.joinpath("broken.json")
+    cards_path.write_text('[\n{"set": "m10", "collector_number": "1"', "utf-8")
+    with pytest.raises(ValueError):
+        ScryfallBulkData(cards_path)
@@ -0,0 +1,268 @@
+"""Test that the single pass over AllPrintings matches reading it once per output."""
+
+import json
+import tracemalloc
+
+import pytest
+
+from mtgjson5.all_printings_sinks import (
+    AtomicCardsSink,
+    DeckCardIndexSink,
+    EnumValuesSink,
+    SetListSink,
+)
+from mtgjson5.compiled_classes import (
+    MtgjsonAllIdentifiersObject,
+    MtgjsonAllPrintingsObject,
+    MtgjsonAtomicCardsObject,
+    MtgjsonEnumValuesObject,
+    MtgjsonSetListObject,
+)
+from mtgjson5.mtgjson_config import MtgjsonConfig
+from mtgjson5.output_generator import build_all_printings_files, write_to_file
+from mtgjson5.providers.github_decks import GitHubDecksProvider, build_single_card
+
+ALL_FORMATS_LEGAL = {
+    "standard": "Legal",
+    "pioneer": "Legal",
+    "modern": "Legal",
+    "legacy": "Legal",
+    "vintage": "Legal",
+    "pauper": "Legal",
+}
+ETERNAL_LEGAL = {"legacy": "Legal", "vintage": "Restricted"}
+
+
+def build_card(set_code, number, name, legalities, **fields):
+    """A card as it appears in a set file."""
+    return {
+        "name": name,
+        "number": number,
+        "setCode": set_code,
+        "uuid": f"{set_code}-{number}",
+        "text": f"{name} text",
+        "type": "Instant",
+        "layout": "normal",
+        "rarity": "common",
+        "colors": ["R"],
+        "legalities": legalities,
+        "identifiers": {"scryfallOracleId": name, "scryfallId": f"{set_code}{number}"},
+        "foreignData": [
+            {"language": "German", "name": f"{name} DE", "multiverseId": 1}
+        ],
+        **fields,
+    }
+
+
+SETS = {
+    "AFR": {
+        "name": "Adventures in the Forgotten Realms",
+        "code": "AFR",
+        "type": "expansion",
+        "booster": {"default": {}},
+        "cards": [build_card("AFR", "1", "Fireball", ALL_FORMATS_LEGAL)],
+        "tokens": [
+            {
+                "name": "Tomb of Annihilation",
+                "type": "Dungeon",
+                "uuid": "AFR-T1",
+                "layout": "dungeon",
+                "legalities": {},
+            }
+        ],
+        "sealedProduct": [{"category": "booster_box", "subtype": "default"}],
+    },
+    "CON": {
+        "name": "Conflux",
+        "code": "CON",
+        "type": "expansion",
+        "cards": [
+            build_card("CON", "1", "Fireball", ALL_FORMATS_LEGAL, isReprint=True),
+            build_card("CON", "2", "A-Fireball", {}, isRebalanced=True),
+        ],
+        "tokens": [],
+    },
+    "PLS": {
+        "name": "Planeshift Promos",
+        "code": "PLS",
+        "type": "promo",
+        "cards": [build_card("PLS", "1", "Shock", ETERNAL_LEGAL)],
+        "tokens": [],
+    },
+    "XYZ": {"code": "XYZ", "cards": [], "tokens": []},
+}
+
+
+@pytest.fixture
+def output_path(tmp_path, monkeypatch):
+    """Write the set files to a temporary build output."""
+    monkeypatch.setattr(MtgjsonConfig(), "output_path", tmp_path)
+    for set_code, set_contents in SETS.items():
+        file_name = f"{set_code}_" if set_code == "CON" else set_code
+        tmp_path.joinpath(f"{file_name}.json").write_text(
+            json.dumps({"meta": {}, "data": set_contents}), encoding="utf-8"
+        )
+    return tmp_path
+
+
+def to_json(compiled_object):
+    """Serialize a compiled output the way it is written."""
+    return json.dumps(compiled_object, sort_keys=True, default=lambda o: o.to_json())
+
+
+def read_data(output_path, file_name):
+    """Read the data object of a written output."""
+    with output_path.joinpath(f"{file_name}.json").open(encoding="utf-8") as file:
+        return json.load(file)["data"]
+
+
+def test_single_pass_matches_separate_reads(output_path):
+    """Each sink must build what the per-output readers build on their own."""
+    atomic_cards_sink = AtomicCardsSink()
+    set_list_sink = SetListSink()
+    enum_values_sink = EnumValuesSink()
+    build_all_printings_files(
+        False, [atomic_cards_sink, set_list_sink, enum_values_sink]
+    )
+
+    assert to_json(set_list_sink.get_set_list()) == to_json(MtgjsonSetListObject())
+    assert to_json(atomic_cards_sink.atomic_cards) == to_json(
+        MtgjsonAtomicCardsObject()
+    )
+    assert to_json(enum_values_sink.get_enum_values()) == to_json(
+        MtgjsonEnumValuesObject()
+    )
+    assert to_json(read_data(output_path, "AllIdentifiers")) == to_json(
+        MtgjsonAllIdentifiersObject(MtgjsonAllPrintingsObject().to_json())
+    )
+    assert read_data(output_path, "AllPrintings") == SETS
+
+
+@pytest.mark.parametrize("pretty_print", [False, True], ids=["minimal", "pretty"])
+def test_all_identifiers_matches_dumped_output(output_path, pretty_print):
+    """Streaming AllIdentifiers by UUID writes what dumping it at once did."""
+    build_all_printings_files(pretty_print)
+    write_to_file(
+        "Dumped",
+        MtgjsonAllIdentifiersObject(MtgjsonAllPrintingsObject().to_json()),
+        pretty_print,
+    )
+
+    assert output_path.joinpath("AllIdentifiers.json").read_bytes() == (
+        output_path.joinpath("Dumped.json").read_bytes()
+    )
+
+
+def test_failed_pass_leaves_no_outputs(output_path, monkeypatch):
+    """Outputs of a pass that fails part way are removed, not left truncated."""
+    written_before = sorted(path.name for path in output_path.iterdir())
+
+    def failing_add_set(set_code, set_contents):
+        if set_code == "PLS":
+            raise ValueError("Bad set")
+
+    failing_sink = SetListSink()
+    monkeypatch.setattr(failing_sink, "add_set", failing_add_set)
+    with pytest.raises(ValueError):
+        build_all_printings_files(False, [failing_sink])
+
+    assert sorted(path.name for path in output_path.iterdir()) == written_before
+
+
+def test_format_outputs(output_path):
+    """Format files only hold normal sets, but atomic format files hold any card."""
+    atomic_cards_sink = AtomicCardsSink()
+    build_all_printings_files(False, [atomic_cards_sink])
+
+    assert list(read_data(output_path, "Standard")) == ["AFR", "CON"]
+    assert list(read_data(output_path, "Vintage")) == ["AFR", "CON"]
+
+    atomic_cards_by_format = atomic_cards_sink.atomic_cards_by_format
+    assert sorted(atomic_cards_by_format["standard"].to_json()) == [
+        "Fireball",
+        "Tomb of Annihilation",
+    ]
+    assert sorted(atomic_cards_by_format["vintage"].to_json()) == [
+        "Fireball",
+        "Shock",
+        "Tomb of Annihilation",
+    ]
+    assert atomic_cards_by_format["vintage"].to_json()["Shock"][0]["legalities"] == (
+        ETERNAL_LEGAL
+    )
+
+
+def test_deck_cards_are_copied_from_the_index(output_path, monkeypatch):
+    """Building decks must not leak deck counts into other outputs."""
+    deck_card = {"set_code": "con", "mtgjson_uuid": "CON-1", "count": 4, "foil": True}
+    monkeypatch.setattr(
+        GitHubDecksProvider(),
+        "get_precon_decks",
+        lambda: [{"cards": [deck_card], "sideboard": [], "commander": []}],
+    )
+    deck_card_index_sink = DeckCardIndexSink()
+    build_all_printings_files(False, [deck_card_index_sink])
+
+    GitHubDecksProvider().all_printings_cards = deck_card_index_sink.deck_card_index
+    deck_cards = build_single_card(deck_card)
+
+    assert [(card["uuid"], card["count"], card["isFoil"]) for card in deck_cards] == [
+        ("CON-1", 4, True)
+    ]
+    assert "count" not in deck_card_index_sink.deck_card_index["CON"]["CON-1"][0]
+
+    # Only cards the decks use are kept, but every set is still known
+    assert {
+        set_code: list(cards_by_uuid)
+        for set_code, cards_by_uuid in deck_card_index_sink.deck_card_index.items()
+    } == {"AFR": [], "CON": ["CON-1"], "PLS": [], "XYZ": []}
+
+
+def test_single_pass_holds_one_set_at_a_time(tmp_path, monkeypatch):
+    """Peak memory of the pass follows the largest set, not every card."""
+    monkeypatch.setattr(MtgjsonConfig(), "output_path", tmp_path)
+    monkeypatch.setattr(
+        GitHubDecksProvider(),
+        "get_precon_decks",
+        lambda: [
+            {
+                "cards": [{"set_code": "s00", "mtgjson_uuid": "S00-1"}],
+                "sideboard": [],
+                "commander": [],
+            }
+        ],
+    )
+    for index in range(20):
+        set_code = f"S{index:02}"
+        tmp_path.joinpath(f"{set_code}.json").write_text(
+            json.dumps(
+                {
+                    "meta": {},
+                    "data": {
+                        "code": set_code,
+                        "type": "expansion",
+                        "cards": [
+                            build_card(set_code, str(number), f"Card {number}", {})
+                            for number in range(300)
+                        ],
+                        "tokens": [],
+                    },
+                }
+            ),
+            encoding="utf-8",
+        )
+
+    tracemalloc.start()
+    try:
+        build_all_printings_files(False, [DeckCardIndexSink()])
+        pass_peak = tracemalloc.get_traced_memory()[1]
+
+        tracemalloc.reset_peak()
+        tracemalloc.clear_traces()
+        all_printings = MtgjsonAllPrintingsObject().to_json()
+        all_cards = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+
+    assert len(all_printings) == 20
+    assert pass_peak * 5 < all_cards
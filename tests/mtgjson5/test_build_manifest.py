@@ -0,0 +1,303 @@
+"""Test that set files are only reused while their inputs are unchanged."""
+
+import json
+
+import pytest
+
+from mtgjson5 import build_manifest, mtgjson_stream_writer
+from mtgjson5.build_manifest import MtgjsonBuildManifest
+from mtgjson5.classes import MtgjsonMetaObject
+from mtgjson5.mtgjson_config import MtgjsonConfig
+
+SET_DATA = {"name": "Magic 2010", "code": "m10", "released_at": "2009-07-17"}
+SCRYFALL_CARDS = [
+    {
+        "id": "scryfall-1",
+        "name": "Lightning Bolt",
+        "collector_number": "146",
+        "set": "m10",
+        "oracle_id": "oracle-1",
+        "multiverse_ids": [191089],
+        "prints_search_uri": "https://api.scryfall.com/cards/search?q=oracleid%3A%22oracle-1%22",
+        "rulings_uri": "https://api.scryfall.com/cards/scryfall-1/rulings",
+    }
+]
+PRINTINGS = {"oracle-1": ["M10", "LEA"]}
+
+
+@pytest.fixture
+def providers(mocker):
+    """Providers serving fixed payloads for M10."""
+    mocker.patch.object(build_manifest, "get_scryfall_set_data", return_value=SET_DATA)
+    scryfall_provider = mocker.patch.object(build_manifest, "ScryfallProvider")
+    scryfall_provider.return_value.download_cards.side_effect = lambda set_code: (
+        list(SCRYFALL_CARDS) if set_code == "M10" else []
+    )
+    scryfall_provider.return_value.download_foreign_cards.return_value = []
+    scryfall_provider.return_value.cards_without_limits = set()
+    scryfall_provider.return_value.get_alchemy_cards_with_spellbooks.return_value = []
+    mocker.patch.object(
+        build_manifest,
+        "parse_printings",
+        side_effect=lambda prints_url, oracle_id: PRINTINGS[oracle_id],
+    )
+    mocker.patch.object(build_manifest, "parse_rulings", return_value=[])
+    for provider in [
+        "CardMarketProvider",
+        "EdhrecProviderCardRanks",
+        "FandomProviderSecretLair",
+        "GathererProvider",
+        "GitHubBoostersProvider",
+        "GitHubCardSealedProductsProvider",
+        "GitHubDecksProvider",
+        "GitHubSealedProvider",
+        "MTGBanProvider",
+        "MultiverseBridgeProvider",
+        "ScryfallProviderOrientationDetector",
+        "ScryfallProviderSetLanguageDetector",
+        "WhatsInStandardProvider",
+    ]:
+        mocked_provider = mocker.patch.object(build_manifest, provider).return_value
+        mocked_provider.get_set_id.return_value = 1
+        mocked_provider.get_extras_set_id.return_value = None
+        mocked_provider.get_mkm_cards.return_value = {}
+        mocked_provider.get_set_booster_data.return_value = None
+        mocked_provider.get_decks_in_set.return_value = []
+        mocked_provider.get_products_card_found_in.return_value = None
+        mocked_provider.sealed_products = {}
+        mocked_provider.sealed_contents = {}
+        mocked_provider.get_cards.return_value = []
+        mocked_provider.get_rosetta_stone_cards.return_value = {}
+        mocked_provider.get_rosetta_stone_sets.return_value = {}
+        mocked_provider.get_mtgjson_to_card_kingdom.return_value = {}
+        mocked_provider.get_set_printing_languages.return_value = ["English"]
+        mocked_provider.set_codes = set()
+        mocked_provider.get_salt_rating.return_value = None
+        mocked_provider.download.return_value = {}
+        mocked_provider.get_uuid_to_orientation_map.return_value = {}
+    return scryfall_provider
+
+
+@pytest.fixture
+def manifest_path(tmp_path, monkeypatch):
+    """Build into a dated directory, with the manifest next to it."""
+    monkeypatch.setattr(build_manifest, "get_builder_version", lambda: "5.2.2-abc")
+    set_output_directory(tmp_path, monkeypatch, "2024-01-01")
+    return tmp_path.joinpath("mtgjson_build_manifest.json")
+
+
+def set_output_directory(tmp_path, monkeypatch, build_date):
+    """Point the build at the directory of a given day."""
+    output_path = tmp_path.joinpath(f"mtgjson_build_{build_date}")
+    output_path.mkdir(exist_ok=True)
+    monkeypatch.setattr(MtgjsonConfig(), "output_path", output_path)
+    monkeypatch.setattr(
+        mtgjson_stream_writer,
+        "MtgjsonMetaObject",
+        lambda: MtgjsonMetaObject(build_date, f"5.2.2+{build_date}"),
+    )
+    return output_path
+
+
+def write_set_file(output_path, set_code, card_uuids, set_type="core"):
+    """Write a built set file."""
+    output_path.joinpath(f"{set_code}.json").write_text(
+        json.dumps(
+            {
+                "meta": {"date": "2024-01-01", "version": "5.2.2+2024-01-01"},
+                "data": {
+                    "cards": [
+                        {"name": "Lightning Bolt", "uuid": card_uuid}
+                        for card_uuid in card_uuids
+                    ],
+                    "type": set_type,
+                },
+            }
+        ),
+        encoding="utf-8",
+    )
+
+
+def test_unchanged_sets_are_reused_across_builds(
+    providers, manifest_path, tmp_path, monkeypatch
+):
+    """Set files carry over to the next day's build until an input changes."""
+    manifest = MtgjsonBuildManifest(manifest_path)
+    fingerprint = manifest.get_set_fingerprint("M10")
+    assert not manifest.reuse_set_file("M10", fingerprint, False)
+
+    write_set_file(MtgjsonConfig().output_path, "M10", ["uuid-1"])
+    manifest.record_set("M10", fingerprint)
+    manifest.save()
+
+    next_output_path = set_output_directory(tmp_path, monkeypatch, "2024-01-02")
+    manifest = MtgjsonBuildManifest(manifest_path)
+    assert manifest.get_set_fingerprint("M10") == fingerprint
+    assert manifest.reuse_set_file("M10", fingerprint, False)
+
+    # The reused file is written out with this build's meta
+    assert json.loads(next_output_path.joinpath("M10.json").read_text("utf-8")) == {
+        "meta": {"date": "2024-01-02", "version": "5.2.2+2024-01-02"},
+        "data": {
+            "cards": [{"name": "Lightning Bolt", "uuid": "uuid-1"}],
+            "type": "core",
+        },
+    }
+    manifest.save()
+    assert json.loads(manifest_path.read_text("utf-8"))["sets"]["M10"][
+        "outputFile"
+    ] == str(next_output_path.joinpath("M10.json"))
+
+    SCRYFALL_CARDS.append({**SCRYFALL_CARDS[0], "id": "scryfall-2"})
+    try:
+        assert manifest.get_set_fingerprint("M10") != fingerprint
+    finally:
+        SCRYFALL_CARDS.pop()
+
+
+def test_card_lookups_change_the_fingerprint(providers, manifest_path, monkeypatch):
+    """Inputs looked up per card, or by date, change the fingerprint too."""
+    manifest = MtgjsonBuildManifest(manifest_path)
+    fingerprint = manifest.get_set_fingerprint("M10")
+
+    # A reprint elsewhere adds to the printings of the set's cards
+    monkeypatch.setitem(PRINTINGS, "oracle-1", ["M10", "LEA", "2XM"])
+    reprinted_fingerprint = manifest.get_set_fingerprint("M10")
+    assert reprinted_fingerprint != fingerprint
+
+    build_manifest.GathererProvider().get_cards.return_value = [
+        {"original_text": "Lightning Bolt deals 3 damage to target creature."}
+    ]
+    gatherer_fingerprint = manifest.get_set_fingerprint("M10")
+    assert gatherer_fingerprint != reprinted_fingerprint
+
+    build_manifest.WhatsInStandardProvider().set_codes = {"M10"}
+    standard_fingerprint = manifest.get_set_fingerprint("M10")
+    assert standard_fingerprint != gatherer_fingerprint
+
+    # A preview set stops being partial once it's released
+    monkeypatch.setitem(SET_DATA, "released_at", "9999-01-01")
+    preview_fingerprint = manifest.get_set_fingerprint("M10")
+    assert preview_fingerprint != standard_fingerprint
+
+    # Secret Lair drops and Art Series orientations are only looked up for them
+    build_manifest.FandomProviderSecretLair().download.return_value = {"146": "Drop"}
+    build_manifest.ScryfallProviderOrientationDetector().get_uuid_to_orientation_map.return_value = {
+        "scryfall-1": "portrait"
+    }
+    assert manifest.get_set_fingerprint("M10") == preview_fingerprint
+
+    monkeypatch.setitem(SET_DATA, "code", "sld")
+    secret_lair_fingerprint = manifest.get_set_fingerprint("SLD")
+    build_manifest.FandomProviderSecretLair().download.return_value = {"146": "Bolt"}
+    assert manifest.get_set_fingerprint("SLD") != secret_lair_fingerprint
+
+    monkeypatch.setitem(SET_DATA, "name", "Magic 2010 Art Series")
+    art_series_fingerprint = manifest.get_set_fingerprint("SLD")
+    build_manifest.ScryfallProviderOrientationDetector().get_uuid_to_orientation_map.return_value = {
+        "scryfall-1": "landscape"
+    }
+    assert manifest.get_set_fingerprint("SLD") != art_series_fingerprint
+
+
+def test_old_set_files_are_rebuilt(providers, manifest_path, monkeypatch):
+    """Set files past the maximum age are rebuilt, whatever their inputs."""
+    manifest = MtgjsonBuildManifest(manifest_path)
+    fingerprint = manifest.get_set_fingerprint("M10")
+    write_set_file(MtgjsonConfig().output_path, "M10", ["uuid-1"])
+
+    monkeypatch.setattr(build_manifest.constants, "MTGJSON_BUILD_DATE", "2000-01-01")
+    manifest.record_set("M10", fingerprint)
+    assert not manifest.reuse_set_file("M10", fingerprint, False)
+
+    manifest.max_age_days = 365 * 1000
+    assert manifest.reuse_set_file("M10", fingerprint, False)
+
+
+def test_builder_changes_rebuild_every_set(providers, manifest_path, monkeypatch):
+    """A new builder version discards every recorded fingerprint."""
+    manifest = MtgjsonBuildManifest(manifest_path)
+    fingerprint = manifest.get_set_fingerprint("M10")
+    write_set_file(MtgjsonConfig().output_path, "M10", ["uuid-1"])
+    manifest.record_set("M10", fingerprint)
+    manifest.save()
+
+    monkeypatch.setattr(build_manifest, "get_builder_version", lambda: "5.2.2-def")
+    manifest = MtgjsonBuildManifest(manifest_path)
+    assert not manifest.reuse_set_file("M10", fingerprint, False)
+    assert manifest.get_set_fingerprint("M10") != fingerprint
+
+
+def test_local_only_sets_are_always_built(providers, manifest_path, mocker):
+    """Sets Scryfall doesn't know about can't be fingerprinted."""
+    mocker.patch.object(build_manifest, "get_scryfall_set_data", return_value=None)
+    assert MtgjsonBuildManifest(manifest_path).get_set_fingerprint("PHOP") is None
+
+
+def test_builder_version_covers_the_code():
+    """The builder version is stable for the same code."""
+    assert build_manifest.get_builder_version() == build_manifest.get_builder_version()
+
+
+def test_card_input_changes_rebuild_the_set(providers, manifest_path):
+    """Lookups by the UUIDs and names of built cards change the set file too."""
+    manifest = MtgjsonBuildManifest(manifest_path)
+    fingerprint = manifest.get_set_fingerprint("M10")
+    write_set_file(MtgjsonConfig().output_path, "M10", ["uuid-1"])
+    manifest.record_set("M10", fingerprint)
+    assert manifest.reuse_set_file("M10", fingerprint, False)
+
+    card_products_provider = build_manifest.GitHubCardSealedProductsProvider()
+    card_products_provider.get_products_card_found_in.return_value = {
+        "sealed": ["product-uuid"]
+    }
+    assert not manifest.reuse_set_file("M10", fingerprint, False)
+
+    manifest.record_set("M10", fingerprint)
+    assert manifest.reuse_set_file("M10", fingerprint, False)
+    build_manifest.MTGBanProvider().get_mtgjson_to_card_kingdom.return_value = {
+        "uuid-1": {"normal": {"id": 1, "url": "mtg/m10/lightning-bolt"}}
+    }
+    assert not manifest.reuse_set_file("M10", fingerprint, False)
+
+    manifest.record_set("M10", fingerprint)
+    build_manifest.EdhrecProviderCardRanks().get_salt_rating.return_value = 0.5
+    assert not manifest.reuse_set_file("M10", fingerprint, False)
+
+    manifest.record_set("M10", fingerprint)
+    build_manifest.ScryfallProvider().cards_without_limits = {"Lightning Bolt"}
+    assert not manifest.reuse_set_file("M10", fingerprint, False)
+
+    # Spellbooks are only looked up for the cards of Alchemy sets
+    scryfall_provider = build_manifest.ScryfallProvider()
+    scryfall_provider.get_alchemy_cards_with_spellbooks.return_value = [
+        "Lightning Bolt"
+    ]
+    scryfall_provider.get_card_names_in_spellbook.return_value = ["Shock"]
+    manifest.record_set("M10", fingerprint)
+    assert manifest.reuse_set_file("M10", fingerprint, False)
+    assert scryfall_provider.get_card_names_in_spellbook.call_count == 0
+
+    write_set_file(MtgjsonConfig().output_path, "M10", ["uuid-1"], "alchemy")
+    manifest.record_set("M10", fingerprint)
+    scryfall_provider.get_card_names_in_spellbook.return_value = ["Shock", "Spark"]
+    assert not manifest.reuse_set_file("M10", fingerprint, False)
+    scryfall_provider.get_card_names_in_spellbook.assert_called_with("Lightning Bolt")
+
+
+def test_referrals_are_kept_for_reused_sets(providers, manifest_path):
+    """Sets are only reused for referral builds if their referrals were kept."""
+    manifest = MtgjsonBuildManifest(manifest_path)
+    fingerprint = manifest.get_set_fingerprint("M10")
+    write_set_file(MtgjsonConfig().output_path, "M10", ["uuid-1"])
+
+    manifest.record_set("M10", fingerprint)
+    assert manifest.reuse_set_file("M10", fingerprint, False)
+    assert not manifest.reuse_set_file("M10", fingerprint, False, True)
+
+    referrals = [("abc123", "https://shop.example/bolt?partner=mtgjson")]
+    manifest.record_set("M10", fingerprint, referrals)
+    manifest.save()
+    manifest = MtgjsonBuildManifest(manifest_path)
+    assert manifest.reuse_set_file("M10", fingerprint, False, True)
+    assert manifest.get_set_referrals("M10") == referrals
@@ -0,0 +1,142 @@
+"""Test how sets are built and written out, and which are reused."""
+
+import logging
+from unittest import mock
+
+import gevent.event
+import pytest
+
+from mtgjson5 import (
+    build_manifest,
+    output_generator,
+    providers,
+    referral_builder,
+    set_builder,
+)
+from mtgjson5.classes import MtgjsonCardObject, MtgjsonSetObject
+from mtgjson5.mtgjson_config import MtgjsonConfig
+
+# Monkey patching now would affect the other tests, and isn't needed here
+with mock.patch("gevent.monkey.patch_all"):
+    from mtgjson5 import __main__ as mtgjson_main
+
+
+def build_set(set_code):
+    """A set with one card that has a referral."""
+    card = MtgjsonCardObject()
+    card.name = f"{set_code} Card"
+    card.purchase_urls.tcgplayer = f"https://mtgjson.com/links/{set_code.lower()}"
+    card.raw_purchase_urls["tcgplayer"] = f"https://shop.example/{set_code}?scryfall"
+
+    mtgjson_set = MtgjsonSetObject()
+    mtgjson_set.code = set_code
+    mtgjson_set.cards = [card]
+    mtgjson_set.sealed_product = []
+    return mtgjson_set
+
+
+@pytest.fixture
+def set_build(tmp_path, mocker):
+    """Sets built without providers, and the files they're written to."""
+    mocker.patch.object(MtgjsonConfig(), "output_path", tmp_path)
+    # The logger is only set up when running as a program
+    mocker.patch.object(
+        mtgjson_main, "LOGGER", logging.getLogger(__name__), create=True
+    )
+    for provider in [
+        "CardMarketProvider",
+        "GathererProvider",
+        "GitHubBoostersProvider",
+        "GitHubCardSealedProductsProvider",
+        "GitHubSealedProvider",
+        "WhatsInStandardProvider",
+    ]:
+        mocker.patch.object(providers, provider)
+    written_files = []
+    mocker.patch.object(
+        output_generator,
+        "write_to_file",
+        side_effect=lambda file_name, **_: written_files.append(file_name),
+    )
+    mocker.patch.object(set_builder, "build_mtgjson_set", side_effect=build_set)
+    return written_files
+
+
+def read_referral_map(tmp_path):
+    """Lines of the referral map."""
+    return tmp_path.joinpath("ReferralMap.json").read_text("utf-8").splitlines()
+
+
+def test_concurrent_builds_are_written_in_order(set_build, tmp_path, mocker):
+    """Sets finishing out of order are still written in the order given."""
+    set_codes = ["LEA", "M10", "MISSING", "2XM"]
+    built = {set_code: gevent.event.Event() for set_code in set_codes}
+    events = []
+
+    def build_set_after_next(set_code):
+        # Each set only finishes once the set after it has, so the builds
+        # have to run at the same time, and finish in reverse order
+        events.append(f"start {set_code}")
+        next_index = set_codes.index(set_code) + 1
+        if next_index < len(set_codes):
+            assert built[set_codes[next_index]].wait(timeout=5)
+        events.append(f"finish {set_code}")
+        built[set_code].set()
+        return None if set_code == "MISSING" else build_set(set_code)
+
+    mocker.patch.object(
+        set_builder, "build_mtgjson_set", side_effect=build_set_after_next
+    )
+    write_referral_map = mocker.spy(referral_builder, "write_referral_map")
+
+    assert mtgjson_main.build_mtgjson_sets(set_codes, False, True, 4) == [
+        "LEA",
+        "M10",
+        "2XM",
+    ]
+    assert events == [f"start {set_code}" for set_code in set_codes] + [
+        f"finish {set_code}" for set_code in reversed(set_codes)
+    ]
+    assert set_build == ["LEA", "M10", "2XM"]
+    assert [call.args[0] for call in write_referral_map.call_args_list] == [
+        [("lea", "https://shop.example/LEA?mtgjson")],
+        [("m10", "https://shop.example/M10?mtgjson")],
+        [("2xm", "https://shop.example/2XM?mtgjson")],
+    ]
+
+
+def test_reused_sets_keep_their_referrals(set_build, tmp_path, mocker):
+    """Referrals of reused sets are written with those of the sets built."""
+    manifest = mocker.patch.object(build_manifest, "MtgjsonBuildManifest").return_value
+    manifest.get_set_fingerprint.side_effect = lambda set_code: f"fp-{set_code}"
+    manifest.reuse_set_file.side_effect = lambda set_code, *_: set_code == "LEA"
+    manifest.get_set_referrals.return_value = [
+        ("lea", "https://shop.example/LEA?mtgjson")
+    ]
+
+    mtgjson_main.build_mtgjson_sets_incrementally(["LEA", "M10"], False, True)
+
+    assert set_build == ["M10"]
+    assert read_referral_map(tmp_path) == [
+        "/links/lea\thttps://shop.example/LEA?mtgjson;",
+        "/links/m10\thttps://shop.example/M10?mtgjson;",
+    ]
+    manifest.record_set.assert_called_once_with(
+        "M10", "fp-M10", [("m10", "https://shop.example/M10?mtgjson")]
+    )
+    manifest.get_set_referrals.assert_called_once_with("LEA")
+
+    # With every set reused, the referral map is still sorted and unique
+    tmp_path.joinpath("ReferralMap.json").unlink()
+    manifest.reuse_set_file.side_effect = lambda *_: True
+    manifest.get_set_referrals.side_effect = (
+        lambda set_code: [
+            (set_code.lower(), f"https://shop.example/{set_code}?mtgjson")
+        ]
+        * 2
+    )
+    mtgjson_main.build_mtgjson_sets_incrementally(["M10", "LEA"], False, True)
+    assert read_referral_map(tmp_path) == [
+        "/links/lea\thttps://shop.example/LEA?mtgjson;",
+        "/links/m10\thttps://shop.example/M10?mtgjson;",
+    ]
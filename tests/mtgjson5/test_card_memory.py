@@ -0,0 +1,162 @@
+"""Test that cards stay compact in memory and still serialize the same."""
+
+import json
+import tracemalloc
+
+import pytest
+
+from mtgjson5.classes import (
+    MtgjsonCardObject,
+    MtgjsonForeignDataObject,
+    MtgjsonIdentifiersObject,
+    MtgjsonPurchaseUrlsObject,
+    MtgjsonRulingObject,
+)
+from mtgjson5.set_builder import parse_legalities
+
+CARD_COUNT = 2_000
+
+SCRYFALL_LEGALITIES = {
+    "standard": "not_legal",
+    "modern": "legal",
+    "legacy": "legal",
+    "vintage": "legal",
+    "commander": "legal",
+    "pauper": "legal",
+}
+
+
+class DictCard:
+    """A card holding its attributes in a per-object dictionary, as cards did."""
+
+    def __init__(self):
+        self.colors = []
+        self.artist = ""
+        self.artist_ids = None
+        self.layout = ""
+        self.watermark = None
+        self.purchase_urls = MtgjsonPurchaseUrlsObject()
+        self.side = None
+        self.face_name = None
+        self.raw_purchase_urls = {}
+        self.identifiers = MtgjsonIdentifiersObject()
+
+
+def build_card(number, card_class=MtgjsonCardObject):
+    """A card with the attributes the set builder gives a common printing."""
+    card = card_class()
+    card.name = f"Card {number}"
+    card.number = str(number)
+    card.uuid = f"{number:08}-0000-0000-0000-000000000000"
+    card.set_code = "TST"
+    card.artist = "An Artist"
+    card.artist_ids = [f"artist-{number}"]
+    card.border_color = "black"
+    card.frame_version = "2015"
+    card.language = "English"
+    card.rarity = "common"
+    card.layout = "normal"
+    card.mana_cost = "{1}{R}"
+    card.mana_value = 2.0
+    card.converted_mana_cost = 2.0
+    card.colors = ["R"]
+    card.color_identity = ["R"]
+    card.types = ["Creature"]
+    card.subtypes = ["Goblin"]
+    card.supertypes = []
+    card.type = "Creature — Goblin"
+    card.text = f"Card {number} deals 1 damage to any target."
+    card.power = "2"
+    card.toughness = "1"
+    card.finishes = ["nonfoil", "foil"]
+    card.has_foil = True
+    card.has_non_foil = True
+    card.availability = ["paper", "mtgo"]
+    card.keywords = ["Haste"]
+    card.printings = ["TST"]
+    card.foreign_data = []
+    card.is_reprint = False
+    card.edhrec_rank = number
+    card.legalities = parse_legalities(SCRYFALL_LEGALITIES)
+    card.identifiers.scryfall_id = f"scryfall-{number}"
+    card.identifiers.scryfall_oracle_id = f"oracle-{number}"
+    card.identifiers.scryfall_illustration_id = f"illustration-{number}"
+    card.identifiers.mtgo_id = str(number)
+    card.identifiers.multiverse_id = str(number)
+    card.identifiers.tcgplayer_product_id = str(number)
+    card.purchase_urls.tcgplayer = f"https://mtgjson.com/links/{number}"
+    return card
+
+
+def measure(card_class):
+    """Bytes allocated per card while building many of them."""
+    tracemalloc.start()
+    try:
+        cards = [build_card(number, card_class) for number in range(CARD_COUNT)]
+        allocated, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    del cards
+    return allocated / CARD_COUNT
+
+
+def test_cards_are_smaller_than_dictionaries():
+    """Built cards must cost less than the same attributes in a dictionary."""
+    assert measure(MtgjsonCardObject) < measure(DictCard) * 0.85
+
+
+def test_unset_attributes():
+    """Unset attributes raise, and aren't serialized."""
+    card = MtgjsonCardObject()
+    card.name = "Lightning Bolt"
+    card.foreign_data = []
+    with pytest.raises(AttributeError):
+        _ = card.rulings
+    assert not hasattr(card, "__dict__")
+    assert "rulings" not in card.to_json()
+
+    card.rulings = [MtgjsonRulingObject("2020-01-01", "A ruling.")]
+    assert card.to_json()["rulings"][0].to_json() == {
+        "date": "2020-01-01",
+        "text": "A ruling.",
+    }
+
+    del card.rulings
+    assert "rulings" not in card.to_json()
+    assert card.to_json()["foreignData"] == []
+
+
+def test_lazy_attributes():
+    """Identifiers and purchase URLs serialize the same whether they're built or not."""
+
+    def dump(card):
+        return json.dumps(card, default=lambda value: value.to_json())
+
+    unused_card = MtgjsonCardObject()
+    unused_card.name = "Lightning Bolt"
+    used_card = MtgjsonCardObject()
+    used_card.name = "Lightning Bolt"
+    assert used_card.identifiers.to_json() == {}
+    assert used_card.purchase_urls.to_json() == {}
+    assert used_card.raw_purchase_urls == {}
+
+    assert dump(unused_card) == dump(used_card)
+    assert '"identifiers": {}' in dump(unused_card)
+
+    # Values set on them are kept, and deleting them drops them from the output
+    used_card.identifiers.scryfall_id = "e3285e6b"
+    assert used_card.to_json()["identifiers"].scryfall_id == "e3285e6b"
+    del used_card.identifiers
+    del used_card.purchase_urls
+    assert "identifiers" not in used_card.to_json()
+    assert "purchaseUrls" not in used_card.to_json()
+    assert "identifiers" in unused_card.to_json()
+
+
+def test_foreign_data_skips_unset_fields():
+    """Only the foreign data fields that were found are serialized."""
+    foreign_data = MtgjsonForeignDataObject()
+    foreign_data.language = "German"
+    foreign_data.name = "Blitzschlag"
+
+    assert foreign_data.to_json() == {"language": "German", "name": "Blitzschlag"}
@@ -0,0 +1,93 @@
+"""Test that cards serialize the keys the skipping rules leave in."""
+
+import pytest
+
+from mtgjson5.classes import MtgjsonCardObject, MtgjsonRulingObject
+from mtgjson5.utils import to_snake_case
+
+
+def build_card(is_token):
+    """A card mixing set, falsey and unset attributes."""
+    card = MtgjsonCardObject(is_token)
+    card.name = "Goblin"
+    card.set_code = "M10"
+    card.number = "1"
+    card.uuid = "1a2b3c"
+    card.mana_value = 0.0
+    card.converted_mana_cost = 0
+    card.types = ["Creature"]
+    card.subtypes = []
+    card.supertypes = []
+    card.keywords = []
+    card.has_foil = False
+    card.is_reprint = False
+    card.foreign_data = []
+    card.rulings = [MtgjsonRulingObject("2020-01-01", "A ruling.")]
+    card.reverse_related = ["Goblin Instigator"]
+    card.raw_purchase_urls = {"tcgplayer": "https://example.com"}
+    return card
+
+
+@pytest.mark.parametrize(
+    "is_token, expected_keys",
+    [
+        (
+            False,
+            [
+                "colors",
+                "convertedManaCost",
+                "foreignData",
+                "hasFoil",
+                "identifiers",
+                "manaValue",
+                "name",
+                "number",
+                "purchaseUrls",
+                "rulings",
+                "subtypes",
+                "supertypes",
+                "types",
+                "uuid",
+                "setCode",
+            ],
+        ),
+        (
+            True,
+            [
+                "colors",
+                "hasFoil",
+                "identifiers",
+                "name",
+                "number",
+                "reverseRelated",
+                "subtypes",
+                "supertypes",
+                "types",
+                "uuid",
+                "setCode",
+            ],
+        ),
+    ],
+    ids=["card", "token"],
+)
+def test_to_json_keeps_set_and_allowed_keys(is_token, expected_keys):
+    """The cached plan keeps set keys, and falsey ones only where they're allowed."""
+    card = build_card(is_token)
+    card_json = card.to_json()
+
+    assert list(card_json) == expected_keys
+    for key in expected_keys:
+        if key not in ("identifiers", "purchaseUrls"):
+            assert card_json[key] == getattr(card, to_snake_case(key))
+
+
+def test_tokens_and_cards_keep_different_keys():
+    """Tokens drop card-only keys, and cards drop token-only keys."""
+    card_json = build_card(False).to_json()
+    token_json = build_card(True).to_json()
+
+    assert "rulings" in card_json and "rulings" not in token_json
+    assert "reverseRelated" in token_json and "reverseRelated" not in card_json
+    assert card_json["subtypes"] == [] and "keywords" not in card_json
+    assert "isReprint" not in card_json and card_json["hasFoil"] is False
+    assert "rawPurchaseUrls" not in card_json and "isToken" not in token_json
@@ -0,0 +1,180 @@
+"""Test that compression builds every file and archive from the build output."""
+
+import bz2
+import gzip
+import hashlib
+import json
+import lzma
+import os
+import tarfile
+import time
+import zipfile
+
+import pytest
+
+from mtgjson5 import compress_generator
+from mtgjson5.compress_generator import (
+    MtgjsonCompressingWriter,
+    compress_mtgjson_contents,
+)
+from mtgjson5.mtgjson_config import MtgjsonConfig
+from mtgjson5.output_generator import write_to_file
+
+
+@pytest.fixture
+def output_path(tmp_path):
+    """A build output with sets, a compiled file and decks."""
+    tmp_path.joinpath("M10.json").write_text('{"data": "M10"}', encoding="utf-8")
+    tmp_path.joinpath("LEA.json").write_text('{"data": "LEA"}', encoding="utf-8")
+    tmp_path.joinpath("AllPrintings.json").write_text("{}" * 1000, encoding="utf-8")
+    tmp_path.joinpath("decks").mkdir()
+    tmp_path.joinpath("decks", "Deck_M10.json").write_text("{}", encoding="utf-8")
+    return tmp_path
+
+
+def test_every_format_is_written(output_path):
+    """Each file gets every format, and each directory every archive."""
+    compress_mtgjson_contents(output_path)
+
+    for file_name in ["M10.json", "AllPrintings.json", "decks/Deck_M10.json"]:
+        original = output_path.joinpath(file_name).read_bytes()
+        assert bz2.decompress(output_path.joinpath(f"{file_name}.bz2").read_bytes())
+        assert gzip.decompress(output_path.joinpath(f"{file_name}.gz").read_bytes())
+        assert (
+            lzma.decompress(output_path.joinpath(f"{file_name}.xz").read_bytes())
+            == original
+        )
+        with zipfile.ZipFile(output_path.joinpath(f"{file_name}.zip")) as archive:
+            assert archive.namelist() == [file_name.split("/")[-1]]
+
+    for extension in ["tar.bz2", "tar.gz", "tar.xz"]:
+        with tarfile.open(output_path.joinpath(f"AllSetFiles.{extension}")) as archive:
+            assert sorted(archive.getnames()) == [
+                "AllSetFiles",
+                "AllSetFiles/LEA.json",
+                "AllSetFiles/M10.json",
+            ]
+            assert (
+                archive.extractfile("AllSetFiles/LEA.json").read() == b'{"data": "LEA"}'
+            )
+
+    with zipfile.ZipFile(output_path.joinpath("AllDeckFiles.zip")) as archive:
+        assert archive.namelist() == ["Deck_M10.json"]
+
+    # Temporary directories are removed, and the originals left alone
+    assert not output_path.joinpath("AllSetFiles").exists()
+    assert output_path.joinpath("M10.json").read_text("utf-8") == '{"data": "M10"}'
+
+
+def test_job_limit_is_respected(output_path, monkeypatch):
+    """No more than the configured number of commands run at once."""
+    monkeypatch.setattr(
+        MtgjsonConfig(),
+        "get",
+        lambda section, option, fallback=None: "2"
+        if option == "compression_jobs"
+        else fallback,
+    )
+
+    running = []
+    most_running = []
+    run_compression_command = compress_generator._run_compression_command
+
+    def tracked_run(command):
+        running.append(command)
+        most_running.append(len(running))
+        try:
+            return run_compression_command(command)
+        finally:
+            running.remove(command)
+
+    monkeypatch.setattr(compress_generator, "_run_compression_command", tracked_run)
+    compress_mtgjson_contents(output_path)
+
+    assert max(most_running) == 2
+
+
+def test_threads_are_shared_between_jobs(monkeypatch):
+    """Jobs running at once don't use more threads than there are CPUs."""
+    monkeypatch.setattr(os, "cpu_count", lambda: 8)
+    for job_limit, threads in [("1", 8), ("2", 4), ("3", 2), ("8", 1), ("16", 1)]:
+        monkeypatch.setattr(
+            MtgjsonConfig(),
+            "get",
+            lambda section, option, fallback="": job_limit,
+        )
+        assert compress_generator.get_compression_threads_per_job() == threads
+        assert compress_generator._get_compression_programs()[2] == f"xz -T{threads}"
+
+
+def test_failed_jobs_fail_the_compression(output_path, monkeypatch):
+    """A job that errors or exits non-zero is reported once every job is done."""
+    finished = []
+    run_compression_command = compress_generator._run_compression_command
+
+    def failing_run(command):
+        if command[0] == "zip":
+            raise OSError("zip is not installed")
+        finished.append(command)
+        return run_compression_command(command)
+
+    monkeypatch.setattr(compress_generator, "_run_compression_command", failing_run)
+    with pytest.raises(RuntimeError, match="compression jobs failed"):
+        compress_mtgjson_contents(output_path)
+    assert finished
+    assert not output_path.joinpath("AllSetFiles").exists()
+
+    monkeypatch.setattr(
+        compress_generator, "_run_compression_command", lambda command: False
+    )
+    with pytest.raises(RuntimeError, match="compression jobs failed"):
+        compress_mtgjson_contents(output_path)
+
+
+def test_inline_compression(tmp_path, monkeypatch):
+    """Outputs compressed while written match compressing them afterwards."""
+    monkeypatch.setattr(MtgjsonConfig(), "output_path", tmp_path)
+    monkeypatch.setattr(MtgjsonConfig(), "inline_compression", True)
+    contents = {
+        f"SET{index}": {"cards": ["Æther Vial"] * index} for index in range(500)
+    }
+    write_to_file("AllPrintings", contents, pretty_print=True)
+
+    output_file = tmp_path.joinpath("AllPrintings.json")
+    original = output_file.read_bytes()
+    assert json.loads(original)["data"] == contents
+
+    assert bz2.decompress(tmp_path.joinpath("AllPrintings.json.bz2").read_bytes()) == (
+        original
+    )
+    assert gzip.decompress(tmp_path.joinpath("AllPrintings.json.gz").read_bytes()) == (
+        original
+    )
+    assert lzma.decompress(tmp_path.joinpath("AllPrintings.json.xz").read_bytes()) == (
+        original
+    )
+    with zipfile.ZipFile(tmp_path.joinpath("AllPrintings.json.zip")) as archive:
+        assert archive.namelist() == ["AllPrintings.json"]
+        assert archive.read("AllPrintings.json") == original
+
+    for extension in ["", ".bz2", ".gz", ".xz", ".zip"]:
+        compressed_file = tmp_path.joinpath(f"AllPrintings.json{extension}")
+        assert tmp_path.joinpath(f"AllPrintings.json{extension}.sha256").read_text(
+            "utf-8"
+        ) == (hashlib.sha256(compressed_file.read_bytes()).hexdigest())
+
+    # Nothing is left to compress, until the output changes
+    assert not compress_generator._get_file_compression_jobs(output_file)
+    os.utime(output_file, ns=(time.time_ns() + 10**9,) * 2)
+    assert len(compress_generator._get_file_compression_jobs(output_file)) == 4
+
+
+def test_compressing_writer_chunks(tmp_path):
+    """Data spanning many chunks is compressed in order."""
+    data = b"".join(str(index).encode() for index in range(100_000))
+    with MtgjsonCompressingWriter(tmp_path.joinpath("Large.json"), 4096) as writer:
+        for index in range(0, len(data), 1000):
+            writer.write(data[index : index + 1000])
+
+    assert tmp_path.joinpath("Large.json").read_bytes() == data
+    assert lzma.decompress(tmp_path.joinpath("Large.json.xz").read_bytes()) == data
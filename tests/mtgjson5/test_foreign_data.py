@@ -0,0 +1,72 @@
+"""Test that foreign data from a per-set sweep matches per-card parsing."""
+
+from mtgjson5.set_builder import get_foreign_data_from_index, parse_foreign_prints
+
+SET_SWEEP = [
+    {
+        "set": "iko",
+        "collector_number": "1",
+        "lang": "ja",
+        "name": "Adaptive Shimmerer",
+        "printed_name": "適応する煌めき",
+        "printed_text": "瞬速",
+        "printed_type_line": "クリーチャー",
+        "multiverse_ids": [480000],
+    },
+    {
+        "set": "iko",
+        "collector_number": "1",
+        "lang": "de",
+        "name": "Adaptive Shimmerer",
+        "printed_name": "Anpassungsfähiger Schimmerling",
+        "multiverse_ids": [],
+    },
+    {
+        "set": "iko",
+        "collector_number": "2",
+        "lang": "de",
+        "name": "Farfinder",
+        "printed_name": "Weitfinder",
+        "multiverse_ids": [],
+    },
+    {
+        "set": "iko",
+        "collector_number": "10",
+        "lang": "fr",
+        "name": "Brokkos, Apex of Forever",
+        "printed_name": "Brokkos",
+        "multiverse_ids": [],
+    },
+]
+
+
+def build_index(foreign_prints):
+    """Index a sweep the same way build_foreign_data_index does."""
+    return {
+        (card["set"], card["collector_number"], card["lang"]): card
+        for card in foreign_prints
+    }
+
+
+def test_index_matches_filtered_prints():
+    """Only the requested card's prints are used, in language order."""
+    foreign_data = get_foreign_data_from_index(
+        build_index(SET_SWEEP), "Adaptive Shimmerer", "1", "iko"
+    )
+    expected = parse_foreign_prints(
+        [SET_SWEEP[1], SET_SWEEP[0]], "Adaptive Shimmerer", "1", "iko"
+    )
+
+    assert [entry.to_json() for entry in foreign_data] == [
+        entry.to_json() for entry in expected
+    ]
+    assert [entry.language for entry in foreign_data] == ["German", "Japanese"]
+    assert foreign_data[1].multiverse_id == 480000
+
+
+def test_index_without_foreign_prints():
+    """Cards that were never printed in another language have no foreign data."""
+    assert not get_foreign_data_from_index(
+        build_index(SET_SWEEP), "Adaptive Shimmerer", "5", "iko"
+    )
+    assert not get_foreign_data_from_index({}, "Adaptive Shimmerer", "1", "iko")
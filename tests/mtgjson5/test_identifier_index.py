@@ -0,0 +1,141 @@
+"""Test that the shared identifier index maps cards like each provider used to."""
+
+import json
+import os
+
+import pytest
+
+from mtgjson5 import utils
+from mtgjson5.mtgjson_identifier_index import (
+    INDEXED_IDENTIFIERS,
+    MtgjsonIdentifierIndex,
+)
+from mtgjson5.providers.cardhoarder import CardHoarderProvider
+from mtgjson5.utils import generate_card_mapping
+
+ALL_PRINTINGS = {
+    "M10": {
+        "cards": [
+            {
+                "uuid": "m10-1",
+                "identifiers": {
+                    "mcmId": "100",
+                    "mtgoId": "1",
+                    "mtgoFoilId": "2",
+                    "tcgplayerProductId": "300",
+                },
+            },
+            {
+                "uuid": "m10-1b",
+                "identifiers": {"mcmId": "100", "cardKingdomId": "7"},
+            },
+            {"uuid": "m10-2"},
+        ],
+        "tokens": [
+            {
+                "uuid": "tm10-1",
+                "identifiers": {"cardsphereId": "9", "cardKingdomFoilId": "8"},
+            }
+        ],
+    },
+    "LEA": {
+        "cards": [
+            {
+                "uuid": "lea-1",
+                "identifiers": {
+                    "mtgoId": "2",
+                    "tcgplayerEtchedProductId": "301",
+                    "scryfallId": "abc",
+                },
+            }
+        ]
+    },
+}
+
+
+@pytest.fixture
+def all_printings_path(tmp_path):
+    """An AllPrintings file to index."""
+    path = tmp_path.joinpath("AllPrintings.json")
+    path.write_text(json.dumps({"meta": {}, "data": ALL_PRINTINGS}), "utf-8")
+    return path
+
+
+@pytest.fixture
+def identifier_index(tmp_path):
+    """An index kept apart from the shared cache."""
+    return MtgjsonIdentifierIndex.__wrapped__(tmp_path.joinpath("index.sqlite"))
+
+
+def test_mappings_match_generate_card_mapping(all_printings_path, identifier_index):
+    """Each identifier maps to the same cards, in the same order."""
+    for identifier in INDEXED_IDENTIFIERS:
+        expected = generate_card_mapping(
+            all_printings_path, ("identifiers", identifier), ("uuid",)
+        )
+        actual = identifier_index.get_mapping(all_printings_path, identifier)
+
+        assert list(actual.items()) == list(expected.items())
+
+    with pytest.raises(ValueError):
+        identifier_index.get_mapping(all_printings_path, "scryfallId")
+
+
+def test_mappings_of_some_ids(all_printings_path, identifier_index):
+    """Looking up some values maps them like the whole mapping does."""
+    full_mapping = identifier_index.get_mapping(all_printings_path, "mtgoId")
+    assert identifier_index.get_mapping(
+        all_printings_path, "mtgoId", ["2", "404", "2"]
+    ) == {"2": full_mapping["2"]}
+
+    # Values spanning several lookup batches keep the indexed order
+    third_party_ids = [str(number) for number in range(1200, 0, -1)]
+    assert list(
+        identifier_index.get_mapping(all_printings_path, "mtgoId", third_party_ids)
+    ) == list(full_mapping)
+    assert identifier_index.get_mapping(all_printings_path, "mcmId", []) == {}
+
+
+def test_all_printings_is_read_once(all_printings_path, identifier_index, mocker):
+    """Every mapping is served from one pass, until AllPrintings changes."""
+    load = mocker.spy(utils.json, "load")
+    for identifier in INDEXED_IDENTIFIERS:
+        identifier_index.get_mapping(all_printings_path, identifier)
+    assert load.call_count == 1
+
+    # A second index over the same file reuses what's on disk
+    MtgjsonIdentifierIndex.__wrapped__(identifier_index.index_path).get_mapping(
+        all_printings_path, "mcmId"
+    )
+    assert load.call_count == 1
+
+    ALL_PRINTINGS["M10"]["cards"][0]["identifiers"]["mcmId"] = "101"
+    try:
+        all_printings_path.write_text(
+            json.dumps({"meta": {}, "data": ALL_PRINTINGS}), "utf-8"
+        )
+    finally:
+        ALL_PRINTINGS["M10"]["cards"][0]["identifiers"]["mcmId"] = "100"
+    stat = all_printings_path.stat()
+    os.utime(all_printings_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+    assert identifier_index.get_mapping(all_printings_path, "mcmId") == {
+        "101": {"m10-1"},
+        "100": {"m10-1b"},
+    }
+    assert load.call_count == 2
+
+
+def test_mtgo_ids_are_combined(all_printings_path, identifier_index, mocker):
+    """Regular and foil MTGO IDs share one mapping, as CardHoarder needs."""
+    mocker.patch(
+        "mtgjson5.providers.cardhoarder.MtgjsonIdentifierIndex",
+        return_value=identifier_index,
+    )
+
+    assert CardHoarderProvider.__wrapped__.get_mtgo_to_mtgjson_map(
+        all_printings_path
+    ) == {
+        "1": {"m10-1"},
+        "2": {"m10-1", "lea-1"},
+    }
@@ -0,0 +1,88 @@
+"""Test the oracle-level memo shared between card printings."""
+
+import gevent
+
+from mtgjson5.mtgjson_oracle_cache import MtgjsonOracleCache
+
+
+def new_cache(max_entries=100, persist_path=None):
+    """Build a fresh cache, bypassing the singleton."""
+    cache = MtgjsonOracleCache.__wrapped__()
+    cache.max_entries = max_entries
+    cache.persist_path = persist_path
+    return cache
+
+
+def test_fetches_once_per_oracle_id():
+    """Repeated lookups are served from memory and counted."""
+    cache = new_cache()
+    calls = []
+
+    def fetcher():
+        calls.append(1)
+        return ["LEA", "M10"]
+
+    for _ in range(3):
+        assert cache.get_or_fetch("printings", "bolt", fetcher) == ["LEA", "M10"]
+
+    assert len(calls) == 1
+    assert cache.hits["printings"] == 2
+    assert cache.misses["printings"] == 1
+
+
+def test_failed_fetches_are_not_cached():
+    """A None result means the download failed, so the next lookup retries."""
+    cache = new_cache()
+    results = iter([None, ["LEA"]])
+
+    assert cache.get_or_fetch("printings", "bolt", lambda: next(results)) is None
+    assert cache.get_or_fetch("printings", "bolt", lambda: next(results)) == ["LEA"]
+    assert cache.misses["printings"] == 2
+
+
+def test_least_recently_used_entries_are_evicted():
+    """Memory is bounded by max_entries."""
+    cache = new_cache(max_entries=2)
+    cache.get_or_fetch("rulings", "a", lambda: [])
+    cache.get_or_fetch("rulings", "b", lambda: [])
+    cache.get_or_fetch("rulings", "a", lambda: [])
+    cache.get_or_fetch("rulings", "c", lambda: [])
+
+    cache.get_or_fetch("rulings", "a", lambda: None)
+    assert cache.get_or_fetch("rulings", "b", lambda: None) is None
+
+
+def test_concurrent_lookups_share_one_fetch():
+    """Greenlets asking for the same card wait for the first download."""
+    cache = new_cache()
+    calls = []
+
+    def fetcher():
+        calls.append(1)
+        gevent.sleep(0.01)
+        return [["2020-01-01", "A ruling"]]
+
+    greenlets = [
+        gevent.spawn(cache.get_or_fetch, "rulings", "bolt", fetcher) for _ in range(5)
+    ]
+    gevent.joinall(greenlets)
+
+    assert len(calls) == 1
+    assert all(greenlet.value == [["2020-01-01", "A ruling"]] for greenlet in greenlets)
+
+
+def test_persisted_between_runs(tmp_path):
+    """Entries saved by one run are reused by the next."""
+    persist_path = tmp_path.joinpath("oracle_cache.json")
+    first_run = new_cache(persist_path=persist_path)
+    first_run.get_or_fetch("printings", "bolt", lambda: ["LEA"])
+    first_run.save()
+
+    second_run = new_cache(persist_path=persist_path)
+    second_run.load()
+    assert second_run.get_or_fetch("printings", "bolt", lambda: None) == ["LEA"]
+
+    third_run = new_cache(persist_path=persist_path)
+    third_run.max_age_hours = -1
+    third_run.load()
+    assert third_run.get_or_fetch("printings", "bolt", lambda: None) is None
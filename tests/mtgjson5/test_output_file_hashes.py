@@ -0,0 +1,58 @@
+"""Test that output files are hashed, reusing hashes that are up to date."""
+
+import hashlib
+import os
+import time
+
+from mtgjson5.output_generator import generate_output_file_hashes
+from mtgjson5.utils import get_file_hash
+
+
+def read_hash(output_path, file_name):
+    """Read the hash written for an output file."""
+    return output_path.joinpath(f"{file_name}.sha256").read_text("utf-8")
+
+
+def test_every_file_is_hashed(tmp_path):
+    """Files in every directory are hashed, even empty ones."""
+    tmp_path.joinpath("decks").mkdir()
+    contents = {
+        "AllPrintings.json": b"{}" * 100_000,
+        "AllPrintings.json.gz": os.urandom(1000),
+        "decks/Deck_M10.json": b"{}",
+        "Empty.json": b"",
+    }
+    for file_name, file_contents in contents.items():
+        tmp_path.joinpath(file_name).write_bytes(file_contents)
+
+    generate_output_file_hashes(tmp_path)
+
+    for file_name, file_contents in contents.items():
+        assert read_hash(tmp_path, file_name) == (
+            hashlib.sha256(file_contents).hexdigest()
+        )
+    assert not tmp_path.joinpath("AllPrintings.json.sha256.sha256").exists()
+
+
+def test_hashes_are_reused_until_the_file_changes(tmp_path):
+    """A hash written after the file is trusted, but not one written before."""
+    output_file = tmp_path.joinpath("M10.json")
+    output_file.write_text("{}", encoding="utf-8")
+    tmp_path.joinpath("M10.json.sha256").write_text("written inline", "utf-8")
+
+    generate_output_file_hashes(tmp_path)
+    assert read_hash(tmp_path, "M10.json") == "written inline"
+
+    os.utime(output_file, ns=(time.time_ns() + 10**9,) * 2)
+    generate_output_file_hashes(tmp_path)
+    assert read_hash(tmp_path, "M10.json") == hashlib.sha256(b"{}").hexdigest()
+
+
+def test_hash_spanning_blocks(tmp_path):
+    """Hashing in blocks gives the same hash as hashing all at once."""
+    output_file = tmp_path.joinpath("AllPrices.json")
+    output_file.write_bytes(os.urandom(100_000))
+
+    assert get_file_hash(output_file, block_size=4096) == (
+        hashlib.sha256(output_file.read_bytes()).hexdigest()
+    )
@@ -0,0 +1,59 @@
+"""Test that pooled sessions are shared and keep their connections alive."""
+
+import http.server
+import threading
+
+import pytest
+
+from mtgjson5 import utils
+
+
+class KeepAliveHandler(http.server.BaseHTTPRequestHandler):
+    """Minimal HTTP/1.1 handler that leaves connections open."""
+
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):  # pylint: disable=invalid-name
+        """Reply with a small JSON body."""
+        body = b'{"object": "list"}'
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):  # pylint: disable=arguments-differ
+        """Keep test output quiet."""
+
+
+@pytest.fixture
+def local_server():
+    """Serve on a random local port for the duration of a test."""
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), KeepAliveHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}/"
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture(autouse=True)
+def clean_sessions(monkeypatch):
+    """Keep sessions created by a test from leaking into the next."""
+    monkeypatch.setattr(utils, "POOLED_SESSIONS", {})
+
+
+def test_same_name_shares_a_session():
+    """Each provider gets one session for the whole run."""
+    assert utils.get_pooled_session("A") is utils.get_pooled_session("A")
+    assert utils.get_pooled_session("A") is not utils.get_pooled_session("B")
+
+
+def test_connections_are_reused(local_server):
+    """Sequential downloads should ride on a single kept-alive connection."""
+    for _ in range(5):
+        assert utils.get_pooled_session("Provider").get(local_server).ok
+
+    assert utils.get_session_statistics() == {
+        "Provider": {"requests": 5, "connections": 1, "reused": 4}
+    }
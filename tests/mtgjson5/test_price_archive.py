@@ -0,0 +1,350 @@
+"""Test that the partitioned price archive keeps what the single archive file kept."""
+
+import configparser
+import copy
+import datetime
+import json
+import lzma
+import tracemalloc
+
+import boto3
+import mergedeep
+import moto
+import pytest
+
+from mtgjson5 import constants, price_builder
+from mtgjson5.mtgjson_config import MtgjsonConfig
+from mtgjson5.mtgjson_price_archive import MtgjsonPriceArchive
+from mtgjson5.mtgjson_s3_handler import MtgjsonS3Handler
+from mtgjson5.output_generator import generate_compiled_prices_output, write_to_file
+
+BUCKET_NAME = "mtgjson-prices"
+ARCHIVE_OBJECT_PATH = "price_archive/AllPrices.json.xz"
+
+
+def days_ago(days):
+    """A date relative to today."""
+    return (datetime.date.today() - datetime.timedelta(days=days)).isoformat()
+
+
+TODAY = days_ago(0)
+YESTERDAY = days_ago(1)
+EXPIRED = days_ago(200)
+
+ARCHIVE_PRICES = {
+    "uuid-1": {
+        "paper": {
+            "cardkingdom": {
+                "buylist": {"normal": {EXPIRED: 0.5, YESTERDAY: 0.75}},
+                "retail": {"normal": {YESTERDAY: 1.5}, "foil": {YESTERDAY: 3.0}},
+                "currency": "USD",
+            }
+        }
+    },
+    "uuid-2": {
+        "mtgo": {
+            "cardhoarder": {
+                "retail": {"normal": {EXPIRED: 0.02, YESTERDAY: 0.03}},
+                "currency": "USD",
+            }
+        }
+    },
+}
+
+TODAY_PRICES = {
+    "uuid-1": {
+        "paper": {
+            "cardkingdom": {
+                "retail": {"normal": {TODAY: 1.25}, "foil": {}},
+                "currency": "USD",
+            },
+            "cardmarket": {
+                "retail": {"normal": {}, "foil": {TODAY: 2.5}},
+                "currency": "EUR",
+            },
+        }
+    },
+    "uuid-3": {
+        "paper": {
+            "tcgplayer": {
+                "buylist": {"normal": {TODAY: 4.0}, "foil": {}},
+                "currency": "USD",
+            }
+        }
+    },
+}
+
+
+def prune_recursive(obj, prune_date, depth=0):
+    """Prune dates, and the fields they leave empty, the way the single file was."""
+    for key, value in list(obj.items()):
+        if depth == 5:
+            if key < prune_date:
+                del obj[key]
+        elif isinstance(value, dict):
+            prune_recursive(value, prune_date, depth + 1)
+            if not value:
+                del obj[key]
+
+
+def build_legacy_archive():
+    """Merge and prune the archive the way the single archive file was."""
+    archive_prices = copy.deepcopy(ARCHIVE_PRICES)
+    mergedeep.merge(archive_prices, copy.deepcopy(TODAY_PRICES))
+    prune_recursive(archive_prices, price_builder.get_prune_date())
+    return archive_prices
+
+
+@pytest.fixture
+def archive(tmp_path):
+    """An empty archive."""
+    return MtgjsonPriceArchive(tmp_path.joinpath("price_archive"))
+
+
+def test_archive_matches_merging_and_pruning(archive):
+    """Partitions hold the prices the merged and pruned file did."""
+    assert archive.add_prices(ARCHIVE_PRICES) == [EXPIRED, YESTERDAY]
+    assert archive.add_prices(TODAY_PRICES) == [TODAY]
+    assert archive.prune(price_builder.get_prune_date()) == [EXPIRED]
+
+    assert archive.get_dates() == [YESTERDAY, TODAY]
+    assert dict(archive.iterate_card_prices()) == build_legacy_archive()
+    assert [uuid for uuid, _ in archive.iterate_card_prices()] == [
+        "uuid-1",
+        "uuid-2",
+        "uuid-3",
+    ]
+
+
+def test_only_changed_partitions_are_written(archive):
+    """Adding today's prices leaves the other days alone."""
+    archive.add_prices(ARCHIVE_PRICES)
+    yesterday_partition = archive.get_partition_path(YESTERDAY).read_bytes()
+
+    archive.add_prices(TODAY_PRICES)
+    assert archive.get_partition_path(YESTERDAY).read_bytes() == yesterday_partition
+
+    # Prices added again for a day only replace the prices they have
+    archive.add_prices(
+        {
+            "uuid-1": {
+                "paper": {
+                    "cardkingdom": {
+                        "retail": {"foil": {YESTERDAY: 3.5}},
+                        "currency": "USD",
+                    }
+                }
+            }
+        }
+    )
+    card_prices = dict(archive.iterate_card_prices())["uuid-1"]["paper"]
+    assert card_prices["cardkingdom"]["retail"] == {
+        "normal": {YESTERDAY: 1.5, TODAY: 1.25},
+        "foil": {YESTERDAY: 3.5},
+    }
+
+
+def test_retention_window(archive, monkeypatch):
+    """Pruning drops whole dates, as far back as configured."""
+    archive.add_prices(ARCHIVE_PRICES)
+    archive.add_prices(TODAY_PRICES)
+
+    for value, months in [(None, 3), ("12", 12), ("1", 1)]:
+        monkeypatch.setattr(
+            MtgjsonConfig(),
+            "get",
+            lambda section, option, fallback="": value or fallback,
+        )
+        assert price_builder.get_price_retention_months() == months
+        assert price_builder.get_prune_date() == price_builder.get_prune_date(months)
+
+    # A year keeps everything, a month drops the expired date
+    assert archive.prune(price_builder.get_prune_date(12)) == []
+    assert archive.prune(price_builder.get_prune_date(1)) == [EXPIRED]
+    assert archive.get_dates() == [YESTERDAY, TODAY]
+    assert archive.prune(price_builder.get_prune_date(1)) == []
+
+
+@pytest.fixture
+def prices_bucket(tmp_path, monkeypatch):
+    """A bucket holding the single file archive, and a build configured to use it."""
+    monkeypatch.setenv("AWS_ACCESS_KEY_ID", "testing")
+    monkeypatch.setenv("AWS_SECRET_ACCESS_KEY", "testing")
+    monkeypatch.setenv("AWS_DEFAULT_REGION", "us-east-1")
+    monkeypatch.setattr(constants, "CACHE_PATH", tmp_path.joinpath("cache"))
+    monkeypatch.setattr(MtgjsonConfig(), "output_path", tmp_path.joinpath("output"))
+    MtgjsonConfig().output_path.mkdir()
+    MtgjsonConfig().output_path.joinpath("AllPrintings.json").write_text("{}")
+
+    config_parser = configparser.ConfigParser()
+    config_parser.read_dict(
+        {
+            "Prices": {
+                "bucket_name": BUCKET_NAME,
+                "bucket_object_path": ARCHIVE_OBJECT_PATH,
+            }
+        }
+    )
+    monkeypatch.setattr(MtgjsonConfig(), "config_parser", config_parser)
+    monkeypatch.setattr(
+        price_builder, "build_today_prices", lambda: copy.deepcopy(TODAY_PRICES)
+    )
+
+    with moto.mock_aws():
+        s3_client = boto3.client("s3")
+        s3_client.create_bucket(Bucket=BUCKET_NAME)
+        s3_client.put_object(
+            Bucket=BUCKET_NAME,
+            Key=ARCHIVE_OBJECT_PATH,
+            Body=lzma.compress(json.dumps(ARCHIVE_PRICES).encode()),
+        )
+        yield s3_client
+
+
+def test_build_prices_syncs_partitions(prices_bucket, mocker):
+    """The single file is split once, then only changed partitions move."""
+    archive_prices, today_prices = price_builder.build_prices()
+    archive_prices = dict(archive_prices)
+    assert archive_prices == build_legacy_archive()
+    assert today_prices == TODAY_PRICES
+
+    def list_partitions():
+        return sorted(
+            bucket_object["Key"]
+            for bucket_object in prices_bucket.list_objects_v2(
+                Bucket=BUCKET_NAME, Prefix=f"{ARCHIVE_OBJECT_PATH}.partitions/"
+            )["Contents"]
+        )
+
+    assert list_partitions() == [
+        f"{ARCHIVE_OBJECT_PATH}.partitions/{YESTERDAY}.sqlite.xz",
+        f"{ARCHIVE_OBJECT_PATH}.partitions/{TODAY}.sqlite.xz",
+    ]
+
+    # Another build only uploads today's partition, and downloads nothing
+    download_file = mocker.spy(MtgjsonS3Handler, "download_file")
+    upload_file = mocker.spy(MtgjsonS3Handler, "upload_file")
+    assert dict(price_builder.build_prices()[0]) == archive_prices
+    assert download_file.call_count == 0
+    assert [call.args[3] for call in upload_file.call_args_list] == [
+        f"{ARCHIVE_OBJECT_PATH}.partitions/{TODAY}.sqlite.xz"
+    ]
+
+    # A new machine builds the same archive from the partitions
+    for path in constants.CACHE_PATH.joinpath("price_archive").iterdir():
+        path.unlink()
+    assert dict(price_builder.build_prices()[0]) == archive_prices
+    assert download_file.call_count == 2
+
+
+def test_build_prices_aborts_on_bucket_errors(prices_bucket, mocker):
+    """A bucket that can't be read fully stops the build, instead of losing days."""
+    price_builder.build_prices()
+    for path in constants.CACHE_PATH.joinpath("price_archive").iterdir():
+        path.unlink()
+    get_price_archive_data = mocker.spy(price_builder, "get_price_archive_data")
+
+    # Failing to list partitions mustn't look like there are none yet
+    mocker.patch.object(MtgjsonS3Handler, "list_objects", return_value=None)
+    with pytest.raises(RuntimeError):
+        price_builder.build_prices()
+    assert get_price_archive_data.call_count == 0
+    mocker.stopall()
+
+    # Nor may a partition that failed to download be left out
+    mocker.patch.object(MtgjsonS3Handler, "download_file", return_value=False)
+    upload_file = mocker.spy(MtgjsonS3Handler, "upload_file")
+    with pytest.raises(RuntimeError, match=YESTERDAY):
+        price_builder.build_prices()
+    assert upload_file.call_count == 0
+
+
+def test_build_prices_without_a_bucket(prices_bucket, mocker):
+    """Blank bucket settings, as in the example config, only build today's prices."""
+    MtgjsonConfig().config_parser.read_dict(
+        {"Prices": {"bucket_name": "", "bucket_object_path": ""}}
+    )
+    download_price_archive = mocker.spy(price_builder, "download_price_archive")
+
+    archive_prices, today_prices = price_builder.build_prices()
+    assert dict(archive_prices) == TODAY_PRICES
+    assert today_prices == TODAY_PRICES
+    assert download_price_archive.call_count == 0
+
+    # A bucket that boto3 won't accept is logged like any other failure
+    s3_handler = MtgjsonS3Handler()
+    assert s3_handler.list_objects("", ARCHIVE_OBJECT_PATH) is None
+    assert not s3_handler.download_file(
+        "", ARCHIVE_OBJECT_PATH, str(constants.CACHE_PATH.joinpath("archive"))
+    )
+    assert not s3_handler.upload_file(
+        str(MtgjsonConfig().output_path.joinpath("AllPrintings.json")),
+        "",
+        ARCHIVE_OBJECT_PATH,
+    )
+
+
+@pytest.mark.parametrize("pretty_print", [False, True], ids=["minimal", "pretty"])
+def test_streamed_prices_match_dumped_prices(archive, tmp_path, pretty_print, mocker):
+    """AllPrices streamed from the archive is what dumping its contents wrote."""
+    mocker.patch.object(MtgjsonConfig(), "output_path", tmp_path)
+    mocker.patch.object(MtgjsonConfig(), "inline_compression", True)
+    archive.add_prices(ARCHIVE_PRICES)
+    archive.add_prices(TODAY_PRICES)
+
+    write_to_file(
+        "DumpedPrices",
+        dict(archive.iterate_card_prices()),
+        pretty_print,
+        sort_keys=False,
+    )
+    write_to_file("DumpedPricesToday", TODAY_PRICES, pretty_print, sort_keys=False)
+    generate_compiled_prices_output(
+        archive.iterate_card_prices(), TODAY_PRICES, pretty_print
+    )
+
+    for streamed, dumped in [
+        ("AllPrices", "DumpedPrices"),
+        ("AllPricesToday", "DumpedPricesToday"),
+    ]:
+        output = tmp_path.joinpath(f"{streamed}.json").read_bytes()
+        assert output == tmp_path.joinpath(f"{dumped}.json").read_bytes()
+        assert (
+            lzma.decompress(tmp_path.joinpath(f"{streamed}.json.xz").read_bytes())
+            == output
+        )
+
+
+def test_streamed_prices_memory(archive, tmp_path, mocker):
+    """Writing AllPrices holds a card at a time, not the whole archive."""
+    mocker.patch.object(MtgjsonConfig(), "output_path", tmp_path)
+    for days in range(30):
+        date = days_ago(days)
+        archive.add_prices(
+            {
+                f"uuid-{index:05}": {
+                    "paper": {
+                        "cardkingdom": {
+                            "retail": {"normal": {date: index / 100}},
+                            "currency": "USD",
+                        }
+                    }
+                }
+                for index in range(2000)
+            }
+        )
+
+    tracemalloc.start()
+    try:
+        generate_compiled_prices_output(archive.iterate_card_prices(), {}, False)
+        streamed_peak = tracemalloc.get_traced_memory()[1]
+
+        tracemalloc.reset_peak()
+        tracemalloc.clear_traces()
+        archive_prices = dict(archive.iterate_card_prices())
+        materialized = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+
+    assert len(archive_prices) == 2000
+    assert streamed_peak < materialized / 5
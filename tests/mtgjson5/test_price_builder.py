@@ -0,0 +1,148 @@
+"""Test that price providers are fetched together and merged in a fixed order."""
+
+import json
+
+import gevent
+import mergedeep
+import pytest
+
+from mtgjson5 import price_builder
+from mtgjson5.classes import MtgjsonPricesAccumulator, MtgjsonPricesObject
+from mtgjson5.mtgjson_config import MtgjsonConfig
+
+
+def build_provider(name, delay, prices=None, error=None, events=None):
+    """A price provider that takes a while to download its prices."""
+
+    class FakeProvider:
+        """Fake price provider."""
+
+        def generate_today_price_dict(self, all_printings_path):
+            """Wait on a download, then return the prices."""
+            assert all_printings_path.name == "AllPrintings.json"
+            if events is not None:
+                events.append(f"start {name}")
+            gevent.sleep(delay)
+            if events is not None:
+                events.append(f"finish {name}")
+            if error:
+                raise error
+            return prices or {}
+
+    FakeProvider.__name__ = name
+    return FakeProvider
+
+
+def build_prices(source, price):
+    """One day of paper prices from a source."""
+    prices = MtgjsonPricesObject("paper", source, "2024-01-01", "USD")
+    prices.sell_normal = price
+    return prices
+
+
+@pytest.fixture(autouse=True)
+def output_path(tmp_path, monkeypatch):
+    """A build output with AllPrintings, and a short provider timeout."""
+    tmp_path.joinpath("AllPrintings.json").write_text("{}", encoding="utf-8")
+    monkeypatch.setattr(MtgjsonConfig(), "output_path", tmp_path)
+    monkeypatch.setattr(price_builder, "get_price_provider_timeout", lambda: 0.5)
+
+
+def test_providers_are_fetched_concurrently(monkeypatch):
+    """Providers overlap, and are merged in order whichever finishes first."""
+    events = []
+    monkeypatch.setattr(
+        price_builder,
+        "PRICE_PROVIDERS",
+        (
+            build_provider(
+                "Slow", 0.2, {"uuid-1": build_prices("slow", 1.0)}, events=events
+            ),
+            build_provider(
+                "Fast", 0.1, {"uuid-1": build_prices("fast", 2.0)}, events=events
+            ),
+            build_provider(
+                "Other", 0.2, {"uuid-2": build_prices("slow", 3.0)}, events=events
+            ),
+        ),
+    )
+
+    today_prices = price_builder.build_today_prices()
+
+    # Every provider started before any of them finished
+    assert events[:3] == ["start Slow", "start Fast", "start Other"]
+    assert events[3] == "finish Fast"
+
+    assert list(today_prices) == ["uuid-1", "uuid-2"]
+    assert list(today_prices["uuid-1"]["paper"]) == ["slow", "fast"]
+    assert today_prices["uuid-2"]["paper"]["slow"]["retail"]["normal"] == {
+        "2024-01-01": 3.0
+    }
+
+
+def test_failing_providers_are_isolated(monkeypatch):
+    """A provider that fails or hangs doesn't hold back the others."""
+    events = []
+    monkeypatch.setattr(
+        price_builder,
+        "PRICE_PROVIDERS",
+        (
+            build_provider("Broken", 0, error=ValueError("Bad response")),
+            build_provider(
+                "Hanging", 10, {"uuid-1": build_prices("hanging", 1.0)}, events=events
+            ),
+            build_provider("Working", 0, {"uuid-2": build_prices("working", 2.0)}),
+        ),
+    )
+
+    today_prices = price_builder.build_today_prices()
+
+    # The hanging provider was abandoned, not waited on
+    assert events == ["start Hanging"]
+    assert list(today_prices) == ["uuid-2"]
+
+
+def test_timeout_config(monkeypatch):
+    """Missing or invalid timeouts use the default, and zero disables the limit."""
+    monkeypatch.undo()
+    for value, expected in [(None, 3600), ("90", 90), ("0", None), ("soon", 3600)]:
+        monkeypatch.setattr(
+            MtgjsonConfig(),
+            "get",
+            lambda section, option, fallback="": value or fallback,
+        )
+        assert price_builder.get_price_provider_timeout() == expected
+
+
+def test_accumulator_matches_merging_serialized_prices():
+    """Accumulating typed prices must output what deep merging their JSON did."""
+    card_kingdom = MtgjsonPricesObject("paper", "cardkingdom", "2024-01-01", "USD")
+    card_kingdom.buy_foil = 1.5
+    card_kingdom.sell_normal = 2.0
+    card_kingdom.sell_foil = 4.0
+    card_hoarder = MtgjsonPricesObject("mtgo", "cardhoarder", "2024-01-01", "USD")
+    card_hoarder.sell_normal = 0.02
+    card_market = MtgjsonPricesObject("paper", "cardmarket", "2024-01-01", "EUR")
+    card_market.sell_foil = 3.0
+    empty = MtgjsonPricesObject("paper", "cardsphere", "2024-01-01", "USD")
+    providers = [
+        {"uuid-1": card_kingdom, "uuid-2": card_kingdom},
+        {"uuid-3": card_hoarder, "uuid-1": card_hoarder},
+        {"uuid-1": card_market, "uuid-4": empty},
+    ]
+
+    expected = {}
+    mergedeep.merge(
+        expected,
+        *(
+            json.loads(json.dumps(prices, default=lambda o: o.to_json()))
+            for prices in providers
+        ),
+    )
+
+    accumulator = MtgjsonPricesAccumulator()
+    for prices in providers:
+        accumulator.add_all(prices)
+
+    assert json.dumps(accumulator.to_json()) == json.dumps(expected)
+    assert len(accumulator) == 4
@@ -0,0 +1,59 @@
+"""Test that resource files are loaded once and indexed the way they were scanned."""
+
+import json
+
+from mtgjson5 import constants
+from mtgjson5.classes import MtgjsonCardObject
+from mtgjson5.mtgjson_resources import MtgjsonResources
+
+
+def test_resources_are_loaded_once(mocker):
+    """Every lookup after the first reuses the parsed file."""
+    resources = MtgjsonResources.__wrapped__()
+    load = mocker.spy(json, "load")
+
+    first = resources.get("base_set_sizes")
+    for set_code in ["M10", "LEA", "10E"]:
+        resources.get_set_watermark(set_code, "Lightning Bolt")
+    assert resources.get("base_set_sizes") is first
+
+    assert load.call_count == 2
+
+
+def test_set_watermarks_match_scanning_the_file():
+    """The index finds the watermark the first matching entry of a set has."""
+    with constants.RESOURCE_PATH.joinpath("set_code_watermarks.json").open(
+        encoding="utf-8"
+    ) as file:
+        watermarks = json.load(file)
+
+    resources = MtgjsonResources.__wrapped__()
+    for set_code, cards in watermarks.items():
+        for card in cards:
+            for face_name in card["name"].split(" // "):
+                expected = next(
+                    str(entry["watermark"])
+                    for entry in cards
+                    if face_name in entry["name"].split(" // ")
+                )
+                assert (
+                    resources.get_set_watermark(set_code.lower(), face_name) == expected
+                )
+
+    assert resources.get_set_watermark("PTHS", "Not A Card") is None
+
+
+def test_card_set_watermark():
+    """Cards only replace "set" watermarks, and keep them if none is found."""
+    card = MtgjsonCardObject()
+    card.set_code = "PTHS"
+    card.name = "Celestial Archon"
+    card.set_watermark("set")
+    assert card.watermark == "set (THS)"
+
+    card.name = "Not A Card"
+    card.set_watermark("set")
+    assert card.watermark == "set"
+
+    card.set_watermark("selesnya")
+    assert card.watermark == "selesnya"
@@ -0,0 +1,89 @@
+"""Test uploading the build output against a local stand-in for S3."""
+
+import hashlib
+
+import boto3
+import moto
+import pytest
+
+from mtgjson5.mtgjson_s3_handler import MtgjsonS3Handler
+from mtgjson5.output_generator import generate_output_file_hashes
+
+BUCKET_NAME = "mtgjson-test"
+
+
+@pytest.fixture
+def s3_handler(monkeypatch):
+    """A handler talking to an empty mocked bucket."""
+    monkeypatch.setenv("AWS_ACCESS_KEY_ID", "testing")
+    monkeypatch.setenv("AWS_SECRET_ACCESS_KEY", "testing")
+    monkeypatch.setenv("AWS_DEFAULT_REGION", "us-east-1")
+    with moto.mock_aws():
+        handler = MtgjsonS3Handler()
+        handler.s3_client.create_bucket(Bucket=BUCKET_NAME)
+        yield handler
+
+
+@pytest.fixture
+def output_path(tmp_path):
+    """A build output with a few hashed files."""
+    output_path = tmp_path.joinpath("mtgjson_build_5.2.2")
+    output_path.joinpath("decks").mkdir(parents=True)
+    output_path.joinpath("M10.json").write_text('{"data": "M10"}', encoding="utf-8")
+    output_path.joinpath("decks", "Deck.json").write_text("{}", encoding="utf-8")
+    generate_output_file_hashes(output_path)
+    return output_path
+
+
+def test_upload_directory(s3_handler, output_path, mocker):
+    """Only files that changed since the last upload are uploaded again."""
+    upload_file = mocker.spy(s3_handler, "upload_file")
+    s3_handler.upload_directory(output_path, BUCKET_NAME, {"Prunable": "true"})
+    assert upload_file.call_count == 4
+
+    uploaded_object = s3_handler.s3_client.get_object(
+        Bucket=BUCKET_NAME, Key="mtgjson_build_5.2.2/decks/Deck.json"
+    )
+    assert uploaded_object["Body"].read() == b"{}"
+    assert uploaded_object["Metadata"] == {"sha256": hashlib.sha256(b"{}").hexdigest()}
+    assert s3_handler.s3_client.get_object_tagging(
+        Bucket=BUCKET_NAME, Key="mtgjson_build_5.2.2/decks/Deck.json"
+    )["TagSet"] == [{"Key": "Prunable", "Value": "true"}]
+
+    upload_file.reset_mock()
+    output_path.joinpath("M10.json").write_text('{"data": "NEW"}', encoding="utf-8")
+    generate_output_file_hashes(output_path)
+    s3_handler.upload_directory(output_path, BUCKET_NAME)
+
+    assert sorted(call.args[2] for call in upload_file.call_args_list) == [
+        "mtgjson_build_5.2.2/M10.json",
+        "mtgjson_build_5.2.2/M10.json.sha256",
+    ]
+
+
+def test_objects_without_hashes_match_by_etag(s3_handler, output_path, mocker):
+    """Objects uploaded before hashes were stored aren't uploaded again."""
+    s3_handler.s3_client.put_object(
+        Bucket=BUCKET_NAME,
+        Key="mtgjson_build_5.2.2/M10.json",
+        Body=output_path.joinpath("M10.json").read_bytes(),
+    )
+    upload_file = mocker.spy(s3_handler, "upload_file")
+
+    assert (
+        s3_handler.upload_changed_file(
+            output_path.joinpath("M10.json"),
+            BUCKET_NAME,
+            "mtgjson_build_5.2.2/M10.json",
+        )
+        == "unchanged"
+    )
+    assert (
+        s3_handler.upload_changed_file(
+            output_path.joinpath("decks", "Deck.json"),
+            BUCKET_NAME,
+            "mtgjson_build_5.2.2/M10.json",
+        )
+        == "uploaded"
+    )
+    assert upload_file.call_count == 1
@@ -0,0 +1,239 @@
+"""Test and benchmark the set builder's card linking passes."""
+
+import json
+import random
+
+from mtgjson5 import constants
+from mtgjson5.classes import MtgjsonCardObject, MtgjsonSetObject
+from mtgjson5.set_builder import (
+    CardLinkingIndex,
+    add_meld_face_parts,
+    add_other_face_ids,
+    add_rebalanced_to_original_linkage,
+    add_variations_and_alternative_fields,
+    link_same_card_different_details,
+)
+
+
+def build_synthetic_set(card_count, seed=0):
+    """Build a set with plenty of reprints, variants, faces and basics."""
+    rng = random.Random(seed)
+    base_names = [f"Card {index}" for index in range(card_count // 4)] + sorted(
+        constants.BASIC_LAND_NAMES
+    )
+
+    mtgjson_set = MtgjsonSetObject()
+    mtgjson_set.code = "SYN"
+    mtgjson_set.cards = []
+    for index in range(card_count):
+        card = MtgjsonCardObject()
+        card.name = rng.choice(base_names)
+        if rng.random() < 0.1:
+            card.name += f" ({rng.choice(['Showcase', 'Borderless'])})"
+        if rng.random() < 0.1:
+            card.face_name = rng.choice(["Front", "Back"])
+            card.side = "a" if card.face_name == "Front" else "b"
+        card.uuid = f"uuid-{index}"
+        card.number = "" if rng.random() < 0.05 else str(rng.randint(1, card_count))
+        card.border_color = rng.choice(["black", "borderless"])
+        card.frame_version = rng.choice(["2015", "1997"])
+        card.frame_effects = rng.choice([[], ["showcase"], ["extendedart"]])
+        card.finishes = ["nonfoil", "foil"]
+        card.set_code = rng.choice(["SYN", "UNH"])
+        mtgjson_set.cards.append(card)
+
+    return mtgjson_set
+
+
+def build_synthetic_multi_face_set(card_count, seed=0):
+    """Build a set of split, meld, rebalanced and foil-only printings."""
+    rng = random.Random(seed)
+
+    mtgjson_set = MtgjsonSetObject()
+    mtgjson_set.code = "SYN"
+    mtgjson_set.cards = []
+    for index in range(card_count // 3):
+        layout = rng.choice(["split", "meld", "normal"])
+        names = [f"Face {index} A", f"Face {index} B", f"Face {index} C"]
+        number = "" if rng.random() < 0.05 else str(index)
+        illustration_id = f"art-{rng.randint(0, card_count // 4)}"
+        for side, face_name, suffix in zip("abc", names, ["", "a", "b"]):
+            card = MtgjsonCardObject()
+            card.layout = layout
+            card.name = " // ".join(names) if layout != "normal" else face_name
+            card.face_name = face_name if layout != "normal" else None
+            card.set_names(names if layout != "normal" else None)
+            card.side = side if layout != "normal" else None
+            card.number = number + (suffix if layout == "meld" else "")
+            card.uuid = f"uuid-{index}-{side}"
+            card.finishes = rng.choice([["nonfoil"], ["foil"]])
+            card.identifiers.scryfall_illustration_id = illustration_id
+            if rng.random() < 0.05:
+                card.name = f"A-{card.name}"
+                card.is_rebalanced = True
+            mtgjson_set.cards.append(card)
+
+    return mtgjson_set
+
+
+def legacy_add_variations_and_alternative_fields(mtgjson_set):
+    """The original all-pairs implementation, kept as a reference."""
+    distinct_card_printings_found = set()
+    for this_card in mtgjson_set.cards:
+        variations = [
+            item.uuid
+            for item in mtgjson_set.cards
+            if item.name.split(" (")[0] == this_card.name.split(" (")[0]
+            and item.face_name == this_card.face_name
+            and item.uuid != this_card.uuid
+            and (item.number != this_card.number if item.number else True)
+        ]
+
+        if variations:
+            this_card.variations = variations
+
+        if not variations or this_card.name in constants.BASIC_LAND_NAMES:
+            continue
+
+        distinct_card_printing = (
+            f"{this_card.name}|{this_card.border_color}|{this_card.frame_version}|"
+            f"{','.join(this_card.frame_effects)}|{this_card.side}"
+        )
+        if this_card.set_code in {"UNH", "10E"}:
+            distinct_card_printing += f"|{','.join(this_card.finishes)}"
+
+        if distinct_card_printing in distinct_card_printings_found:
+            this_card.is_alternative = True
+        else:
+            distinct_card_printings_found.add(distinct_card_printing)
+
+
+def legacy_add_other_face_ids(cards_to_act_on):
+    """The original all-pairs implementation, kept as a reference."""
+    for this_card in cards_to_act_on:
+        if this_card.get_names():
+            this_card.other_face_ids = []
+            for other_card in cards_to_act_on:
+                if other_card.face_name not in this_card.get_names():
+                    continue
+                if other_card.uuid == this_card.uuid:
+                    continue
+                if this_card.layout == "meld":
+                    if this_card.side != other_card.side:
+                        this_card.other_face_ids.append(other_card.uuid)
+                elif other_card.number:
+                    if other_card.number == this_card.number:
+                        this_card.other_face_ids.append(other_card.uuid)
+                else:
+                    this_card.other_face_ids.append(other_card.uuid)
+
+
+def legacy_add_meld_face_parts(mtgjson_set):
+    """The original all-pairs implementation, kept as a reference."""
+    for first_card in mtgjson_set.cards:
+        if first_card.layout != "meld":
+            continue
+
+        card_face_parts = [None, None, None]
+        for other_card in [first_card] + mtgjson_set.cards:
+            if other_card is not first_card and (
+                other_card.layout != "meld"
+                or first_card == other_card
+                or other_card.face_name not in first_card.get_names()
+            ):
+                continue
+            if "a" in other_card.number:
+                card_face_parts[1] = other_card.face_name
+            elif "b" in other_card.number:
+                card_face_parts[2] = other_card.face_name
+            else:
+                card_face_parts[0] = other_card.face_name
+
+        if all(card_face_parts):
+            first_card.card_parts = card_face_parts
+
+
+def legacy_link_same_card_different_details(mtgjson_set):
+    """The original implementation, kept as a reference."""
+    cards_seen = {}
+    for mtgjson_card in mtgjson_set.cards:
+        illustration_id = mtgjson_card.identifiers.scryfall_illustration_id
+        if illustration_id not in cards_seen:
+            cards_seen[illustration_id] = mtgjson_card
+            continue
+
+        other_mtgjson_card = cards_seen[illustration_id]
+        if "nonfoil" in mtgjson_card.finishes:
+            other_mtgjson_card.identifiers.mtgjson_non_foil_version_id = (
+                mtgjson_card.uuid
+            )
+            mtgjson_card.identifiers.mtgjson_foil_version_id = other_mtgjson_card.uuid
+        else:
+            other_mtgjson_card.identifiers.mtgjson_foil_version_id = mtgjson_card.uuid
+            mtgjson_card.identifiers.mtgjson_non_foil_version_id = (
+                other_mtgjson_card.uuid
+            )
+
+
+def legacy_add_rebalanced_to_original_linkage(mtgjson_set):
+    """The original all-pairs implementation, kept as a reference."""
+    for card in mtgjson_set.cards:
+        if getattr(card, "is_rebalanced", False):
+            original_card_name_to_find = card.name.replace("A-", "")
+            original_card_uuids = []
+            for inner_card in mtgjson_set.cards:
+                if inner_card.name == original_card_name_to_find:
+                    original_card_uuids.append(inner_card.uuid)
+                    if not hasattr(inner_card, "rebalanced_printings"):
+                        inner_card.rebalanced_printings = []
+                    inner_card.rebalanced_printings.append(card.uuid)
+            card.original_printings = original_card_uuids
+
+
+def run_linking_passes(mtgjson_set):
+    """Run the linking passes in the order the set builder does."""
+    add_rebalanced_to_original_linkage(mtgjson_set)
+    card_index = CardLinkingIndex(mtgjson_set.cards)
+    link_same_card_different_details(mtgjson_set, card_index)
+    add_meld_face_parts(mtgjson_set, card_index)
+    add_other_face_ids(mtgjson_set.cards, card_index)
+
+
+def run_legacy_linking_passes(mtgjson_set):
+    """Run the reference linking passes in the order the set builder does."""
+    legacy_add_rebalanced_to_original_linkage(mtgjson_set)
+    legacy_link_same_card_different_details(mtgjson_set)
+    legacy_add_meld_face_parts(mtgjson_set)
+    legacy_add_other_face_ids(mtgjson_set.cards)
+
+
+def serialize(mtgjson_set):
+    """Dump cards the same way set files are written."""
+    return json.dumps(
+        mtgjson_set.cards, sort_keys=True, default=lambda obj: obj.to_json()
+    )
+
+
+def test_variations_match_legacy_output():
+    """Grouping by base name and face name must not change any card."""
+    expected_set = build_synthetic_set(1_000)
+    actual_set = build_synthetic_set(1_000)
+
+    legacy_add_variations_and_alternative_fields(expected_set)
+    add_variations_and_alternative_fields(actual_set)
+
+    assert serialize(actual_set) == serialize(expected_set)
+
+
+def test_linking_passes_match_legacy_output():
+    """Sharing one index across the linking passes must not change any card."""
+    expected_set = build_synthetic_multi_face_set(3_000)
+    actual_set = build_synthetic_multi_face_set(3_000)
+
+    run_legacy_linking_passes(expected_set)
+    run_linking_passes(actual_set)
+
+    assert serialize(actual_set) == serialize(expected_set)
+    assert any(getattr(card, "card_parts", None) for card in actual_set.cards)
+    assert any(getattr(card, "original_printings", None) for card in actual_set.cards)
+    assert any(getattr(card, "other_face_ids", None) for card in actual_set.cards)
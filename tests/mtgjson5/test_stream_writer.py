@@ -0,0 +1,118 @@
+"""Test that streamed compiled outputs match outputs dumped all at once."""
+
+import json
+import tracemalloc
+
+import pytest
+
+from mtgjson5.compiled_classes import MtgjsonAllPrintingsObject
+from mtgjson5.mtgjson_config import MtgjsonConfig
+from mtgjson5.mtgjson_stream_writer import MtgjsonStreamWriter
+from mtgjson5.output_generator import write_to_file
+
+
+def build_set(set_code, card_count):
+    """A set file's data, with unsorted keys, nesting and non-ASCII text."""
+    return {
+        "name": f"Set {set_code}",
+        "code": set_code,
+        "cards": [
+            {
+                "uuid": f"{set_code}-{index}",
+                "name": f"Card {index} Æther",
+                "foreignData": [{"language": "Japanese", "name": "稲妻"}],
+                "convertedManaCost": index / 2,
+                "colors": [],
+                "legalities": {},
+            }
+            for index in range(card_count)
+        ],
+        "tokens": [],
+        "isFoilOnly": False,
+        "baseSetSize": card_count,
+    }
+
+
+@pytest.fixture
+def output_path(tmp_path, monkeypatch):
+    """Point the build output at a temporary directory."""
+    monkeypatch.setattr(MtgjsonConfig(), "output_path", tmp_path)
+    return tmp_path
+
+
+def write_streamed(file_name, entries, pretty_print):
+    """Write entries one at a time, like the AllPrintings sinks do."""
+    write_file = MtgjsonConfig().output_path.joinpath(f"{file_name}.json")
+    with MtgjsonStreamWriter(write_file, pretty_print) as writer:
+        for key, content in entries:
+            writer.write(key, content)
+
+
+def write_set_files(output_path, set_codes, card_count=3):
+    """Write set files the way the set builder does, including the CON fix."""
+    for set_code in set_codes:
+        file_name = f"{set_code}_" if set_code == "CON" else set_code
+        output_path.joinpath(f"{file_name}.json").write_text(
+            json.dumps({"meta": {}, "data": build_set(set_code, card_count)}),
+            encoding="utf-8",
+        )
+
+
+@pytest.mark.parametrize("pretty_print", [False, True], ids=["minimal", "pretty"])
+@pytest.mark.parametrize("set_codes", [["M10", "CON", "10E", "LEA"], ["LEA"], []])
+def test_streamed_output_matches_dumped_output(output_path, set_codes, pretty_print):
+    """Streaming AllPrintings must write the same bytes as dumping it at once."""
+    write_set_files(output_path, set_codes)
+    all_printings = MtgjsonAllPrintingsObject()
+
+    write_to_file("Dumped", all_printings.get_set_contents(), pretty_print)
+    write_streamed("Streamed", all_printings.iterate_set_contents(), pretty_print)
+
+    dumped = output_path.joinpath("Dumped.json").read_bytes()
+    assert output_path.joinpath("Streamed.json").read_bytes() == dumped
+    assert sorted(json.loads(dumped)["data"]) == sorted(set_codes)
+
+
+def test_subset_of_sets(output_path):
+    """Format files only stream the sets they ask for, skipping unknown ones."""
+    write_set_files(output_path, ["M10", "CON", "10E"])
+    all_printings = MtgjsonAllPrintingsObject()
+
+    assert [
+        set_code
+        for set_code, _ in all_printings.iterate_set_contents(["M10", "XYZ", "CON"])
+    ] == ["CON", "M10"]
+
+
+def test_streamed_output_holds_one_set_at_a_time(output_path):
+    """Peak memory should follow the largest set, not the whole corpus."""
+    write_set_files(output_path, [f"S{index:02}" for index in range(20)], 500)
+    all_printings = MtgjsonAllPrintingsObject()
+
+    tracemalloc.start()
+    write_to_file("Dumped", all_printings.get_set_contents(), False)
+    _, dumped_peak = tracemalloc.get_traced_memory()
+    tracemalloc.reset_peak()
+    write_streamed("Streamed", all_printings.iterate_set_contents(), False)
+    _, streamed_peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    assert streamed_peak * 5 < dumped_peak
+
+
+@pytest.mark.parametrize(
+    "inline_compression", [False, True], ids=["plain", "compressed"]
+)
+def test_failed_output_is_removed(output_path, monkeypatch, inline_compression):
+    """An output that fails part way leaves nothing that looks complete."""
+    monkeypatch.setattr(MtgjsonConfig(), "inline_compression", inline_compression)
+    write_streamed("Complete", [("M10", build_set("M10", 3))], False)
+    complete_files = sorted(path.name for path in output_path.iterdir())
+
+    with pytest.raises(RuntimeError):
+        with MtgjsonStreamWriter(output_path.joinpath("Partial.json"), False) as writer:
+            writer.write("M10", build_set("M10", 3))
+            raise RuntimeError("Set failed to build")
+
+    assert sorted(path.name for path in output_path.iterdir()) == complete_files
+    assert len(complete_files) == (10 if inline_compression else 1)
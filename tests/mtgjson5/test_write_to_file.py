@@ -0,0 +1,95 @@
+"""Test that output files are written byte for byte the same as the golden files."""
+
+import pathlib
+
+import pytest
+
+from mtgjson5 import mtgjson_stream_writer
+from mtgjson5.classes import (
+    MtgjsonCardObject,
+    MtgjsonForeignDataObject,
+    MtgjsonLegalitiesObject,
+    MtgjsonMetaObject,
+)
+from mtgjson5.mtgjson_config import MtgjsonConfig
+from mtgjson5.output_generator import write_to_file
+
+GOLDEN_PATH = pathlib.Path(__file__).parent.joinpath("resources", "write_to_file")
+
+
+def build_contents():
+    """Contents mixing MTGJSON objects, nested unsorted keys and non-ASCII text."""
+    card = MtgjsonCardObject()
+    card.name = "Æther Vial"
+    card.set_code = "DST"
+    card.number = "91"
+    card.uuid = "1a2b3c"
+    card.mana_value = 1.0
+    card.converted_mana_cost = 1.0
+    card.types = ["Artifact"]
+    card.text = "At the beginning of your upkeep, you may put a charge counter."
+    card.legalities = MtgjsonLegalitiesObject()
+    card.legalities.vintage = "Legal"
+    card.legalities.legacy = "Legal"
+    foreign_data = MtgjsonForeignDataObject()
+    foreign_data.language = "Japanese"
+    foreign_data.name = "霊気の薬瓶"
+    card.foreign_data = [foreign_data]
+    card.identifiers.scryfall_id = "fd4b2d5e"
+    card.identifiers.multiverse_id = "39500"
+
+    return {
+        "DST": {"cards": [card], "name": "Darksteel", "totalSetSize": 165},
+        "10E": {"cards": [], "name": "Tenth Edition", "isFoilOnly": False},
+        "PRICES": {"zeta": {"2024-01-02": 1.5, "2024-01-01": 0.25}, "alpha": None},
+    }
+
+
+@pytest.fixture
+def output_path(tmp_path, monkeypatch):
+    """Write to a temporary directory, with a fixed build date and version."""
+    monkeypatch.setattr(MtgjsonConfig(), "output_path", tmp_path)
+    monkeypatch.setattr(
+        mtgjson_stream_writer,
+        "MtgjsonMetaObject",
+        lambda: MtgjsonMetaObject("2024-01-01", "5.2.2+20240101"),
+    )
+    return tmp_path
+
+
+@pytest.mark.parametrize("pretty_print", [False, True], ids=["minimal", "pretty"])
+@pytest.mark.parametrize("sort_keys", [True, False], ids=["sorted", "unsorted"])
+def test_matches_golden_file(output_path, pretty_print, sort_keys):
+    """Sorting and formatting must not drift from previously released outputs."""
+    # Unsorted outputs list card keys in the order the card's __slots__
+    # declare them, so the unsorted golden files were regenerated when
+    # cards moved to slots. Their data didn't change, only the key order
+    file_name = (
+        f"{'sorted' if sort_keys else 'unsorted'}_"
+        f"{'pretty' if pretty_print else 'minimal'}"
+    )
+    write_to_file(file_name, build_contents(), pretty_print, sort_keys)
+
+    assert (
+        output_path.joinpath(f"{file_name}.json").read_bytes()
+        == GOLDEN_PATH.joinpath(f"{file_name}.json").read_bytes()
+    )
+
+
+@pytest.mark.parametrize("pretty_print", [False, True], ids=["minimal", "pretty"])
+def test_empty_contents(output_path, pretty_print):
+    """Empty outputs, like a format with no legal sets, are still valid files."""
+    write_to_file("Empty", {}, pretty_print)
+    write_to_file("EmptyList", [], pretty_print)
+
+    closing = "\n}" if pretty_print else "}"
+    assert (
+        output_path.joinpath("Empty.json")
+        .read_text("utf-8")
+        .endswith(f'"data": {{}}{closing}')
+    )
+    assert (
+        output_path.joinpath("EmptyList.json")
+        .read_text("utf-8")
+        .endswith(f'"data": []{closing}')
+    )